@@ -1,6 +1,5 @@
-import os
+import os, socket, getpass
 from lib.env import studio
-from lib.qt import procQt as pQt
 
 
 #-- Packager Var --#
@@ -10,8 +9,8 @@ toolPack = __package__
 
 
 #-- Global Var --#
-user = os.environ.get('username')
-station = os.environ.get('computername')
+user = os.environ.get('username') or getpass.getuser()
+station = os.environ.get('computername') or socket.gethostname()
 binPath = os.path.join(studio.rndBinPath, toolName)
 iconPath = os.path.join(toolPath, 'gui', 'icon')
 
@@ -24,6 +23,4 @@ print '#%s#' % ('-'*(22+len(toolName)))
 print 'User : ', user
 print 'Station : ', station
 print 'Bin Path : ', binPath
-pQt.CompileUi2(uiDir=os.path.join(toolPath, 'gui', 'src'),
-               uiDest=os.path.join(toolPath, 'gui', 'ui'))
 print '%s\n' % ('#'*(22+len(toolName)))
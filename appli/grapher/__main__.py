@@ -0,0 +1,258 @@
+"""
+Grapher headless runner, no Qt needed.
+
+Usage:
+python -m appli.grapher run path/to/myGraph.gp.py [--node myNode_1] [--jobs 4] [--pool render=8] [-v warning]
+python -m appli.grapher run path/to/myGraph.gp.py --jobs 16 --queue farmServer:5870 [--queue-token secret]
+python -m appli.grapher resume path/to/myGraph.gp.py [--run user--2016_01_01--12_00_00] [--jobs 4]
+python -m appli.grapher report path/to/myGraph.gp.py [--runs 5] [--top 10]
+python -m appli.grapher explain path/to/myGraph.gp.py [--node myNode_1]
+
+'run' and 'resume' exit with 0 if all nodes succeed, 1 if a node failed, 2 on graph error.
+"""
+
+import os, sys, argparse
+from lib.system import procFile as pFile
+
+
+def getParser():
+    """
+    Get command line parser
+
+    :return: Parser
+    :rtype: argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(prog='python -m appli.grapher', description="Grapher headless runner")
+    subParsers = parser.add_subparsers(dest='command')
+    #-- Run --#
+    runParser = subParsers.add_parser('run', help="Execute graph")
+    runParser.add_argument('graph', help="Graph file")
+    runParser.add_argument('--node', default=None, help="Execute given node only (with its parents variables)")
+    runParser.add_argument('--jobs', type=int, default=1, help="Max number of parallel processes (default: 1)")
+    runParser.add_argument('--pool', action='append', default=[], metavar='NAME=N',
+                           help="Workers count of given loop pool, can be repeated")
+    runParser.add_argument('--queue', default=None, metavar='HOST:PORT',
+                           help="Job server running 'remote' loop packets (see appli.grapher.core.graphQueue)")
+    runParser.add_argument('--queue-token', default=None, dest='queueToken',
+                           help="Job server shared token (default: GP_QUEUE_TOKEN)")
+    runParser.add_argument('--local-queue', type=int, default=0, metavar='N', dest='localQueue',
+                           help="Run 'remote' loop packets on N worker agents started on localhost")
+    runParser.add_argument('--warm', action='store_true',
+                           help="Run python nodes in long-lived interpreters instead of one process per node")
+    runParser.add_argument('--memo', action='store_true',
+                           help="Skip nodes whose script, variables, upstream results and GP_INPUTS files are unchanged")
+    runParser.add_argument('--force', action='store_true', help="With --memo, run and record all nodes")
+    runParser.add_argument('--quiet', action='store_true', help="Do not print nodes output")
+    runParser.add_argument('-v', '--verbose', default='warning',
+                           choices=['critical', 'error', 'warning', 'info', 'debug', 'detail'],
+                           help="Log level (default: 'warning')")
+    #-- Resume --#
+    resumeParser = subParsers.add_parser('resume', help="Resume a previous run, completed nodes are skipped")
+    resumeParser.add_argument('graph', help="Graph file")
+    resumeParser.add_argument('--run', default=None, help="Run name to resume (default: last run)")
+    resumeParser.add_argument('--jobs', type=int, default=None, help="Max number of parallel processes "
+                                                                     "(default: resumed run workers)")
+    resumeParser.add_argument('--queue', default=None, metavar='HOST:PORT',
+                              help="Job server running 'remote' loop packets")
+    resumeParser.add_argument('--queue-token', default=None, dest='queueToken',
+                              help="Job server shared token (default: GP_QUEUE_TOKEN)")
+    resumeParser.add_argument('--local-queue', type=int, default=0, metavar='N', dest='localQueue',
+                              help="Run 'remote' loop packets on N worker agents started on localhost")
+    resumeParser.add_argument('--quiet', action='store_true', help="Do not print nodes output")
+    resumeParser.add_argument('-v', '--verbose', default='warning',
+                              choices=['critical', 'error', 'warning', 'info', 'debug', 'detail'],
+                              help="Log level (default: 'warning')")
+    #-- Report --#
+    reportParser = subParsers.add_parser('report', help="Print runs telemetry report")
+    reportParser.add_argument('graph', help="Graph file or logs path")
+    reportParser.add_argument('--runs', type=int, default=5, help="Number of runs to list")
+    reportParser.add_argument('--top', type=int, default=10, help="Number of slowest nodes to list")
+    #-- Explain --#
+    explainParser = subParsers.add_parser('explain', help="Print why nodes would run with 'run --memo'")
+    explainParser.add_argument('graph', help="Graph file")
+    explainParser.add_argument('--node', default=None, help="Explain given node only (with its parents)")
+    return parser
+
+def loadGraph(args):
+    """
+    Load graph and get node to execute from command line args
+
+    :param args: Command line args
+    :type args: argparse.Namespace
+    :return: Grapher, item (None = all nodes)
+    :rtype: grapher.Grapher, graphTree.GraphItem
+    """
+    from appli.grapher.core import grapher
+    try:
+        gp = grapher.Grapher(logLvl=getattr(args, 'verbose', 'warning'))
+        gp.load(os.path.realpath(args.graph))
+    except Exception, err:
+        raise IOError("!!! Can not load graph %s: %s !!!" % (args.graph, err))
+    item = None
+    if getattr(args, 'node', None) is not None:
+        item = gp.tree.getItemFromNodeName(args.node)
+        if item is None:
+            raise IOError("!!! Node not found: %s !!!" % args.node)
+    return gp, item
+
+def run(args):
+    """
+    Execute graph from command line args
+
+    :param args: Command line args
+    :type args: argparse.Namespace
+    :return: Exit code
+    :rtype: int
+    """
+    #-- Load Graph --#
+    try:
+        gp, item = loadGraph(args)
+    except IOError, err:
+        print err
+        return 2
+    for pool in args.pool:
+        try:
+            gp.gpExec.pools[pool.split('=')[0]] = int(pool.split('=')[1])
+        except (IndexError, ValueError):
+            print "!!! Wrong pool format, expected NAME=N: %s !!!" % pool
+            return 2
+    gp.gpExec.warmMode = args.warm
+    gp.gpExec.memoMode = args.memo
+    gp.gpExec.memoForce = args.force
+    #-- Execute --#
+    localQueue = startQueue(gp, args)
+    try:
+        gp.gpExec.runGraph(item=item, workers=args.jobs, echo=not args.quiet)
+    finally:
+        stopQueue(localQueue)
+    return printResults(gp)
+
+def resume(args):
+    """
+    Resume graph run from command line args
+
+    :param args: Command line args
+    :type args: argparse.Namespace
+    :return: Exit code
+    :rtype: int
+    """
+    try:
+        gp, item = loadGraph(args)
+        localQueue = startQueue(gp, args)
+        try:
+            gp.gpExec.resumeGraph(runName=args.run, workers=args.jobs, echo=not args.quiet)
+        finally:
+            stopQueue(localQueue)
+    except IOError, err:
+        print err
+        return 2
+    return printResults(gp)
+
+def startQueue(gp, args):
+    """
+    Set grapher job queue from command line args, start local job server and agents if needed
+
+    :param gp: Grapher
+    :type gp: grapher.Grapher
+    :param args: Command line args
+    :type args: argparse.Namespace
+    :return: Local job server and agents (None if not started)
+    :rtype: tuple
+    """
+    gp.gpExec.queue = args.queue
+    gp.gpExec.queueToken = args.queueToken
+    if args.localQueue > 0:
+        from appli.grapher.core import graphQueue
+        server, agents = graphQueue.localQueue(workers=args.localQueue)
+        gp.gpExec.queue = server.address
+        gp.gpExec.queueToken = server.token
+        return server, agents
+
+def stopQueue(localQueue):
+    """
+    Stop local job server and agents started by startQueue
+
+    :param localQueue: Local job server and agents
+    :type localQueue: tuple
+    """
+    if localQueue is not None:
+        from appli.grapher.core import graphQueue
+        graphQueue.stopLocalQueue(*localQueue)
+
+def printResults(gp):
+    """
+    Print last scheduler tasks and nodes results
+
+    :param gp: Grapher
+    :type gp: grapher.Grapher
+    :return: Exit code
+    :rtype: int
+    """
+    from appli.grapher.core import graphReport
+    results = gp.gpExec.scheduler.results()
+    #-- Node Results --#
+    telemetryFile = '%s.jsonl' % os.path.splitext(gp.gpExec.scheduler.logFile)[0]
+    nodes = dict()
+    if os.path.exists(telemetryFile):
+        nodes = graphReport.runStats(graphReport.readEvents(telemetryFile))['nodes']
+    print "\n#--- Tasks ---#"
+    for task in gp.gpExec.scheduler.tasks:
+        print "%-40s %-8s exit %-5s %8.2fs" % (task.taskName, task.status, task.exitCode, task.duration)
+    print "\n#--- Nodes ---#"
+    for nodeName, node in sorted(nodes.iteritems()):
+        print "%-40s %-8s runs %-5s failed %-5s %8.2fs" % (nodeName, 'failed' if node['failed'] else 'done',
+                                                          node['count'], node['failed'], node['total'])
+    print "\nLog: %s" % pFile.conformPath(os.path.realpath(gp.gpExec.scheduler.logFile))
+    #-- Exit Code --#
+    for exitCode in results.values():
+        if exitCode:
+            return 1
+    for node in nodes.values():
+        if node['failed']:
+            return 1
+    return 0
+
+def report(args):
+    """
+    Print runs report from command line args
+
+    :param args: Command line args
+    :type args: argparse.Namespace
+    :return: Exit code
+    :rtype: int
+    """
+    from appli.grapher.core import graphReport
+    if os.path.isdir(args.graph):
+        print graphReport.report(args.graph, runs=args.runs, top=args.top)
+    else:
+        print graphReport.report(graphReport.logsPath(args.graph), runs=args.runs, top=args.top)
+    return 0
+
+def explain(args):
+    """
+    Print nodes dirty reason from command line args
+
+    :param args: Command line args
+    :type args: argparse.Namespace
+    :return: Exit code
+    :rtype: int
+    """
+    try:
+        gp, item = loadGraph(args)
+    except IOError, err:
+        print err
+        return 2
+    for nodeName, reason in gp.gpExec.explainNodes(item=item):
+        print "%-40s %s" % (nodeName, 'up to date' if reason is None else 'dirty: %s' % reason)
+    return 0
+
+
+if __name__ == '__main__':
+    options = getParser().parse_args()
+    if options.command == 'run':
+        sys.exit(run(options))
+    if options.command == 'resume':
+        sys.exit(resume(options))
+    if options.command == 'explain':
+        sys.exit(explain(options))
+    sys.exit(report(options))
@@ -0,0 +1,358 @@
+"""
+Grapher compile / exec benchmark, on seeded synthetic graphs.
+
+Usage:
+
+Run Benchmark From Shell:
+-------------------------
+python -m appli.grapher.core.graphBench run [--shapes wide deep loops versions] [--nodes 100 1000 10000]
+                                            [--seed 1] [--legacy] [--out bench.json]
+
+Compare Two Results:
+--------------------
+python -m appli.grapher.core.graphBench compare old.json new.json [--threshold 0.2] [--min-time 0.05]
+
+Each case (shape, nodes) runs in its own process, so peak memory is measured per case.
+Phases: build (GraphTree.buildTree), names (conformNewNodeName), save, load, scripts (createScriptFiles,
+cold then 'scriptsWarm' with cache), compile (NodeCompiler.collecteDatas), tasks (collecteTasks),
+and with --legacy: saveLegacy, loadLegacy (*.gp.py files).
+"""
+
+import os, sys, json, time, random, shutil, socket, tempfile, subprocess
+from appli.grapher.core import grapherCmds
+
+
+_shapes = ['wide', 'deep', 'loops', 'versions']
+
+
+def nodeDatas(rnd, nodeName, nodeType, parent, versions=1):
+    """
+    Get synthetic node datas
+
+    :param rnd: Random generator
+    :type rnd: random.Random
+    :param nodeName: Node name
+    :type nodeName: str
+    :param nodeType: 'modul', 'sysData', 'loop'
+    :type nodeType: str
+    :param parent: Parent node name
+    :type parent: str
+    :param versions: Number of versions
+    :type versions: int
+    :return: Node datas, as stored in graph files
+    :rtype: dict
+    """
+    datas = dict(nodeName=nodeName, nodeType=nodeType, parent=parent, nodeIsEnabled=True, nodeIsActive=True,
+                 nodeIsExpanded=False, nodeVersion=versions - 1, nodeVersions=dict(), nodeComments=dict(),
+                 nodeTrash=dict(), nodeVariables=dict())
+    for v in range(versions):
+        datas['nodeVersions'][v] = 'Version %s' % v
+        datas['nodeComments'][v] = ''
+        datas['nodeTrash'][v] = ''
+        datas['nodeVariables'][v] = {0: dict(state=True, type=0, label='%sVar' % nodeType,
+                                             value=rnd.randint(0, 1000), comment='')}
+    if nodeType == 'sysData':
+        datas['nodeExecMode'] = dict((v, False) for v in range(versions))
+        datas['nodeScript'] = dict((v, "print '%s v%s'\n" % (nodeName, v) + "x = %s\n" % rnd.randint(0, 99) * 20)
+                                   for v in range(versions))
+    elif nodeType == 'loop':
+        datas['nodeLoopParams'] = {0: {'remote': False, 'packet': 2, 'pool': 'default', 'mode': 'Incremental',
+                                       'type': 'Range', 'iterator': 'i', 'checkFiles': '%sCheck' % nodeName,
+                                       'loopStart': 1, 'loopStop': 4, 'loopStep': 1,
+                                       'loopList': [], 'loopSingle': 1}}
+    return datas
+
+def generateGraph(shape, nodes, seed=1):
+    """
+    Get seeded synthetic tree datas
+
+    :param shape: 'wide' (few moduls, many children), 'deep' (long parent chains), 'loops' (many small loops),
+                  'versions' (20 versions per node, shared scripts)
+    :type shape: str
+    :param nodes: Number of nodes
+    :type nodes: int
+    :param seed: Random seed
+    :type seed: int
+    :return: Tree datas (nodeIndex: nodeDatas)
+    :rtype: dict
+    """
+    if not shape in _shapes:
+        raise ValueError("!!! Unknown graph shape: %s !!!" % shape)
+    rnd = random.Random('%s-%s-%s' % (shape, nodes, seed))
+    treeDatas = dict()
+    parents = []
+    for n in range(nodes):
+        nodeName = 'node_%s' % (n + 1)
+        #-- Wide: 1 modul per 100 nodes --#
+        if shape == 'wide':
+            if not n % 100:
+                datas = nodeDatas(rnd, nodeName, 'modul', None)
+                parents = [nodeName]
+            else:
+                datas = nodeDatas(rnd, nodeName, 'sysData', parents[0])
+        #-- Deep: chains of 50 moduls, one script per level --#
+        elif shape == 'deep':
+            if not n % 100:
+                parents = [None]
+            if n % 2:
+                datas = nodeDatas(rnd, nodeName, 'sysData', parents[-1])
+            else:
+                datas = nodeDatas(rnd, nodeName, 'modul', parents[-1])
+                parents.append(nodeName)
+        #-- Loops: 1 loop with 4 children per 5 nodes --#
+        elif shape == 'loops':
+            if not n % 5:
+                datas = nodeDatas(rnd, nodeName, 'loop', None)
+                parents = [nodeName]
+            else:
+                datas = nodeDatas(rnd, nodeName, 'sysData', parents[0])
+        #-- Versions: 20 versions per node --#
+        else:
+            if not n % 50:
+                datas = nodeDatas(rnd, nodeName, 'modul', None, versions=20)
+                parents = [nodeName]
+            else:
+                datas = nodeDatas(rnd, nodeName, 'sysData', parents[0], versions=20)
+        treeDatas[n] = datas
+    return treeDatas
+
+def runCase(shape, nodes, seed=1, legacy=False, tmpPath=None):
+    """
+    Run benchmark phases on one synthetic graph, in current process
+
+    :param shape: Graph shape (see generateGraph)
+    :type shape: str
+    :param nodes: Number of nodes
+    :type nodes: int
+    :param seed: Random seed
+    :type seed: int
+    :param legacy: Also measure legacy *.gp.py files
+    :type legacy: bool
+    :param tmpPath: Benchmark directory (default: new temp directory, removed at end)
+    :type tmpPath: str
+    :return: Phases (phaseName: {time, rss, rssDelta})
+    :rtype: dict
+    """
+    from appli.grapher.core import grapher
+    rootPath = tmpPath or tempfile.mkdtemp(prefix='gpBench_')
+    graphFile = os.path.join(rootPath, 'bench_%s_%s.gp.jsonl' % (shape, nodes))
+    phases = dict()
+    state = dict(rss=grapherCmds.peakRss(children=False))
+
+    def measure(phaseName, func):
+        t = time.time()
+        result = func()
+        rss = grapherCmds.peakRss(children=False)
+        phases[phaseName] = dict(time=time.time() - t, rss=rss,
+                                 rssDelta=None if rss is None else rss - state['rss'])
+        state['rss'] = rss
+        return result
+
+    cwd = os.getcwd()
+    try:
+        treeDatas = generateGraph(shape, nodes, seed=seed)
+        state['rss'] = grapherCmds.peakRss(children=False)
+        gp = grapher.Grapher(logLvl='critical')
+        gp.graphFile = graphFile
+        measure('build', lambda: gp.tree.buildTree(treeDatas))
+        names = ['node_%s' % (n + 1) for n in range(min(nodes, 1000))]
+        measure('names', lambda: [gp.conformNewNodeName(name) for name in names])
+        measure('save', gp.save)
+        gp = grapher.Grapher(logLvl='critical')
+        measure('load', lambda: gp.load(graphFile))
+        gp.gpExec.createProcessPaths()
+        measure('scripts', gp.gpExec.createScriptFiles)
+        measure('scriptsWarm', gp.gpExec.createScriptFiles)
+        measure('compile', lambda: gp.gpExec.nodeCompiler.collecteDatas(''))
+        measure('tasks', lambda: gp.gpExec.nodeCompiler.collecteTasks())
+        if legacy:
+            legacyFile = os.path.join(rootPath, 'bench_%s_%s.gp.py' % (shape, nodes))
+            gp.graphFile = legacyFile
+            measure('saveLegacy', gp.save)
+            gpLegacy = grapher.Grapher(logLvl='critical')
+            measure('loadLegacy', lambda: gpLegacy.load(legacyFile))
+    finally:
+        os.chdir(cwd)
+        if tmpPath is None:
+            shutil.rmtree(rootPath, True)
+    return phases
+
+def gitCommit():
+    """
+    Get current git commit of the repository
+
+    :return: Commit hash (None if not available)
+    :rtype: str
+    """
+    try:
+        proc = subprocess.Popen(['git', 'rev-parse', '--short', 'HEAD'], stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, cwd=os.path.dirname(os.path.abspath(__file__)))
+        out = proc.communicate()[0].strip()
+        return out or None
+    except OSError:
+        return None
+
+def runBenchmark(shapes=None, nodeCounts=(100, 1000, 10000), seed=1, legacy=False, echo=True):
+    """
+    Run benchmark cases, one process per case
+
+    :param shapes: Graph shapes (None = all)
+    :type shapes: list
+    :param nodeCounts: Number of nodes per graph
+    :type nodeCounts: list
+    :param seed: Random seed
+    :type seed: int
+    :param legacy: Also measure legacy *.gp.py files
+    :type legacy: bool
+    :param echo: Print results while running
+    :type echo: bool
+    :return: Benchmark results (meta, cases)
+    :rtype: dict
+    """
+    results = dict(meta=dict(commit=gitCommit(), date=time.strftime('%Y-%m-%d %H:%M:%S'),
+                             host=socket.gethostname(), python=sys.version.split()[0], seed=seed),
+                   cases=dict())
+    for shape in shapes or _shapes:
+        for nodes in nodeCounts:
+            caseName = '%s-%s' % (shape, nodes)
+            cmd = [sys.executable, '-m', 'appli.grapher.core.graphBench', 'case', shape, str(nodes),
+                   '--seed', str(seed)]
+            if legacy:
+                cmd.append('--legacy')
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            out, err = proc.communicate()
+            if proc.returncode:
+                results['cases'][caseName] = dict(error=err.strip().splitlines()[-1:] or ['exit %s' % proc.returncode])
+                if echo:
+                    print "%-16s !!! failed: %s !!!" % (caseName, results['cases'][caseName]['error'][0])
+                continue
+            phases = json.loads(out.strip().splitlines()[-1])
+            results['cases'][caseName] = dict(shape=shape, nodes=nodes, phases=phases)
+            if echo:
+                print "%-16s %s" % (caseName, '  '.join(["%s %.3fs" % (p, phases[p]['time'])
+                                                         for p in phaseOrder(phases)]))
+                sys.stdout.flush()
+    return results
+
+def phaseOrder(phases):
+    """
+    Get phase names in execution order
+
+    :param phases: Phases (phaseName: datas)
+    :type phases: dict
+    :return: Phase names
+    :rtype: list
+    """
+    order = ['build', 'names', 'save', 'load', 'scripts', 'scriptsWarm', 'compile', 'tasks', 'saveLegacy',
+             'loadLegacy']
+    return [p for p in order if p in phases] + sorted([p for p in phases if not p in order])
+
+def compare(oldResults, newResults, threshold=0.2, minTime=0.05, minRss=10240):
+    """
+    Compare two benchmark results
+
+    :param oldResults: Reference results
+    :type oldResults: dict
+    :param newResults: New results
+    :type newResults: dict
+    :param threshold: Min slow down (or memory growth) ratio flagged as regression
+    :type threshold: float
+    :param minTime: Min slow down in seconds flagged as regression
+    :type minTime: float
+    :param minRss: Min memory growth in Kb flagged as regression
+    :type minRss: int
+    :return: Rows (caseName, phaseName, metric, old, new, regression)
+    :rtype: list
+    """
+    rows = []
+    for caseName in sorted(newResults['cases'].keys()):
+        newCase = newResults['cases'][caseName]
+        oldCase = oldResults['cases'].get(caseName)
+        if oldCase is None or not 'phases' in oldCase or not 'phases' in newCase:
+            continue
+        for phaseName in phaseOrder(newCase['phases']):
+            if not phaseName in oldCase['phases']:
+                continue
+            old, new = oldCase['phases'][phaseName], newCase['phases'][phaseName]
+            regression = new['time'] - old['time'] >= minTime and new['time'] > old['time'] * (1 + threshold)
+            rows.append((caseName, phaseName, 'time', old['time'], new['time'], regression))
+            if old.get('rssDelta') is not None and new.get('rssDelta') is not None:
+                regression = (new['rssDelta'] - old['rssDelta'] >= minRss and
+                              new['rssDelta'] > old['rssDelta'] * (1 + threshold))
+                rows.append((caseName, phaseName, 'rss', old['rssDelta'], new['rssDelta'], regression))
+    return rows
+
+def compareReport(oldResults, newResults, threshold=0.2, minTime=0.05, minRss=10240):
+    """
+    Get compare text report
+
+    :param oldResults: Reference results
+    :type oldResults: dict
+    :param newResults: New results
+    :type newResults: dict
+    :param threshold: Min ratio flagged as regression
+    :type threshold: float
+    :param minTime: Min slow down in seconds flagged as regression
+    :type minTime: float
+    :param minRss: Min memory growth in Kb flagged as regression
+    :type minRss: int
+    :return: Report, number of regressions
+    :rtype: (str, int)
+    """
+    txt = ["#--- Compare %s -> %s ---#" % (oldResults['meta'].get('commit'), newResults['meta'].get('commit'))]
+    regressions = 0
+    for caseName, phaseName, metric, old, new, regression in compare(oldResults, newResults, threshold=threshold,
+                                                                    minTime=minTime, minRss=minRss):
+        if metric == 'time':
+            line = "%-16s %-12s time %9.3fs -> %9.3fs" % (caseName, phaseName, old, new)
+        else:
+            line = "%-16s %-12s rss  %8sKb -> %8sKb" % (caseName, phaseName, old, new)
+        if regression:
+            regressions += 1
+            line += "  !!! REGRESSION !!!"
+        txt.append(line)
+    txt.append("#--- %s regression(s) ---#" % regressions)
+    return '\n'.join(txt), regressions
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Grapher compile / exec benchmark")
+    subParsers = parser.add_subparsers(dest='command')
+    runParser = subParsers.add_parser('run', help="Run benchmark")
+    runParser.add_argument('--shapes', nargs='*', default=_shapes, choices=_shapes, help="Graph shapes")
+    runParser.add_argument('--nodes', nargs='*', type=int, default=[100, 1000, 10000], help="Nodes per graph")
+    runParser.add_argument('--seed', type=int, default=1, help="Random seed")
+    runParser.add_argument('--legacy', action='store_true', help="Also measure legacy *.gp.py files")
+    runParser.add_argument('--out', default=None, help="Results json file")
+    caseParser = subParsers.add_parser('case', help="Run one case, print json phases (used by 'run')")
+    caseParser.add_argument('shape', choices=_shapes)
+    caseParser.add_argument('nodes', type=int)
+    caseParser.add_argument('--seed', type=int, default=1)
+    caseParser.add_argument('--legacy', action='store_true')
+    compareParser = subParsers.add_parser('compare', help="Compare two results, exit 1 on regression")
+    compareParser.add_argument('old', help="Reference results json file")
+    compareParser.add_argument('new', help="New results json file")
+    compareParser.add_argument('--threshold', type=float, default=0.2, help="Min regression ratio")
+    compareParser.add_argument('--min-time', type=float, default=0.05, dest='minTime',
+                               help="Min slow down in seconds")
+    compareParser.add_argument('--min-rss', type=int, default=10240, dest='minRss',
+                               help="Min memory growth in Kb")
+    args = parser.parse_args()
+    if args.command == 'case':
+        print json.dumps(runCase(args.shape, args.nodes, seed=args.seed, legacy=args.legacy))
+    elif args.command == 'run':
+        benchResults = runBenchmark(shapes=args.shapes, nodeCounts=args.nodes, seed=args.seed, legacy=args.legacy)
+        if args.out is not None:
+            with open(args.out, 'w') as fileId:
+                json.dump(benchResults, fileId, indent=2, sort_keys=True)
+            print "Results saved: %s" % args.out
+    elif args.command == 'compare':
+        with open(args.old) as fileId:
+            oldDatas = json.load(fileId)
+        with open(args.new) as fileId:
+            newDatas = json.load(fileId)
+        report, count = compareReport(oldDatas, newDatas, threshold=args.threshold, minTime=args.minTime,
+                                      minRss=args.minRss)
+        print report
+        sys.exit(1 if count else 0)
@@ -0,0 +1,126 @@
+import os, hashlib
+from lib.system import procFile as pFile
+
+
+class CompileCache(object):
+    """
+    Content hash cache of compiled node fragments and written node script files
+
+    :param grapher: Main parent grapher
+    :type grapher: grapher.Grapher
+    """
+
+    def __init__(self, grapher):
+        self.grapher = grapher
+        self.log = self.grapher.log
+        self._fragments = dict()
+        self._scriptKeys = None
+
+    @property
+    def scriptCacheFile(self):
+        """
+        Get script cache file, relative to graph path
+
+        :return: Script cache file
+        :rtype: str
+        """
+        return os.path.join(self.grapher.graphTmpPath, 'scriptCache.py')
+
+    @staticmethod
+    def key(*datas):
+        """
+        Get content hash of given datas
+
+        :param datas: Datas to hash (repr is used)
+        :type datas: tuple
+        :return: Hash key
+        :rtype: str
+        """
+        return hashlib.md5(repr(datas)).hexdigest()
+
+    def clear(self, scriptCache=True):
+        """
+        Clear cached fragments and script keys
+
+        :param scriptCache: Also remove script cache file, all script files are written again
+                            (False = script keys are read again from script cache file)
+        :type scriptCache: bool
+        """
+        self._fragments = dict()
+        if not scriptCache:
+            self._scriptKeys = None
+            return
+        self._scriptKeys = dict()
+        if os.path.exists(self.scriptCacheFile):
+            os.remove(self.scriptCacheFile)
+
+    def getFragment(self, nodeName, key):
+        """
+        Get cached fragment
+
+        :param nodeName: Node name
+        :type nodeName: str
+        :param key: Fragment hash key
+        :type key: str
+        :return: Cached fragment, None if dirty
+        :rtype: str
+        """
+        if nodeName in self._fragments:
+            if self._fragments[nodeName][0] == key:
+                return self._fragments[nodeName][1]
+
+    def setFragment(self, nodeName, key, fragment):
+        """
+        Store compiled fragment
+
+        :param nodeName: Node name
+        :type nodeName: str
+        :param key: Fragment hash key
+        :type key: str
+        :param fragment: Compiled fragment
+        :type fragment: str
+        """
+        self._fragments[nodeName] = (key, fragment)
+
+    def scriptIsDirty(self, scriptFile, key):
+        """
+        Check if given script file needs to be written
+
+        :param scriptFile: Script file relative path
+        :type scriptFile: str
+        :param key: Script hash key
+        :type key: str
+        :return: True if script file has to be written
+        :rtype: bool
+        """
+        if self._scriptKeys is None:
+            self._scriptKeys = dict()
+            if os.path.exists(self.scriptCacheFile):
+                try:
+                    self._scriptKeys = pFile.readDictFile(self.scriptCacheFile)
+                except:
+                    self.log.warning("!!! Can not read script cache, rebuild all: %s !!!" % self.scriptCacheFile)
+        if self._scriptKeys.get(pFile.conformPath(scriptFile)) == key:
+            return not os.path.exists(scriptFile)
+        return True
+
+    def setScriptKey(self, scriptFile, key):
+        """
+        Store written script file hash key
+
+        :param scriptFile: Script file relative path
+        :type scriptFile: str
+        :param key: Script hash key
+        :type key: str
+        """
+        self._scriptKeys[pFile.conformPath(scriptFile)] = key
+
+    def saveScriptKeys(self):
+        """
+        Write script cache file
+        """
+        if self._scriptKeys is not None:
+            try:
+                pFile.writeDictFile(self.scriptCacheFile, self._scriptKeys)
+            except:
+                self.log.warning("!!! Can not write script cache: %s !!!" % self.scriptCacheFile)
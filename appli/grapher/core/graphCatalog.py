@@ -0,0 +1,312 @@
+"""
+Usage:
+
+catalog = graphCatalog.BankCatalog('path/to/grapher/bank', 'path/to/user/bankCatalog.json')
+catalog.refresh()
+for relPath in catalog.search('render tag:maya type:node'):
+    print relPath, catalog.entries[relPath]['comment']
+"""
+
+import os, re, json
+from lib.system import procFile as pFile
+
+
+_bankExts = {'.sc.py': 'script', '.nd.py': 'node', '.br.py': 'branch'}
+_tagRegex = re.compile(r"#(\w+)")
+
+
+class BankCatalog(object):
+    """
+    Persistent index of Grapher bank files (type, comment, requires, node names, tags, mtime).
+    Directory listings are only read again when the directory mtime changed,
+    bank files are only read again when their mtime or size changed.
+
+    :param bankPath: Bank root path
+    :type bankPath: str
+    :param catalogFile: Catalog json file (None = not persistent)
+    :type catalogFile: str
+    """
+
+    _version = 1
+
+    def __init__(self, bankPath, catalogFile=None):
+        self.bankPath = pFile.conformPath(bankPath)
+        self.catalogFile = catalogFile
+        self.dirs = dict()
+        self.entries = dict()
+        self._changed = False
+        self.load()
+
+    @staticmethod
+    def entryType(fileName):
+        """
+        Get bank entry type from given file name
+
+        :param fileName: Bank file name
+        :type fileName: str
+        :return: 'script', 'node', 'branch' (None if not a bank file)
+        :rtype: str
+        """
+        for ext, entryType in _bankExts.iteritems():
+            if fileName.endswith(ext):
+                return entryType
+
+    def relPath(self, path):
+        """
+        Get given path relative to bank root ('' for bank root)
+
+        :param path: Full path
+        :type path: str
+        :return: Relative path
+        :rtype: str
+        """
+        path = pFile.conformPath(path)
+        if path == self.bankPath:
+            return ''
+        return path.replace('%s/' % self.bankPath, '', 1)
+
+    def fullPath(self, relPath):
+        """
+        Get given relative path full path
+
+        :param relPath: Path relative to bank root
+        :type relPath: str
+        :return: Full path
+        :rtype: str
+        """
+        if not relPath:
+            return self.bankPath
+        return '%s/%s' % (self.bankPath, relPath)
+
+    def load(self):
+        """
+        Load catalog file, an unreadable or outdated catalog is ignored
+        """
+        if self.catalogFile is None or not os.path.exists(self.catalogFile):
+            return
+        try:
+            with open(self.catalogFile, 'rb') as fileId:
+                catalog = json.load(fileId)
+        except (IOError, ValueError):
+            return
+        if not catalog.get('version') == self._version:
+            return
+        #-- Json strings are unicode, names and texts are stored back as read (utf-8 str) --#
+        utf8 = lambda text: text.encode('utf-8') if isinstance(text, unicode) else text
+        try:
+            if not utf8(catalog['bankPath']) == self.bankPath:
+                return
+            dirs = dict()
+            for relDir, record in catalog['dirs'].iteritems():
+                dirs[utf8(relDir)] = dict(mtime=record['mtime'], folders=map(utf8, record['folders']),
+                                          files=map(utf8, record['files']))
+            entries = dict()
+            for relPath, entry in catalog['entries'].iteritems():
+                entries[utf8(relPath)] = dict((utf8(k), map(utf8, v) if isinstance(v, list) else utf8(v))
+                                              for k, v in entry.iteritems())
+        except (KeyError, TypeError, AttributeError):
+            return
+        self.dirs = dirs
+        self.entries = entries
+
+    def save(self):
+        """
+        Write catalog file if catalog changed, using a temp file renamed over the previous one
+        """
+        if self.catalogFile is None or not self._changed:
+            return
+        catalogPath = os.path.dirname(self.catalogFile)
+        if catalogPath and not os.path.exists(catalogPath):
+            os.makedirs(catalogPath)
+        pFile.replaceFile(self.catalogFile, json.dumps(dict(version=self._version, bankPath=self.bankPath,
+                                                           dirs=self.dirs, entries=self.entries)))
+        self._changed = False
+
+    def refresh(self, path=None, deep=False):
+        """
+        Refresh catalog from given bank path and save it
+
+        :param path: Bank path to refresh (None = bank root)
+        :type path: str
+        :param deep: Check all files, even in unchanged directories (edited files)
+        :type deep: bool
+        :return: Path contents, same as procFile.pathToDict(path, conformed=True)
+        :rtype: dict
+        """
+        if path is None:
+            path = self.bankPath
+        if not os.path.isdir(path):
+            raise IOError("!!! Bank path not found: %s !!!" % path)
+        pathDict = {'_order': []}
+        todo = [self.relPath(path)]
+        while todo:
+            relDir = todo.pop(0)
+            dirRecord = self.refreshDir(relDir, deep=deep)
+            pathDict['_order'].append(self.fullPath(relDir))
+            pathDict[self.fullPath(relDir)] = {'folders': list(dirRecord['folders']),
+                                                'files': list(dirRecord['files'])}
+            todo[0:0] = ['/'.join([relDir, f]).lstrip('/') for f in dirRecord['folders']]
+        self.save()
+        return pathDict
+
+    def refreshDir(self, relDir, deep=False):
+        """
+        Refresh given directory record and its entries
+
+        :param relDir: Directory path relative to bank root
+        :type relDir: str
+        :param deep: Check entries even if directory is unchanged
+        :type deep: bool
+        :return: Directory record (mtime, folders, files)
+        :rtype: dict
+        """
+        fullDir = self.fullPath(relDir)
+        mtime = os.stat(fullDir).st_mtime
+        dirRecord = self.dirs.get(relDir)
+        if dirRecord is not None and dirRecord['mtime'] == mtime and not deep:
+            return dirRecord
+        #-- List Directory --#
+        folders, files = [], []
+        for name in sorted(os.listdir(fullDir)):
+            if os.path.isdir(os.path.join(fullDir, name)):
+                folders.append(name)
+            elif self.entryType(name) is not None:
+                files.append(name)
+        #-- Removed Folders And Files --#
+        if dirRecord is not None:
+            for folder in set(dirRecord['folders']) - set(folders):
+                self.removePath('/'.join([relDir, folder]).lstrip('/'))
+            for fileName in set(dirRecord['files']) - set(files):
+                self.entries.pop('/'.join([relDir, fileName]).lstrip('/'), None)
+        #-- Changed Files --#
+        for fileName in files:
+            self.updateEntry('/'.join([relDir, fileName]).lstrip('/'))
+        dirRecord = dict(mtime=mtime, folders=folders, files=files)
+        self.dirs[relDir] = dirRecord
+        self._changed = True
+        return dirRecord
+
+    def removePath(self, relPath):
+        """
+        Remove given path records (directory and its contents, or file)
+
+        :param relPath: Path relative to bank root
+        :type relPath: str
+        """
+        prefix = '%s/' % relPath
+        for records in [self.dirs, self.entries]:
+            for key in records.keys():
+                if key == relPath or key.startswith(prefix):
+                    records.pop(key)
+        self._changed = True
+
+    def updateEntry(self, relPath, force=False):
+        """
+        Update given bank file entry if file changed
+
+        :param relPath: Bank file path relative to bank root
+        :type relPath: str
+        :param force: Read file even if unchanged
+        :type force: bool
+        :return: Bank entry (None if file doesn't exist)
+        :rtype: dict
+        """
+        fullPath = self.fullPath(relPath)
+        if not os.path.isfile(fullPath):
+            if relPath in self.entries:
+                self.removePath(relPath)
+            return None
+        fileStat = os.stat(fullPath)
+        entry = self.entries.get(relPath)
+        if entry is not None and not force:
+            if entry['mtime'] == fileStat.st_mtime and entry['size'] == fileStat.st_size:
+                return entry
+        entry = self.readEntry(fullPath)
+        entry.update(mtime=fileStat.st_mtime, size=fileStat.st_size)
+        self.entries[relPath] = entry
+        self._changed = True
+        return entry
+
+    def readEntry(self, fullPath):
+        """
+        Read given bank file
+
+        :param fullPath: Bank file full path
+        :type fullPath: str
+        :return: Bank entry (type, label, comment, requires, script, nodes, tags, error)
+        :rtype: dict
+        """
+        fileName = os.path.basename(fullPath)
+        entry = dict(type=self.entryType(fileName), label=fileName.split('.')[0], comment='', requires='',
+                     script='', nodes=[], tags=[], error=None)
+        try:
+            infoDict = pFile.readPyFile(fullPath)
+            entry['comment'] = infoDict.get('comment', '')
+            if entry['type'] == 'script':
+                entry['requires'] = infoDict.get('requires', '')
+                entry['script'] = infoDict.get('script', '')
+            elif entry['type'] == 'node':
+                datas = infoDict['nodeDatas']
+                entry['nodes'] = ["%s (%s)" % (datas['nodeName'], datas['nodeType'])]
+                entry['script'] = datas.get('nodeScript', {}).get(datas.get('nodeVersion', 0), '')
+            elif entry['type'] == 'branch':
+                for n in sorted(infoDict['branchDatas'].keys()):
+                    datas = infoDict['branchDatas'][n]
+                    entry['nodes'].append("%s (%s)" % (datas['nodeName'], datas['nodeType']))
+        except KeyError, err:
+            entry['error'] = "Missing datas: %s" % err
+            return entry
+        except Exception, err:
+            entry['error'] = str(err)
+            return entry
+        entry['tags'] = sorted(set([t.lower() for t in _tagRegex.findall(entry['comment'])]))
+        return entry
+
+    def getEntry(self, fullPath):
+        """
+        Get given bank file entry from catalog, file is read only if not indexed yet
+
+        :param fullPath: Bank file full path
+        :type fullPath: str
+        :return: Bank entry
+        :rtype: dict
+        """
+        relPath = self.relPath(fullPath)
+        if not relPath in self.entries:
+            self.updateEntry(relPath)
+            self.save()
+        return self.entries.get(relPath)
+
+    def search(self, query, types=None):
+        """
+        Search catalog entries. Query words must all match: 'tag:name' matches entry tags,
+        'type:name' matches entry type, other words are searched in path, comment, requires and node names.
+
+        :param query: Search query
+        :type query: str
+        :param types: Entry types to keep ('script', 'node', 'branch')
+        :type types: list
+        :return: Matching entries relative paths
+        :rtype: list
+        """
+        words = query.lower().split()
+        result = []
+        for relPath, entry in self.entries.iteritems():
+            if types is not None and not entry['type'] in types:
+                continue
+            text = None
+            for word in words:
+                if word.startswith('tag:'):
+                    if not word[4:] in entry['tags']:
+                        break
+                elif word.startswith('type:'):
+                    if not entry['type'] == word[5:]:
+                        break
+                else:
+                    if text is None:
+                        text = '\n'.join([relPath, entry['comment'], entry['requires']] + entry['nodes']).lower()
+                    if not word in text:
+                        break
+            else:
+                result.append(relPath)
+        return sorted(result)
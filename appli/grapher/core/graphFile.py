@@ -0,0 +1,545 @@
+"""
+Grapher structured graph file (*.gp.jsonl)
+
+One JSON record per line:
+    ["grapher", formatVersion, graphDatas]              header
+    ["b", hash, value]                                  script body or variable set, written once per content
+    ["n", nodeIndex, nodeDatas]                         node datas, versionned scripts and variables are blob hashes
+    ["s", nodeIndex, nodeVersion, script]               node script body, following its node (format 1 only)
+
+Python dicts with non string keys and tuples are tagged ({"#i": ...}, {"#p": ...}, {"#t": ...}).
+Identical scripts and variable sets (versions, copied nodes) are stored once, a blob precedes its first use.
+Script blobs can stay on disk until needed (lazy=True, format 2), legacy *.gp.py files are still readable.
+
+Usage:
+
+Write:
+------
+writer = GraphFileWriter(graphFile)
+writer.writeHeader(graphDatas)
+writer.writeNode(n, nodeDatas)
+writer.close()
+
+Read:
+-----
+reader = GraphFileReader(graphFile, lazy=True)
+graphDict = reader.read()        # {'graphDatas': {...}, 'treeDatas': {...}}
+"""
+
+import os, json, hashlib
+from lib.system import procFile as pFile
+
+
+formatName = 'grapher'
+formatVersion = 2
+formatExt = '.gp.jsonl'
+_encoding = 'latin-1'
+_blobAttrs = ['nodeScript', 'nodeVariables']
+
+
+def isStructured(graphFile):
+    """
+    Check if given graph file uses the structured format
+
+    :param graphFile: Graph file full path
+    :type graphFile: str
+    :return: True if structured graph file
+    :rtype: bool
+    """
+    return graphFile.endswith(formatExt)
+
+def encode(obj):
+    """
+    Convert given python datas to json compatible datas
+
+    :param obj: Python datas
+    :type obj: dict | list | tuple | str | int | float | bool | None
+    :return: Json compatible datas
+    :rtype: dict | list | str | int | float | bool | None
+    """
+    if isinstance(obj, dict):
+        if all([isinstance(k, basestring) for k in obj]):
+            return dict([(k, encode(v)) for k, v in obj.iteritems()])
+        if all([isinstance(k, (int, long)) and not isinstance(k, bool) for k in obj]):
+            return {'#i': dict([(str(k), encode(v)) for k, v in obj.iteritems()])}
+        return {'#p': [[encode(k), encode(v)] for k, v in obj.iteritems()]}
+    if isinstance(obj, tuple):
+        return {'#t': [encode(v) for v in obj]}
+    if isinstance(obj, list):
+        return [encode(v) for v in obj]
+    return obj
+
+def decode(obj):
+    """
+    Convert given json datas to python datas
+
+    :param obj: Json datas
+    :type obj: dict | list | unicode | int | float | bool | None
+    :return: Python datas
+    :rtype: dict | list | tuple | str | int | float | bool | None
+    """
+    if isinstance(obj, unicode):
+        return obj.encode(_encoding)
+    if isinstance(obj, list):
+        return [decode(v) for v in obj]
+    if isinstance(obj, dict):
+        if len(obj) == 1:
+            if '#i' in obj:
+                return dict([(int(k), decode(v)) for k, v in obj['#i'].iteritems()])
+            if '#p' in obj:
+                return dict([(_hashable(decode(k)), decode(v)) for k, v in obj['#p']])
+            if '#t' in obj:
+                return tuple([decode(v) for v in obj['#t']])
+        return dict([(k.encode(_encoding), decode(v)) for k, v in obj.iteritems()])
+    return obj
+
+def blobHash(value):
+    """
+    Get content hash of given encoded value
+
+    :param value: Json compatible datas
+    :type value: dict | list | str | int | float | bool | None
+    :return: Hash key
+    :rtype: str
+    """
+    return hashlib.md5(json.dumps(value, sort_keys=True, separators=(',', ':'), encoding=_encoding)).hexdigest()
+
+def _hashable(key):
+    """
+    Convert decoded list key to tuple
+
+    :param key: Decoded key
+    :type key: list | tuple | str | int | float
+    :return: Hashable key
+    :rtype: tuple | str | int | float
+    """
+    if isinstance(key, list):
+        return tuple([_hashable(k) for k in key])
+    return key
+
+
+class BlobIndex(object):
+    """
+    Blob record offsets of a graph file, shared by its lazy values.
+    If the graph file changed since read (saved by another session), blobs are found again from their hash
+    and all lazy values still on disk are loaded, so the graph never depends on a file it did not write.
+
+    :param filePath: Graph file full path
+    :type filePath: str
+    :param stamp: Graph file (mtime, size) when offsets were read
+    :type stamp: tuple
+    """
+
+    def __init__(self, filePath, stamp):
+        self.filePath = filePath
+        self.stamp = stamp
+        self.offsets = dict()
+        self.values = []
+
+    @staticmethod
+    def fileStamp(filePath):
+        """
+        Get given file stamp
+
+        :param filePath: File full path
+        :type filePath: str
+        :return: File (mtime, size)
+        :rtype: tuple
+        """
+        stat = os.stat(filePath)
+        return stat.st_mtime, stat.st_size
+
+    def lazyValue(self, key, offset):
+        """
+        Get lazy value of given blob record
+
+        :param key: Blob hash
+        :type key: str
+        :param offset: Blob record offset in file
+        :type offset: int
+        :return: Lazy value
+        :rtype: LazyValue
+        """
+        self.offsets[key] = offset
+        value = LazyValue(self, key)
+        self.values.append(value)
+        return value
+
+    def read(self, key):
+        """
+        Read given blob value from graph file
+
+        :param key: Blob hash
+        :type key: str
+        :return: Json value
+        :rtype: dict | list | unicode
+        """
+        if not self.fileStamp(self.filePath) == self.stamp:
+            self.reindex()
+        record = self._readRecord(key)
+        if record is None:
+            #-- File replaced between stamp check and read --#
+            self.reindex()
+            record = self._readRecord(key)
+        if record is None:
+            raise IOError("!!! Script not found, graph file changed since load: %s !!!" % self.filePath)
+        return record[2]
+
+    def reindex(self):
+        """
+        Read blob offsets again, then load all lazy values still on disk
+        """
+        stamp = self.fileStamp(self.filePath)
+        offsets = dict()
+        with open(self.filePath, 'rb') as fileId:
+            while True:
+                offset = fileId.tell()
+                line = fileId.readline()
+                if not line:
+                    break
+                if line.startswith('["b",'):
+                    offsets[line[6:38]] = offset
+        self.offsets = offsets
+        self.stamp = stamp
+        values, self.values = self.values, []
+        for value in values:
+            if value.value is None:
+                record = self._readRecord(value.key)
+                if record is None:
+                    self.values.append(value)
+                else:
+                    value.value = decode(record[2])
+
+    def _readRecord(self, key):
+        offset = self.offsets.get(key)
+        if offset is None:
+            return None
+        with open(self.filePath, 'rb') as fileId:
+            fileId.seek(offset)
+            line = fileId.readline()
+        if not line.startswith('["b","%s"' % key):
+            return None
+        return json.loads(line, encoding=_encoding)
+
+
+class LazyValue(object):
+    """
+    Script body left on disk, read when needed
+
+    :param index: Graph file blob index
+    :type index: BlobIndex
+    :param key: Blob hash
+    :type key: str
+    """
+
+    __slots__ = ('index', 'key', 'value')
+
+    def __init__(self, index, key):
+        self.index = index
+        self.key = key
+        self.value = None
+
+    def load(self):
+        """
+        Read script body from graph file. Value is kept, so versions sharing a blob share the string.
+
+        :return: Script body
+        :rtype: str
+        """
+        if self.value is None:
+            self.value = decode(self.index.read(self.key))
+        return self.value
+
+
+class LazyDict(dict):
+    """
+    Versionned dict whose values can be LazyValue, loaded on first access
+    """
+
+    def _resolve(self, key):
+        value = dict.__getitem__(self, key)
+        if isinstance(value, LazyValue):
+            value = value.load()
+            dict.__setitem__(self, key, value)
+        return value
+
+    def _resolveAll(self):
+        for key in dict.keys(self):
+            self._resolve(key)
+
+    def __getitem__(self, key):
+        return self._resolve(key)
+
+    def get(self, key, default=None):
+        if key in self:
+            return self._resolve(key)
+        return default
+
+    def pop(self, key, *args):
+        if key in self:
+            self._resolve(key)
+        return dict.pop(self, key, *args)
+
+    def items(self):
+        self._resolveAll()
+        return dict.items(self)
+
+    def iteritems(self):
+        self._resolveAll()
+        return dict.iteritems(self)
+
+    def values(self):
+        self._resolveAll()
+        return dict.values(self)
+
+    def itervalues(self):
+        self._resolveAll()
+        return dict.itervalues(self)
+
+    def copy(self):
+        self._resolveAll()
+        return dict(self)
+
+    def __eq__(self, other):
+        self._resolveAll()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        self._resolveAll()
+        return dict.__repr__(self)
+
+    def __reduce__(self):
+        return dict, (self.copy(),)
+
+    @property
+    def isLoaded(self):
+        """
+        Check if all values are loaded
+
+        :return: True if no value left on disk
+        :rtype: bool
+        """
+        for value in dict.itervalues(self):
+            if isinstance(value, LazyValue):
+                return False
+        return True
+
+
+class GraphFileWriter(object):
+    """
+    Streaming structured graph file writer. Datas are written in a temp file,
+    renamed to graphFile on close.
+
+    :param graphFile: Graph file full path
+    :type graphFile: str
+    """
+
+    def __init__(self, graphFile):
+        self.graphFile = graphFile
+        self.tmpFile = '%s.tmp' % graphFile
+        self._fileId = open(self.tmpFile, 'wb')
+        self._blobs = set()
+
+    def writeRecord(self, record):
+        """
+        Write one record line
+
+        :param record: Record
+        :type record: list
+        """
+        self._fileId.write(json.dumps(record, separators=(',', ':'), encoding=_encoding))
+        self._fileId.write('\n')
+
+    def writeHeader(self, graphDatas):
+        """
+        Write graph header
+
+        :param graphDatas: Graph datas (comment, variables)
+        :type graphDatas: dict
+        """
+        self.writeRecord([formatName, formatVersion, encode(graphDatas)])
+
+    def writeBlob(self, value):
+        """
+        Write given value in a blob record, if not already written
+
+        :param value: Json compatible datas
+        :type value: dict | list | str
+        :return: Blob hash
+        :rtype: str
+        """
+        key = blobHash(value)
+        if not key in self._blobs:
+            self.writeRecord(['b', key, value])
+            self._blobs.add(key)
+        return key
+
+    def writeNode(self, index, nodeDatas):
+        """
+        Write node datas, script bodies and variable sets are written in blob records
+
+        :param index: Node index in tree
+        :type index: int
+        :param nodeDatas: Node datas
+        :type nodeDatas: dict
+        """
+        nodeDict = dict(nodeDatas)
+        for attr in _blobAttrs:
+            if attr in nodeDict:
+                versions = nodeDict.pop(attr)
+                nodeDict[attr] = dict([(v, self.writeBlob(encode(versions[v]))) for v in sorted(versions.keys())])
+        self.writeRecord(['n', index, encode(nodeDict)])
+
+    def close(self):
+        """
+        Close file and replace graphFile
+        """
+        self._fileId.flush()
+        os.fsync(self._fileId.fileno())
+        self._fileId.close()
+        if os.name == 'nt' and os.path.exists(self.graphFile):
+            os.remove(self.graphFile)
+        os.rename(self.tmpFile, self.graphFile)
+
+    def abort(self):
+        """
+        Close and remove temp file, graphFile is untouched
+        """
+        self._fileId.close()
+        if os.path.exists(self.tmpFile):
+            os.remove(self.tmpFile)
+
+
+class GraphFileReader(object):
+    """
+    Streaming structured graph file reader
+
+    :param graphFile: Graph file full path
+    :type graphFile: str
+    :param lazy: Leave node script blobs on disk until needed (format 2)
+    :type lazy: bool
+    """
+
+    def __init__(self, graphFile, lazy=True):
+        self.graphFile = graphFile
+        self.lazy = lazy
+        self.graphDatas = None
+
+    def iterNodes(self):
+        """
+        Iterate over graph file nodes, set self.graphDatas
+
+        :return: Node index, node datas
+        :rtype: generator
+        """
+        blobIndex = BlobIndex(self.graphFile, BlobIndex.fileStamp(self.graphFile))
+        with open(self.graphFile, 'rb') as fileId:
+            header = json.loads(fileId.readline(), encoding=_encoding)
+            if not header or header[0] != formatName:
+                raise IOError("!!! Not a structured graph file: %s !!!" % self.graphFile)
+            if header[1] > formatVersion:
+                raise IOError("!!! Graph file format %s not supported: %s !!!" % (header[1], self.graphFile))
+            self.graphDatas = decode(header[2])
+            index, nodeDict = None, None
+            blobs = dict()
+            while True:
+                offset = fileId.tell()
+                line = fileId.readline()
+                if not line:
+                    break
+                #-- Blob Record --#
+                if line.startswith('["b",'):
+                    key = line[6:38]
+                    if self.lazy and not line.startswith('{', 40):
+                        blobs[key] = blobIndex.lazyValue(key, offset)
+                    else:
+                        blobs[key] = json.loads(line, encoding=_encoding)[2]
+                    continue
+                #-- Script Record --#
+                if line.startswith('["s",'):
+                    record = json.loads(line, encoding=_encoding)
+                    nodeDict['nodeScript'][record[2]] = decode(record[3])
+                    continue
+                #-- Node Record --#
+                if nodeDict is not None:
+                    yield index, nodeDict
+                record = json.loads(line, encoding=_encoding)
+                index, nodeDict = record[1], decode(record[2])
+                if header[1] > 1:
+                    self.resolveBlobs(nodeDict, blobs)
+                elif 'nodeScript' in nodeDict:
+                    nodeDict['nodeScript'] = LazyDict()
+            if nodeDict is not None:
+                yield index, nodeDict
+
+    @staticmethod
+    def resolveBlobs(nodeDict, blobs):
+        """
+        Replace given node blob hashes with their value. Variable sets are decoded for each version,
+        so versions never share a mutable value.
+
+        :param nodeDict: Node datas
+        :type nodeDict: dict
+        :param blobs: Blobs read so far (hash: LazyValue or json value)
+        :type blobs: dict
+        """
+        for attr in _blobAttrs:
+            if attr in nodeDict:
+                versions = LazyDict() if attr == 'nodeScript' else dict()
+                for version, key in nodeDict[attr].iteritems():
+                    value = blobs[key]
+                    if isinstance(value, LazyValue):
+                        dict.__setitem__(versions, version, value)
+                    else:
+                        versions[version] = decode(value)
+                nodeDict[attr] = versions
+
+    def read(self):
+        """
+        Read whole graph file
+
+        :return: Graph datas ('graphDatas', 'treeDatas')
+        :rtype: dict
+        """
+        treeDatas = dict(self.iterNodes())
+        return dict(graphDatas=self.graphDatas, treeDatas=treeDatas)
+
+
+def readGraphFile(graphFile, lazy=True):
+    """
+    Read given graph file, structured or legacy python format
+
+    :param graphFile: Graph file full path
+    :type graphFile: str
+    :param lazy: Leave node script bodies on disk until needed (structured format only)
+    :type lazy: bool
+    :return: Graph datas ('graphDatas', 'treeDatas')
+    :rtype: dict
+    """
+    if isStructured(graphFile):
+        return GraphFileReader(graphFile, lazy=lazy).read()
+    return pFile.readPyFile(graphFile)
+
+def writeGraphFile(graphFile, graphDatas, treeItems):
+    """
+    Write given graph datas and tree items in structured format
+
+    :param graphFile: Graph file full path
+    :type graphFile: str
+    :param graphDatas: Graph datas (comment, variables)
+    :type graphDatas: dict
+    :param treeItems: Tree items, in tree order
+    :type treeItems: list
+    """
+    writer = GraphFileWriter(graphFile)
+    try:
+        writer.writeHeader(graphDatas)
+        for n, item in enumerate(treeItems):
+            writer.writeNode(n, item.getDatas())
+    except:
+        writer.abort()
+        raise
+    writer.close()
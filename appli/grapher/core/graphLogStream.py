@@ -0,0 +1,156 @@
+"""
+Usage:
+
+Follow Log File Written By A Detached Exec Process:
+---------------------------------------------------
+stream = LogStream(logFile, maxLines=20000)
+stream.follow(stop=processEnded)
+
+Feed Records (scheduler):
+-------------------------
+stream.append(line, source=taskName)
+
+Read New Records (GUI timer):
+-----------------------------
+records, dropped = stream.since(lastSeq)
+lastSeq = stream.seq
+
+Records are (seq, time, source, line) tuples. Only the last 'maxLines' records are kept in memory,
+the log file holds the full output (written by the exec process or the scheduler), older records are
+read back from it on demand.
+"""
+
+import os, time, threading, collections
+
+
+class LogStream(object):
+    """
+    Bounded, thread safe record buffer of one exec log.
+    Writers (log file tail, scheduler) append records, readers poll new records by sequence number
+    without blocking writers.
+
+    :param logFile: Log file full path (full output)
+    :type logFile: str
+    :param maxLines: Max records kept in memory
+    :type maxLines: int
+    """
+
+    def __init__(self, logFile, maxLines=20000):
+        self.logFile = logFile
+        self.maxLines = max(1, int(maxLines))
+        self.seq = 0
+        self.running = False
+        self._records = collections.deque(maxlen=self.maxLines)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.stopEvent = None
+
+    def append(self, line, source=None):
+        """
+        Append new record
+
+        :param line: Output line, without line ending
+        :type line: str
+        :param source: Record source (task name)
+        :type source: str
+        """
+        with self._lock:
+            self.seq += 1
+            self._records.append((self.seq, time.time(), source, line))
+
+    def since(self, seq):
+        """
+        Get records newer than given sequence number
+
+        :param seq: Last read sequence number
+        :type seq: int
+        :return: New records, number of records dropped from memory before being read
+        :rtype: (list, int)
+        """
+        with self._lock:
+            if not self._records or seq >= self.seq:
+                return [], 0
+            firstSeq = self._records[0][0]
+            if seq + 1 < firstSeq:
+                return list(self._records), firstSeq - seq - 1
+            return list(self._records)[seq + 1 - firstSeq:], 0
+
+    def history(self, maxLines=None):
+        """
+        Get last lines of the log file, read backward from its end
+
+        :param maxLines: Max number of lines (None = self.maxLines)
+        :type maxLines: int
+        :return: Lines
+        :rtype: list
+        """
+        maxLines = maxLines or self.maxLines
+        if not os.path.exists(self.logFile):
+            return []
+        with open(self.logFile, 'rb') as fileId:
+            fileId.seek(0, 2)
+            pos = fileId.tell()
+            data = ''
+            while pos > 0 and data.count('\n') <= maxLines:
+                size = min(65536, pos)
+                pos -= size
+                fileId.seek(pos)
+                data = fileId.read(size) + data
+        return data.splitlines()[-maxLines:]
+
+    def _start(self, target, args, name):
+        self.running = True
+        self._thread = threading.Thread(target=target, args=args, name=name)
+        self._thread.daemon = True
+        self._thread.start()
+        return self._thread
+
+    def follow(self, interval=0.5, fromEnd=False, stop=None):
+        """
+        Tail log file written by another process in a background thread, new lines become records.
+        Once stop is set, lines written so far are still read, then the tail ends
+
+        :param interval: Poll interval in seconds
+        :type interval: float
+        :param fromEnd: Skip current file contents (use history() to read them)
+        :type fromEnd: bool
+        :param stop: Event stopping the tail, set when the writing process ended (None = stop())
+        :type stop: threading.Event
+        :return: Tail thread
+        :rtype: threading.Thread
+        """
+        self.stopEvent = stop or threading.Event()
+        return self._start(self._follow, (interval, fromEnd), 'GrapherLogTail')
+
+    def _follow(self, interval, fromEnd):
+        offset = 0
+        if fromEnd and os.path.exists(self.logFile):
+            offset = os.path.getsize(self.logFile)
+        rest = ''
+        try:
+            while True:
+                stopped = self.stopEvent.is_set()
+                if os.path.exists(self.logFile) and os.path.getsize(self.logFile) > offset:
+                    with open(self.logFile, 'rb') as fileId:
+                        fileId.seek(offset)
+                        data = fileId.read(1048576)
+                        offset = fileId.tell()
+                    lines = (rest + data).split('\n')
+                    rest = lines.pop()
+                    for line in lines:
+                        self.append(line.rstrip('\r'))
+                    continue
+                if stopped:
+                    if rest:
+                        self.append(rest.rstrip('\r'))
+                    break
+                self.stopEvent.wait(interval)
+        finally:
+            self.running = False
+
+    def stop(self):
+        """
+        Stop following log file
+        """
+        if self.stopEvent is not None:
+            self.stopEvent.set()
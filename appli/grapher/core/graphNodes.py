@@ -1,8 +1,43 @@
-import os, pprint, collections
+import os, sys, copy, pprint, collections
 from lib.env import studio
 from lib.system import procFile as pFile
 
 
+def pythonExe():
+    """
+    Get python interpreter used to launch exec scripts: studio python27 if installed, else current interpreter
+
+    :return: Python interpreter
+    :rtype: str
+    """
+    if os.path.exists(studio.python27):
+        return studio.python27
+    return sys.executable
+
+def cloneDatas(nodeDatas):
+    """
+    Get a structural copy of given node datas: versionned dicts and mutable values are copied,
+    strings are shared
+
+    :param nodeDatas: Node datas
+    :type nodeDatas: dict
+    :return: Node datas copy
+    :rtype: dict
+    """
+    newDatas = dict()
+    for k, v in nodeDatas.iteritems():
+        if isinstance(v, dict):
+            newV = dict()
+            for ver, value in v.iteritems():
+                if isinstance(value, (dict, list)):
+                    newV[ver] = copy.deepcopy(value)
+                else:
+                    newV[ver] = value
+            newDatas[k] = newV
+        else:
+            newDatas[k] = v
+    return newDatas
+
 class Node(object):
     """
     Node common datas contents.
@@ -44,6 +79,20 @@ class Node(object):
             return pprint.pformat(nodeDict)
         return nodeDict
 
+    def versionDatas(self):
+        """
+        Get GraphNode datas used by compilation, for current version only
+
+        :return: Node current version datas
+        :rtype: dict
+        """
+        nodeDict = dict(nodeName=self.nodeName, nodeType=self.nodeType, nodeVersion=self.nodeVersion)
+        for k, v in self.__dict__.iteritems():
+            if k.startswith('node') and isinstance(v, dict):
+                if not k in ['nodeVersions', 'nodeComments', 'nodeTrash']:
+                    nodeDict[k] = v.get(self.nodeVersion)
+        return nodeDict
+
     def setDatas(self, **kwargs):
         """
         Set GraphNode datas
@@ -83,7 +132,8 @@ class Node(object):
 
     def addVersion(self):
         """
-        Add new node version
+        Add new node version. Mutable datas (variables, loop params) are copied, so versions never alias,
+        immutable ones (scripts) are shared until edited.
 
         :return: New version
         :rtype: int
@@ -92,18 +142,18 @@ class Node(object):
         newIndex = int(sorted(self.nodeVersions.keys())[-1] + 1)
         self.nodeVersions[newIndex] = "New Version"
         self.nodeComments[newIndex] = self.nodeComments[curIndex]
-        self.nodeVariables[newIndex] = self.nodeVariables[curIndex]
+        self.nodeVariables[newIndex] = copy.deepcopy(self.nodeVariables[curIndex])
         self.nodeTrash[newIndex] = self.nodeTrash[curIndex]
         if hasattr(self, 'nodeScript'):
             self.nodeScript[newIndex] = self.nodeScript[curIndex]
             if hasattr(self, 'nodeLauncher'):
                 self.nodeLauncher[newIndex] = self.nodeLauncher[curIndex]
             if hasattr(self, 'nodeLaunchArgs'):
-                self.nodeLaunchArgs[newIndex] = self.nodeLaunchArgs[curIndex]
+                self.nodeLaunchArgs[newIndex] = copy.deepcopy(self.nodeLaunchArgs[curIndex])
             if hasattr(self, 'nodeExecMode'):
                 self.nodeExecMode[newIndex] = self.nodeExecMode[curIndex]
         if hasattr(self, 'nodeLoopParams'):
-            self.nodeLoopParams[newIndex] = self.nodeLoopParams[curIndex]
+            self.nodeLoopParams[newIndex] = copy.deepcopy(self.nodeLoopParams[curIndex])
         self.nodeVersion = newIndex
         return self.nodeVersion
 
@@ -210,16 +260,14 @@ class Node(object):
         #-- Result --#
         return '\n'.join(var)
 
-    def writeScript(self, scriptFile, graphVars, parents):
+    def writeScript(self, scriptFile, resolvedVars):
         """
         Write current script to file
 
         :param scriptFile: Script file full path
         :type scriptFile: str
-        :param graphVars: Grapher variables
-        :type graphVars: dict
-        :param parents: Parent items
-        :type parents: list
+        :param resolvedVars: Node resolved variables
+        :type resolvedVars: graphVars.ResolvedVars
         """
         if hasattr(self, 'nodeScript'):
             script = []
@@ -230,22 +278,13 @@ class Node(object):
                     script.append("%s = %r" % (k, v))
                 #-- Get Graph Var --#
                 script.append("\n#----- Grapher Vars -----#")
-                varStr = self.conformVarDict(graphVars)
-                if varStr is not None:
-                    script.append(varStr)
+                script.append(resolvedVars.rootVars.text)
                 #-- Get Parents Var --#
                 script.append("\n#----- Parents Vars -----#")
-                parents.reverse()
-                for parent in parents:
-                    script.append("#-- Node: %s --#" % parent._node.nodeName)
-                    varStr = self.conformVarDict(parent._node.nodeVariables[parent._node.nodeVersion])
-                    if varStr is not None:
-                        script.append(varStr)
+                script.append(resolvedVars.parentsBlock())
             #-- Get Node Var --#
             script.append("\n#----- Node Vars -----#")
-            varStr = self.conformVarDict(self.nodeVariables[self.nodeVersion])
-            if varStr is not None:
-                script.append(varStr)
+            script.append(resolvedVars.text)
             #-- Get Script --#
             script.append("\n#----- Node Script -----#")
             script.append(self.nodeScript[self.nodeVersion])
@@ -305,8 +344,18 @@ class SysData(Node):
         :rtype: str, bool
         """
         if remote:
-            return "os.system('%s" % studio.python27, False
-        return "os.system('%s %s')" % (studio.python27, pFile.conformPath(scriptFile)), False
+            return "os.system('%s" % pFile.conformPath(pythonExe()), False
+        return "os.system('%s %s')" % (pFile.conformPath(pythonExe()), pFile.conformPath(scriptFile)), False
+
+    @staticmethod
+    def warmLauncher():
+        """
+        Get launcher able to run node script in a warm worker
+
+        :return: Python interpreter
+        :rtype: str
+        """
+        return pythonExe()
 
 
 class CmdData(Node):
@@ -327,6 +376,7 @@ class CmdData(Node):
                                           ('mayaRender2014', pFile.conformPath(studio.mayaRender)),
                                           ('nuke5', pFile.conformPath(studio.nuke5)),
                                           ('nuke9', pFile.conformPath(studio.nuke9))])
+    _warmLaunchers = ['mayaPy2014']
 
     def __init__(self, nodeName=None, graphObj=None):
         super(CmdData, self).__init__(nodeName, graphObj)
@@ -362,6 +412,17 @@ class CmdData(Node):
         cmd += "')"
         return cmd, False
 
+    def warmLauncher(self):
+        """
+        Get launcher able to run node script in a warm worker
+
+        :return: Python launcher, None if current launcher can not be used by a warm worker
+        :rtype: str
+        """
+        launcher = self.nodeLauncher[self.nodeVersion]
+        if launcher in self._warmLaunchers and not self.nodeLaunchArgs[self.nodeVersion]:
+            return self._launchers[launcher]
+
 
 class PurData(Node):
     """
@@ -404,26 +465,56 @@ class Loop(Node):
                                    'loopList': [], 'loopSingle': 1}}
 
     # noinspection PyTypeChecker
-    def loopCommand(self):
+    def loopIterable(self):
         """
-        Get node loop command
+        Get node loop iterable expression
 
-        :return: Node loop cmd
+        :return: Iterable expression
         :rtype: str
         """
         #-- Mode Range --#
         if self.nodeLoopParams[self.nodeVersion]['type'] == 'Range':
-            loop = "for %s in range(%s, (%s + 1), %s):" % (self.nodeLoopParams[self.nodeVersion]['iterator'],
-                                                           self.nodeLoopParams[self.nodeVersion]['loopStart'],
-                                                           self.nodeLoopParams[self.nodeVersion]['loopStop'],
-                                                           self.nodeLoopParams[self.nodeVersion]['loopStep'])
+            return "range(%s, (%s + 1), %s)" % (self.nodeLoopParams[self.nodeVersion]['loopStart'],
+                                                self.nodeLoopParams[self.nodeVersion]['loopStop'],
+                                                self.nodeLoopParams[self.nodeVersion]['loopStep'])
         #-- Mode List --#
         elif self.nodeLoopParams[self.nodeVersion]['type'] == 'List':
-            loop = "for %s in %s:" % (self.nodeLoopParams[self.nodeVersion]['iterator'],
-                                      self.nodeLoopParams[self.nodeVersion]['loopList'])
+            return "%s" % self.nodeLoopParams[self.nodeVersion]['loopList']
         #-- Mode Single --#
-        else:
-            loop = "for %s in [%s]:" % (self.nodeLoopParams[self.nodeVersion]['iterator'],
-                                        self.nodeLoopParams[self.nodeVersion]['loopSingle'])
-        #++ Result --#
-        return loop
+        return "[%s]" % self.nodeLoopParams[self.nodeVersion]['loopSingle']
+
+    def loopCommand(self, iters=None):
+        """
+        Get node loop command
+
+        :param iters: Force loop values (packet)
+        :type iters: list
+        :return: Node loop cmd
+        :rtype: str
+        """
+        if iters is None:
+            return "for %s in %s:" % (self.nodeLoopParams[self.nodeVersion]['iterator'], self.loopIterable())
+        return "for %s in %r:" % (self.nodeLoopParams[self.nodeVersion]['iterator'], list(iters))
+
+    def loopPackets(self, namespace):
+        """
+        Split loop values into packets of 'packet' iterations.
+        Loop values are evaluated in given namespace (graph and parents variables)
+
+        :param namespace: Variables used by loop params
+        :type namespace: dict
+        :return: Loop packets, None if loop can't be split
+        :rtype: list
+        """
+        params = self.nodeLoopParams[self.nodeVersion]
+        packet = int(params['packet'] or 0)
+        if params['type'] == 'Single' or packet < 1:
+            return None
+        try:
+            values = list(eval(self.loopIterable(), dict(namespace)))
+        except Exception, err:
+            raise ValueError("!!! %s: can not evaluate loop values: %s !!!" % (self.nodeName, err))
+        packets = []
+        for n in range(0, len(values), packet):
+            packets.append(values[n:n + packet])
+        return packets
@@ -0,0 +1,724 @@
+"""
+Usage:
+
+Start Job Server (render manager, or localhost):
+------------------------------------------------
+python -m appli.grapher.core.graphQueue server [--host 127.0.0.1] [--port 5870] [--timeout 30] [--keep 3600]
+
+Start Worker Agent (each render node):
+--------------------------------------
+python -m appli.grapher.core.graphQueue worker --server host:5870 [--pools default render] [--jobs 2]
+
+Shared Token:
+-------------
+Every request carries a shared token, checked by the server: '--token' or GP_QUEUE_TOKEN for the server,
+agents, clients and 'python -m appli.grapher run --queue'. A server started without token generates one
+and prints it. Listen on all interfaces ('--host 0.0.0.0') on a trusted farm network only:
+agents run any command they are sent.
+
+Submit From Python:
+-------------------
+client = QueueClient('host:5870', token='secret')
+jobId = client.submit([python, 'loop.p0.py'], pool='render')
+result = client.wait(jobId)     # {'status': 'done', 'exit': 0, 'output': [...], ...}
+
+Localhost Stand-In:
+-------------------
+server, agents = localQueue(workers=4, pools=['default', 'render'])
+...
+stopLocalQueue(server, agents)
+
+Protocol: one json request line per connection, one json reply line.
+Workers pull jobs from named pools, send heartbeats with their output,
+jobs of a worker without heartbeat are requeued. Canceled or requeued jobs are killed by their
+agent on its next heartbeat. Finished jobs are purged after 'keep' seconds.
+"""
+
+import os, sys, hmac, time, json, uuid, signal, socket, threading, subprocess, SocketServer
+
+
+_defaultPort = 5870
+_tokenEnv = 'GP_QUEUE_TOKEN'
+
+
+def parseAddress(address):
+    """
+    Get (host, port) from given address
+
+    :param address: 'host:port', 'host' or (host, port)
+    :type address: str | tuple
+    :return: Host and port
+    :rtype: tuple
+    """
+    if isinstance(address, (tuple, list)):
+        return str(address[0]), int(address[1])
+    if ':' in address:
+        host, port = address.rsplit(':', 1)
+        return host, int(port)
+    return address, _defaultPort
+
+def defaultToken():
+    """
+    Get shared token from environment
+
+    :return: Token (None if GP_QUEUE_TOKEN is not set)
+    :rtype: str
+    """
+    return os.environ.get(_tokenEnv) or None
+
+def request(address, message, timeout=30, token=None):
+    """
+    Send given message to job server
+
+    :param address: Job server address
+    :type address: str | tuple
+    :param message: Request
+    :type message: dict
+    :param timeout: Socket timeout in seconds
+    :type timeout: float
+    :param token: Shared token (None = GP_QUEUE_TOKEN)
+    :type token: str
+    :return: Reply
+    :rtype: dict
+    """
+    message = dict(message, token=token or defaultToken())
+    sock = socket.create_connection(parseAddress(address), timeout)
+    try:
+        sock.sendall('%s\n' % json.dumps(message))
+        fileId = sock.makefile('rb')
+        line = fileId.readline()
+        fileId.close()
+    finally:
+        sock.close()
+    if not line:
+        raise IOError("!!! Job server closed connection: %s !!!" % (address,))
+    reply = json.loads(line)
+    if reply.get('error'):
+        raise IOError("!!! Job server error: %s !!!" % reply['error'])
+    return reply
+
+
+class QueueHandler(SocketServer.StreamRequestHandler):
+    """
+    Job server request handler
+    """
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            message = json.loads(line)
+            reply = self.server.queue.dispatch(message)
+        except Exception, err:
+            reply = dict(error=str(err))
+        self.wfile.write('%s\n' % json.dumps(reply))
+
+
+class QueueServer(SocketServer.ThreadingTCPServer):
+    """
+    Threaded tcp server holding a JobQueue
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, queue):
+        SocketServer.ThreadingTCPServer.__init__(self, address, QueueHandler)
+        self.queue = queue
+
+
+class JobQueue(object):
+    """
+    Named pools of jobs pulled by worker agents. Jobs of a worker without heartbeat
+    for more than 'timeout' seconds are requeued, up to 'retries' times.
+    Finished jobs are forgotten 'keep' seconds after their end.
+
+    :param timeout: Worker heartbeat timeout in seconds
+    :type timeout: float
+    :param retries: Max requeue count per job
+    :type retries: int
+    :param token: Shared token required by every request (None = no check)
+    :type token: str
+    :param keep: Finished jobs lifetime in seconds
+    :type keep: float
+    """
+
+    def __init__(self, timeout=30, retries=2, token=None, keep=3600):
+        self.timeout = timeout
+        self.retries = retries
+        self.token = token
+        self.keep = keep
+        self.jobs = dict()
+        self.workers = dict()
+        self._pools = dict()
+        self._lock = threading.Lock()
+
+    def dispatch(self, message):
+        """
+        Execute given request
+
+        :param message: Request ('op' key: 'submit', 'pull', 'beat', 'done', 'status', 'cancel', 'info')
+        :type message: dict
+        :return: Reply
+        :rtype: dict
+        """
+        if self.token is not None and not hmac.compare_digest(str(message.get('token') or ''), str(self.token)):
+            raise ValueError("Invalid token")
+        op = message.get('op')
+        if not op in ['submit', 'pull', 'beat', 'done', 'status', 'cancel', 'info']:
+            raise ValueError("Unknown request: %s" % op)
+        with self._lock:
+            self.reap()
+            return getattr(self, 'op_%s' % op)(message)
+
+    def reap(self, now=None):
+        """
+        Requeue jobs of lost workers (no heartbeat since timeout), purge old finished jobs
+
+        :param now: Current time
+        :type now: float
+        :return: Requeued job ids
+        :rtype: list
+        """
+        now = now or time.time()
+        requeued = []
+        for workerName, worker in self.workers.items():
+            if now - worker['beat'] > self.timeout:
+                for jobId in worker['jobs']:
+                    job = self.jobs.get(jobId)
+                    if job is None or job['status'] != 'running' or job['worker'] != workerName:
+                        continue
+                    job['output'].append("!!! Worker lost: %s !!!" % workerName)
+                    if job['attempts'] > self.retries:
+                        job.update(status='failed', exit=-1, endTime=now)
+                    else:
+                        job.update(status='queued', worker=None)
+                        self._pools.setdefault(job['pool'], []).insert(0, jobId)
+                        requeued.append(jobId)
+                self.workers.pop(workerName)
+        purged = set()
+        for jobId, job in self.jobs.items():
+            if job['status'] in ['done', 'failed'] and now - job['endTime'] > self.keep:
+                self.jobs.pop(jobId)
+                purged.add(jobId)
+        if purged:
+            #-- Purged ids can still be queued (canceled) or held by a worker --#
+            for pool, queue in self._pools.items():
+                queue[:] = [jobId for jobId in queue if not jobId in purged]
+            for worker in self.workers.values():
+                worker['jobs'] = [jobId for jobId in worker['jobs'] if not jobId in purged]
+        return requeued
+
+    def op_submit(self, message):
+        job = dict(jobId=message.get('jobId') or uuid.uuid4().hex, name=message.get('name'), cmd=message['cmd'],
+                   cwd=message.get('cwd'), env=message.get('env'), pool=message.get('pool') or 'default',
+                   status='queued', exit=None, worker=None, attempts=0, output=[], submitTime=time.time(),
+                   startTime=None, endTime=None)
+        self.jobs[job['jobId']] = job
+        self._pools.setdefault(job['pool'], []).append(job['jobId'])
+        return dict(jobId=job['jobId'])
+
+    def op_pull(self, message):
+        workerName = message['worker']
+        worker = self.workers.setdefault(workerName, dict(jobs=[], pools=message.get('pools'), host=message.get('host')))
+        worker['beat'] = time.time()
+        for pool in message.get('pools') or sorted(self._pools.keys()):
+            queue = self._pools.get(pool)
+            while queue:
+                job = self.jobs.get(queue.pop(0))
+                if job is None or job['status'] != 'queued':
+                    continue
+                job.update(status='running', worker=workerName, startTime=time.time())
+                job['attempts'] += 1
+                worker['jobs'] = [j for j in worker['jobs']
+                                  if j in self.jobs and self.jobs[j]['status'] == 'running'] + [job['jobId']]
+                return dict(job=dict((k, job[k]) for k in ['jobId', 'name', 'cmd', 'cwd', 'env', 'pool', 'attempts']))
+        return dict(job=None)
+
+    def op_beat(self, message):
+        worker = self.workers.get(message['worker'])
+        if worker is not None:
+            worker['beat'] = time.time()
+        cancel = []
+        for jobId, lines in (message.get('output') or dict()).iteritems():
+            job = self.jobs.get(jobId)
+            if job is not None and job['worker'] == message['worker'] and job['status'] == 'running':
+                if worker is not None:
+                    job['output'].extend(lines)
+                    continue
+            cancel.append(jobId)
+        return dict(lost=worker is None, cancel=cancel)
+
+    def op_done(self, message):
+        worker = self.workers.get(message['worker'])
+        if worker is not None:
+            worker['beat'] = time.time()
+            self._release(worker, message['jobId'])
+        job = self.jobs.get(message['jobId'])
+        if job is None or job['worker'] != message['worker'] or job['status'] != 'running':
+            return dict(accepted=False)
+        job['output'].extend(message.get('output') or [])
+        job.update(status='done' if message['exit'] == 0 else 'failed', exit=message['exit'], endTime=time.time())
+        return dict(accepted=True)
+
+    def op_status(self, message):
+        job = self.jobs.get(message['jobId'])
+        if job is None:
+            raise KeyError("Unknown job: %s" % message['jobId'])
+        offset = message.get('offset', 0)
+        result = dict((k, job[k]) for k in ['jobId', 'status', 'exit', 'worker', 'attempts', 'startTime', 'endTime'])
+        result['output'] = job['output'][offset:]
+        return result
+
+    def op_cancel(self, message):
+        job = self.jobs.get(message['jobId'])
+        if job is not None and job['status'] in ['queued', 'running']:
+            job.update(status='failed', exit=-1, endTime=time.time())
+            job['output'].append("!!! Job canceled !!!")
+            queue = self._pools.get(job['pool']) or []
+            if job['jobId'] in queue:
+                queue.remove(job['jobId'])
+        if job is not None and job['worker'] in self.workers:
+            self._release(self.workers[job['worker']], job['jobId'])
+        return dict(canceled=job is not None)
+
+    @staticmethod
+    def _release(worker, jobId):
+        """
+        Remove given job id from given worker jobs
+
+        :param worker: Worker record
+        :type worker: dict
+        :param jobId: Job id
+        :type jobId: str
+        """
+        if jobId in worker['jobs']:
+            worker['jobs'].remove(jobId)
+
+    def op_info(self, message):
+        counts = dict()
+        for job in self.jobs.values():
+            counts[job['status']] = counts.get(job['status'], 0) + 1
+        workers = dict((k, dict(jobs=v['jobs'], pools=v['pools'], host=v['host'], beat=v['beat']))
+                       for k, v in self.workers.iteritems())
+        return dict(jobs=counts, workers=workers)
+
+
+class JobServer(object):
+    """
+    Job server: JobQueue served over tcp, with a reaper thread requeuing jobs of lost workers
+
+    :param host: Listening host ('0.0.0.0' = all interfaces)
+    :type host: str
+    :param port: Listening port (0 = any free port)
+    :type port: int
+    :param timeout: Worker heartbeat timeout in seconds
+    :type timeout: float
+    :param retries: Max requeue count per job
+    :type retries: int
+    :param token: Shared token (None = GP_QUEUE_TOKEN, or a new random token)
+    :type token: str
+    :param keep: Finished jobs lifetime in seconds
+    :type keep: float
+    """
+
+    def __init__(self, host='127.0.0.1', port=_defaultPort, timeout=30, retries=2, token=None, keep=3600):
+        self.token = token or defaultToken() or uuid.uuid4().hex
+        self.queue = JobQueue(timeout=timeout, retries=retries, token=self.token, keep=keep)
+        self.server = QueueServer((host, port), self.queue)
+        self._stop = threading.Event()
+        self._threads = []
+
+    @property
+    def address(self):
+        """
+        Get server address, as seen from localhost if listening on all interfaces
+
+        :return: 'host:port'
+        :rtype: str
+        """
+        host, port = self.server.server_address[:2]
+        if host == '0.0.0.0':
+            host = socket.gethostname()
+        return '%s:%s' % (host, port)
+
+    def start(self):
+        """
+        Serve in background threads
+
+        :return: Server address
+        :rtype: str
+        """
+        for target, name in [(self.server.serve_forever, 'GrapherJobServer'), (self._reaper, 'GrapherJobReaper')]:
+            thread = threading.Thread(target=target, name=name)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+        return self.address
+
+    def _reaper(self):
+        while not self._stop.wait(max(0.1, self.queue.timeout / 4.0)):
+            with self.queue._lock:
+                self.queue.reap()
+
+    def stop(self):
+        """
+        Stop serving
+        """
+        self._stop.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class QueueClient(object):
+    """
+    Job server client, used by the scheduler to run tasks on worker agents
+
+    :param address: Job server address ('host:port')
+    :type address: str | tuple
+    :param pollInterval: Status poll interval in seconds
+    :type pollInterval: float
+    :param token: Shared token (None = GP_QUEUE_TOKEN)
+    :type token: str
+    """
+
+    def __init__(self, address, pollInterval=0.5, token=None):
+        self.address = address
+        self.pollInterval = pollInterval
+        self.token = token
+
+    def submit(self, cmd, cwd=None, env=None, pool='default', name=None):
+        """
+        Submit new job
+
+        :param cmd: Command arguments
+        :type cmd: list
+        :param cwd: Working directory
+        :type cwd: str
+        :param env: Environment variables added to worker environment
+        :type env: dict
+        :param pool: Pool name
+        :type pool: str
+        :param name: Job label
+        :type name: str
+        :return: Job id
+        :rtype: str
+        """
+        return request(self.address, dict(op='submit', cmd=cmd, cwd=cwd, env=env, pool=pool, name=name),
+                       token=self.token)['jobId']
+
+    def status(self, jobId, offset=0):
+        """
+        Get job status and output lines from given offset
+
+        :param jobId: Job id
+        :type jobId: str
+        :param offset: First output line
+        :type offset: int
+        :return: Job status
+        :rtype: dict
+        """
+        return request(self.address, dict(op='status', jobId=jobId, offset=offset), token=self.token)
+
+    def cancel(self, jobId):
+        """
+        Cancel given job
+
+        :param jobId: Job id
+        :type jobId: str
+        """
+        request(self.address, dict(op='cancel', jobId=jobId), token=self.token)
+
+    def info(self):
+        """
+        Get jobs count per status and workers
+
+        :return: Server info
+        :rtype: dict
+        """
+        return request(self.address, dict(op='info'), token=self.token)
+
+    def wait(self, jobId, outputFunc=None):
+        """
+        Wait until given job is done or failed
+
+        :param jobId: Job id
+        :type jobId: str
+        :param outputFunc: Called with each new output line
+        :type outputFunc: function
+        :return: Last job status, with full output
+        :rtype: dict
+        """
+        output = []
+        while True:
+            status = self.status(jobId, offset=len(output))
+            for line in status['output']:
+                output.append(line)
+                if outputFunc is not None:
+                    outputFunc(line)
+            if status['status'] in ['done', 'failed']:
+                status['output'] = output
+                return status
+            time.sleep(self.pollInterval)
+
+
+class WorkerAgent(object):
+    """
+    Worker agent: pull jobs from given pools, run them as local processes,
+    send heartbeats with their output and report their exit code.
+    Jobs the server no longer assigns to this agent (canceled, requeued) are killed.
+
+    :param address: Job server address ('host:port')
+    :type address: str | tuple
+    :param pools: Pool names to pull from (None = all pools)
+    :type pools: list
+    :param jobs: Max number of simultaneous jobs
+    :type jobs: int
+    :param workerName: Unique worker name (None = host:pid:id)
+    :type workerName: str
+    :param beatInterval: Heartbeat interval in seconds
+    :type beatInterval: float
+    :param pollInterval: Pull interval when no job is queued
+    :type pollInterval: float
+    :param python: Python executable replacing the submitter python in job commands
+    :type python: str
+    :param token: Shared token (None = GP_QUEUE_TOKEN)
+    :type token: str
+    """
+
+    def __init__(self, address, pools=None, jobs=1, workerName=None, beatInterval=5, pollInterval=1,
+                 python=None, token=None):
+        self.address = address
+        self.token = token
+        self.pools = pools
+        self.jobs = max(1, int(jobs))
+        self.workerName = workerName or '%s:%s:%s' % (socket.gethostname(), os.getpid(), uuid.uuid4().hex[:6])
+        self.beatInterval = beatInterval
+        self.pollInterval = pollInterval
+        self.python = python
+        self._running = dict()
+        self._procs = dict()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def stop(self):
+        """
+        Stop pulling new jobs, running jobs are finished
+        """
+        self._stop.set()
+
+    def run(self, maxJobs=None):
+        """
+        Pull and run jobs until stopped
+
+        :param maxJobs: Stop after given number of jobs (None = never)
+        :type maxJobs: int
+        """
+        beatThread = threading.Thread(target=self._beat, name='GrapherAgentBeat')
+        beatThread.daemon = True
+        beatThread.start()
+        count = 0
+        threads = []
+        while not self._stop.is_set() and (maxJobs is None or count < maxJobs):
+            threads = [t for t in threads if t.is_alive()]
+            if len(threads) >= self.jobs:
+                time.sleep(0.05)
+                continue
+            try:
+                job = request(self.address, dict(op='pull', worker=self.workerName, pools=self.pools,
+                                                 host=socket.gethostname()), token=self.token)['job']
+            except (IOError, socket.error), err:
+                print "!!! Job server not reachable: %s !!!" % err
+                job = None
+            if job is None:
+                self._stop.wait(self.pollInterval)
+                continue
+            count += 1
+            thread = threading.Thread(target=self.runJob, args=(job,), name='GrapherAgentJob')
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+        self._stop.set()
+
+    def start(self, maxJobs=None):
+        """
+        Run agent in a background thread
+
+        :param maxJobs: Stop after given number of jobs (None = never)
+        :type maxJobs: int
+        :return: Agent thread
+        :rtype: threading.Thread
+        """
+        thread = threading.Thread(target=self.run, kwargs=dict(maxJobs=maxJobs), name='GrapherAgent')
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def runJob(self, job):
+        """
+        Run given job and report its exit code
+
+        :param job: Pulled job
+        :type job: dict
+        """
+        cmd = [str(a) for a in job['cmd']]
+        if self.python is not None and os.path.basename(cmd[0]).lower().startswith('python'):
+            cmd[0] = self.python
+        env = dict(os.environ)
+        env.update(dict((str(k), str(v)) for k, v in (job.get('env') or dict()).iteritems()))
+        env['GP_WORKER'] = self.workerName
+        output = []
+        with self._lock:
+            self._running[job['jobId']] = output
+        try:
+            if os.name == 'nt':
+                proc = subprocess.Popen(cmd, cwd=job.get('cwd'), env=env, stdout=subprocess.PIPE,
+                                        stderr=subprocess.STDOUT)
+            else:
+                proc = subprocess.Popen(cmd, cwd=job.get('cwd'), env=env, stdout=subprocess.PIPE,
+                                        stderr=subprocess.STDOUT, preexec_fn=os.setsid)
+            with self._lock:
+                self._procs[job['jobId']] = proc
+            for line in iter(proc.stdout.readline, ''):
+                with self._lock:
+                    output.append(line.rstrip('\r\n'))
+            proc.stdout.close()
+            exitCode = proc.wait()
+        except OSError, err:
+            with self._lock:
+                output.append("!!! Can not launch job: %s !!!" % err)
+            exitCode = -1
+        with self._lock:
+            self._running.pop(job['jobId'])
+            self._procs.pop(job['jobId'], None)
+            lines = list(output)
+        message = dict(op='done', worker=self.workerName, jobId=job['jobId'], exit=exitCode, output=lines)
+        for n in range(5):
+            try:
+                request(self.address, message, token=self.token)
+                break
+            except (IOError, socket.error):
+                time.sleep(self.beatInterval)
+
+    def _beat(self):
+        while not self._stop.wait(self.beatInterval) or self._running:
+            with self._lock:
+                output = dict()
+                for jobId, lines in self._running.iteritems():
+                    output[jobId] = list(lines)
+                    del lines[:]
+            try:
+                reply = request(self.address, dict(op='beat', worker=self.workerName, output=output),
+                                token=self.token)
+            except (IOError, socket.error):
+                reply = dict()
+            for jobId in reply.get('cancel') or []:
+                self.killJob(jobId)
+            if self._stop.is_set() and not self._running:
+                break
+
+    def killJob(self, jobId):
+        """
+        Kill given running job process and its children
+
+        :param jobId: Job id
+        :type jobId: str
+        """
+        with self._lock:
+            proc = self._procs.get(jobId)
+        if proc is None or proc.poll() is not None:
+            return
+        print "Kill job %s (pid %s)" % (jobId, proc.pid)
+        try:
+            if os.name == 'nt':
+                subprocess.call(['taskkill', '/F', '/T', '/PID', str(proc.pid)])
+            else:
+                os.killpg(proc.pid, signal.SIGTERM)
+        except OSError, err:
+            print "!!! Can not kill job %s: %s !!!" % (jobId, err)
+
+
+def localQueue(workers=2, pools=None, port=0, timeout=10, beatInterval=1):
+    """
+    Start a job server and worker agents on localhost (tests, or single machine), sharing server.token
+
+    :param workers: Number of agents
+    :type workers: int
+    :param pools: Pool names pulled by agents (None = all pools)
+    :type pools: list
+    :param port: Server port (0 = any free port)
+    :type port: int
+    :param timeout: Worker heartbeat timeout in seconds
+    :type timeout: float
+    :param beatInterval: Agents heartbeat interval
+    :type beatInterval: float
+    :return: Job server and worker agents
+    :rtype: (JobServer, list)
+    """
+    server = JobServer(host='127.0.0.1', port=port, timeout=timeout)
+    server.start()
+    agents = []
+    for n in range(workers):
+        agent = WorkerAgent(server.address, pools=pools, workerName='localhost:%s' % n,
+                            beatInterval=beatInterval, pollInterval=0.2, token=server.token)
+        agent.start()
+        agents.append(agent)
+    return server, agents
+
+def stopLocalQueue(server, agents):
+    """
+    Stop local job server and its agents
+
+    :param server: Job server
+    :type server: JobServer
+    :param agents: Worker agents
+    :type agents: list
+    """
+    for agent in agents:
+        agent.stop()
+    server.stop()
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Grapher job queue")
+    subParsers = parser.add_subparsers(dest='command')
+    serverParser = subParsers.add_parser('server', help="Start job server")
+    serverParser.add_argument('--host', default='127.0.0.1', help="Listening host (0.0.0.0 = all interfaces)")
+    serverParser.add_argument('--port', type=int, default=_defaultPort, help="Listening port")
+    serverParser.add_argument('--timeout', type=float, default=30, help="Worker heartbeat timeout")
+    serverParser.add_argument('--retries', type=int, default=2, help="Max requeue count per job")
+    serverParser.add_argument('--keep', type=float, default=3600, help="Finished jobs lifetime in seconds")
+    workerParser = subParsers.add_parser('worker', help="Start worker agent")
+    workerParser.add_argument('--server', required=True, help="Job server address (host:port)")
+    workerParser.add_argument('--pools', nargs='*', default=None, help="Pools to pull from (default: all)")
+    workerParser.add_argument('--jobs', type=int, default=1, help="Max simultaneous jobs")
+    workerParser.add_argument('--python', default=None, help="Local python replacing job commands python")
+    infoParser = subParsers.add_parser('info', help="Print job server info")
+    infoParser.add_argument('--server', required=True, help="Job server address (host:port)")
+    for subParser in [serverParser, workerParser, infoParser]:
+        subParser.add_argument('--token', default=None, help="Shared token (default: GP_QUEUE_TOKEN)")
+    args = parser.parse_args()
+    if args.command == 'server':
+        jobServer = JobServer(host=args.host, port=args.port, timeout=args.timeout, retries=args.retries,
+                              token=args.token, keep=args.keep)
+        print "Grapher job server: %s" % jobServer.start()
+        if not (args.token or defaultToken()):
+            print "Generated token: %s" % jobServer.token
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            jobServer.stop()
+    elif args.command == 'worker':
+        print "Grapher worker agent: %s (pools: %s)" % (args.server, args.pools or 'all')
+        try:
+            WorkerAgent(args.server, pools=args.pools, jobs=args.jobs, python=args.python, token=args.token).run()
+        except KeyboardInterrupt:
+            pass
+    elif args.command == 'info':
+        print json.dumps(QueueClient(args.server, token=args.token).info(), indent=4, sort_keys=True)
+    sys.exit(0)
@@ -0,0 +1,201 @@
+"""
+Usage:
+
+Report From Python:
+-------------------
+print graphReport.report('path/to/tmp/GP_myGraph/logs')
+
+Report From Shell:
+------------------
+python -m appli.grapher.core.graphReport path/to/myGraph.gp.py [--runs 5] [--top 10]
+"""
+
+import os, json
+
+
+def logsPath(graphFile):
+    """
+    Get given graph file logs path
+
+    :param graphFile: Graph file full path
+    :type graphFile: str
+    :return: Logs path
+    :rtype: str
+    """
+    graphName = os.path.basename(graphFile).split('.')[0]
+    return os.path.join(os.path.dirname(os.path.realpath(graphFile)), 'tmp', 'GP_%s' % graphName, 'logs')
+
+def runFiles(path):
+    """
+    Get telemetry files, from oldest to newest
+
+    :param path: Logs path
+    :type path: str
+    :return: Telemetry files full path
+    :rtype: list
+    """
+    if not os.path.isdir(path):
+        return []
+    files = [os.path.join(path, f) for f in os.listdir(path) if f.endswith('.jsonl')]
+    return sorted(files, key=os.path.getmtime)
+
+def readEvents(telemetryFile):
+    """
+    Read given telemetry file
+
+    :param telemetryFile: Telemetry file full path
+    :type telemetryFile: str
+    :return: Events, sorted by time
+    :rtype: list
+    """
+    events = []
+    with open(telemetryFile, 'rb') as fileId:
+        for line in fileId:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                pass
+    return sorted(events, key=lambda e: e['time'])
+
+def runStats(events):
+    """
+    Aggregate given run events. Iteration duration is the time until the next iteration
+    of the same loop in the same process (or until process end for the last one).
+
+    :param events: Run events
+    :type events: list
+    :return: Run stats (duration, exit, rss, nodes, iters)
+    :rtype: dict
+    """
+    stats = dict(duration=0.0, exit=0, rss=None, nodes=dict(), iters=dict())
+    processes = dict()
+    for event in events:
+        processes.setdefault((event.get('host'), event.get('pid')), []).append(event)
+        if event.get('rss') is not None:
+            stats['rss'] = max(stats['rss'], event['rss'])
+    if events:
+        stats['duration'] = events[-1]['time'] - events[0]['time']
+    for procEvents in processes.values():
+        lastIters = dict()
+        for event in procEvents:
+            #-- Run --#
+            if event['event'] == 'runEnd' and event.get('exit'):
+                stats['exit'] = event['exit']
+            #-- Node --#
+            elif event['event'] == 'nodeEnd':
+                node = stats['nodes'].setdefault(event['node'], dict(count=0, total=0.0, max=0.0, failed=0, rss=None))
+                node['count'] += 1
+                node['total'] += event.get('duration', 0.0)
+                node['max'] = max(node['max'], event.get('duration', 0.0))
+                node['rss'] = max(node['rss'], event.get('rss'))
+                if event.get('exit'):
+                    node['failed'] += 1
+            #-- Loop Iteration --#
+            elif event['event'] == 'iter':
+                if event['node'] in lastIters:
+                    stats['iters'].setdefault(event['node'], []).append(event['time'] - lastIters[event['node']])
+                lastIters[event['node']] = event['time']
+                if event.get('skipped'):
+                    lastIters.pop(event['node'])
+        for loopName, startTime in lastIters.iteritems():
+            stats['iters'].setdefault(loopName, []).append(procEvents[-1]['time'] - startTime)
+    return stats
+
+def histogram(values, bins=8):
+    """
+    Get given values histogram
+
+    :param values: Values
+    :type values: list
+    :param bins: Number of bins
+    :type bins: int
+    :return: Bins (low, high, count)
+    :rtype: list
+    """
+    if not values:
+        return []
+    low, high = min(values), max(values)
+    width = float(high - low) / bins or 1.0
+    counts = [0] * bins
+    for value in values:
+        counts[min(int((value - low) / width), bins - 1)] += 1
+    return [(low + n * width, low + (n + 1) * width, counts[n]) for n in range(bins)]
+
+def regressions(stats, prevStats, threshold=0.2, minDelta=0.5):
+    """
+    Get nodes slower than in previous run
+
+    :param stats: Current run stats
+    :type stats: dict
+    :param prevStats: Previous run stats
+    :type prevStats: dict
+    :param threshold: Min slow down ratio
+    :type threshold: float
+    :param minDelta: Min slow down in seconds
+    :type minDelta: float
+    :return: Regressions (nodeName, prevTotal, total), slowest first
+    :rtype: list
+    """
+    result = []
+    for nodeName, node in stats['nodes'].iteritems():
+        if nodeName in prevStats['nodes']:
+            prevTotal = prevStats['nodes'][nodeName]['total']
+            if node['total'] - prevTotal >= minDelta and node['total'] > prevTotal * (1 + threshold):
+                result.append((nodeName, prevTotal, node['total']))
+    return sorted(result, key=lambda r: r[2] - r[1], reverse=True)
+
+def report(path, runs=5, top=10):
+    """
+    Get text report of last runs: run summary, slowest nodes, iteration histograms
+    and regressions against previous run
+
+    :param path: Logs path
+    :type path: str
+    :param runs: Number of runs to list
+    :type runs: int
+    :param top: Number of slowest nodes to list
+    :type top: int
+    :return: Report
+    :rtype: str
+    """
+    files = runFiles(path)
+    if not files:
+        return "No telemetry found in %s" % path
+    allStats = [(f, runStats(readEvents(f))) for f in files[-max(runs, 2):]]
+    txt = ["#--- Runs ---#"]
+    for telemetryFile, stats in allStats[-runs:]:
+        txt.append("%-40s %9.2fs  exit %-4s rss %s Kb" % (os.path.basename(telemetryFile), stats['duration'],
+                                                          stats['exit'], stats['rss']))
+    telemetryFile, stats = allStats[-1]
+    #-- Slowest Nodes --#
+    txt.extend(["", "#--- Slowest Nodes: %s ---#" % os.path.basename(telemetryFile)])
+    nodes = sorted(stats['nodes'].iteritems(), key=lambda n: n[1]['total'], reverse=True)
+    for nodeName, node in nodes[:top]:
+        txt.append("%-30s total %9.2fs  max %8.2fs  count %-6s failed %-4s rss %s Kb" % (
+            nodeName, node['total'], node['max'], node['count'], node['failed'], node['rss']))
+    #-- Loop Iterations --#
+    for loopName, durations in sorted(stats['iters'].iteritems()):
+        txt.extend(["", "#--- Iterations: %s (%s iters, mean %.2fs) ---#" % (loopName, len(durations),
+                                                                          sum(durations) / len(durations))])
+        for low, high, count in histogram(durations):
+            txt.append("%8.2fs - %8.2fs | %-6s %s" % (low, high, count, '#' * min(count, 60)))
+    #-- Regressions --#
+    if len(allStats) > 1:
+        txt.extend(["", "#--- Regressions vs %s ---#" % os.path.basename(allStats[-2][0])])
+        for nodeName, prevTotal, total in regressions(stats, allStats[-2][1]):
+            txt.append("%-30s %9.2fs -> %9.2fs (+%.0f%%)" % (nodeName, prevTotal, total,
+                                                             (total - prevTotal) / (prevTotal or 1.0) * 100))
+    return '\n'.join(txt)
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Grapher runs telemetry report")
+    parser.add_argument('graph', help="Graph file or logs path")
+    parser.add_argument('--runs', type=int, default=5, help="Number of runs to list")
+    parser.add_argument('--top', type=int, default=10, help="Number of slowest nodes to list")
+    args = parser.parse_args()
+    if os.path.isdir(args.graph):
+        print report(args.graph, runs=args.runs, top=args.top)
+    else:
+        print report(logsPath(args.graph), runs=args.runs, top=args.top)
@@ -0,0 +1,372 @@
+"""
+Usage:
+
+Init Scheduler:
+---------------
+sched = Scheduler(workers=8, pools={'render': 16}, logFile='path/to/log.txt')
+
+Add Tasks:
+----------
+sched.addTask(SchedulerTask('nodeA', [python, 'nodeA.py']))
+sched.addTask(SchedulerTask('nodeB', [python, 'nodeB.py'], depends=['nodeA']))
+sched.addTask(SchedulerTask('loop.p0', [python, 'loop.p0.py'], pool='render'))
+
+Remote Tasks (see graphQueue):
+------------------------------
+sched = Scheduler(workers=8, queue='host:5870', queueToken='secret')
+sched.addTask(SchedulerTask('loop.p0', [python, 'loop.p0.py'], pool='render', remote=True))
+
+Run Tasks:
+----------
+results = sched.run()           # Blocking, return {taskName: exitCode}
+thread = sched.start()          # Non blocking, run in a daemon thread
+"""
+
+import os, sys, time, Queue, threading, subprocess
+from lib.system import procFile as pFile
+from appli.grapher.core import graphQueue
+
+
+class SchedulerTask(object):
+    """
+    Scheduler task: one external command launched when all its dependencies are done
+
+    :param taskName: Unique task name
+    :type taskName: str
+    :param cmd: Command arguments
+    :type cmd: list
+    :param depends: Task names to wait for
+    :type depends: list
+    :param cwd: Working directory
+    :type cwd: str
+    :param pool: Worker pool name
+    :type pool: str
+    :param env: Environment variables added to current environment
+    :type env: dict
+    :param remote: Run task on a worker agent if the scheduler has a job queue
+    :type remote: bool
+    """
+
+    def __init__(self, taskName, cmd, depends=None, cwd=None, pool='default', env=None, remote=False):
+        self.taskName = taskName
+        self.cmd = cmd
+        self.depends = depends or []
+        self.cwd = cwd
+        self.pool = pool or 'default'
+        self.env = env
+        self.remote = remote
+        self.status = 'waiting'
+        self.exitCode = None
+        self.startTime = None
+        self.endTime = None
+
+    @property
+    def duration(self):
+        """
+        Get task duration
+
+        :return: Duration in seconds
+        :rtype: float
+        """
+        if self.startTime is None:
+            return 0.0
+        if self.endTime is None:
+            return time.time() - self.startTime
+        return self.endTime - self.startTime
+
+
+class Scheduler(object):
+    """
+    Run tasks in local process pools, respecting task dependencies.
+    Each named pool has its own workers pulling ready tasks from its own queue,
+    so a free worker always picks up the next waiting task of its pool.
+
+    :param workers: Max number of simultaneous processes per pool
+    :type workers: int
+    :param pools: Workers count per pool name, overrides 'workers' for listed pools
+    :type pools: dict
+    :param logFile: Log file receiving tasks output (None = print), lines are appended in batches
+    :type logFile: str
+    :param log: Log object (verbose)
+    :type log: pFile.Logger
+    :param echo: Also print tasks output when logFile is given
+    :type echo: bool
+    :param queue: Job server address ('host:port') running remote tasks (None = run them locally)
+    :type queue: str
+    :param queueToken: Job server shared token (None = GP_QUEUE_TOKEN)
+    :type queueToken: str
+    :param stream: Log stream receiving tasks output records (see graphLogStream)
+    :type stream: graphLogStream.LogStream
+    """
+
+    def __init__(self, workers=4, pools=None, logFile=None, log=None, echo=False, queue=None, stream=None,
+                 queueToken=None):
+        self.workers = max(1, int(workers))
+        self.pools = pools or dict()
+        self.logFile = logFile
+        self.log = log or pFile.Logger(title="Scheduler")
+        self.echo = echo
+        self.queue = queue
+        self.queueToken = queueToken
+        self.stream = stream
+        self.tasks = []
+        self._taskDict = dict()
+        self.flushDelay = 0.5
+        self._outLock = threading.Lock()
+        self._outFile = None
+
+    def addTask(self, task):
+        """
+        Add given task
+
+        :param task: Scheduler task
+        :type task: SchedulerTask
+        :return: Added task
+        :rtype: SchedulerTask
+        """
+        if task.taskName in self._taskDict:
+            raise KeyError("!!! Task already exists: %s !!!" % task.taskName)
+        self.tasks.append(task)
+        self._taskDict[task.taskName] = task
+        return task
+
+    def getTask(self, taskName):
+        """
+        Get task from given name
+
+        :param taskName: Task name
+        :type taskName: str
+        :return: Scheduler task
+        :rtype: SchedulerTask
+        """
+        return self._taskDict.get(taskName)
+
+    def dependents(self):
+        """
+        Get dependent tasks, per task name
+
+        :return: Dependents (taskName: [SchedulerTask])
+        :rtype: dict
+        """
+        dependents = dict()
+        for task in self.tasks:
+            dependents.setdefault(task.taskName, [])
+            for dep in task.depends:
+                if not dep in self._taskDict:
+                    raise KeyError("!!! Task %s depends on unknown task %s !!!" % (task.taskName, dep))
+                dependents.setdefault(dep, []).append(task)
+        return dependents
+
+    def results(self):
+        """
+        Get tasks exit codes
+
+        :return: Exit codes (taskName: exitCode)
+        :rtype: dict
+        """
+        results = dict()
+        for task in self.tasks:
+            results[task.taskName] = task.exitCode
+        return results
+
+    def poolSize(self, pool):
+        """
+        Get given pool workers count
+
+        :param pool: Pool name
+        :type pool: str
+        :return: Workers count
+        :rtype: int
+        """
+        return max(1, int(self.pools.get(pool, self.workers)))
+
+    def start(self):
+        """
+        Run tasks in a background thread
+
+        :return: Scheduler thread
+        :rtype: threading.Thread
+        """
+        thread = threading.Thread(target=self.run, name='GrapherScheduler')
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def run(self):
+        """
+        Run all tasks, wait until finished
+
+        :return: Exit codes (taskName: exitCode)
+        :rtype: dict
+        """
+        self.log.info("#--- Scheduler: %s tasks, %s workers ---#" % (len(self.tasks), self.workers))
+        dependents = self.dependents()
+        if self.logFile is not None:
+            self._outFile = pFile.FileAppender(self.logFile, maxLines=500, flushDelay=self.flushDelay)
+        doneQueue = Queue.Queue()
+        #-- Start Pools --#
+        readyQueues = dict()
+        threads = []
+        for task in self.tasks:
+            if not task.pool in readyQueues:
+                readyQueues[task.pool] = Queue.Queue()
+                poolTasks = len([t for t in self.tasks if t.pool == task.pool])
+                for n in range(min(self.poolSize(task.pool), poolTasks)):
+                    thread = threading.Thread(target=self._worker, args=(readyQueues[task.pool], doneQueue),
+                                              name='GrapherWorker_%s_%s' % (task.pool, n))
+                    thread.daemon = True
+                    thread.start()
+                    threads.append((task.pool, thread))
+                self.log.detail("\t ---> Pool %s: %s workers" % (task.pool, min(self.poolSize(task.pool), poolTasks)))
+        #-- Push Root Tasks --#
+        pending = len(self.tasks)
+        for task in self.tasks:
+            if not task.depends:
+                task.status = 'ready'
+                readyQueues[task.pool].put(task)
+        #-- Release Dependents --#
+        while pending:
+            try:
+                task = doneQueue.get(timeout=self.flushDelay)
+            except Queue.Empty:
+                if self._outFile is not None:
+                    self._outFile.flush()
+                continue
+            pending -= 1
+            for child in dependents[task.taskName]:
+                if task.status == 'done':
+                    if all([self._taskDict[dep].status == 'done' for dep in child.depends]):
+                        child.status = 'ready'
+                        readyQueues[child.pool].put(child)
+                else:
+                    pending -= self._skip(child, dependents)
+        #-- Stop Workers --#
+        for pool, thread in threads:
+            readyQueues[pool].put(None)
+        for pool, thread in threads:
+            thread.join()
+        if self._outFile is not None:
+            self._outFile.close()
+            self._outFile = None
+        self.log.info("#--- Scheduler: done ---#")
+        return self.results()
+
+    def _skip(self, task, dependents):
+        """
+        Skip given task and its dependents
+
+        :param task: Task to skip
+        :type task: SchedulerTask
+        :param dependents: Dependents (taskName: [SchedulerTask])
+        :type dependents: dict
+        :return: Number of skipped tasks
+        :rtype: int
+        """
+        if task.status == 'skipped':
+            return 0
+        task.status = 'skipped'
+        self.writeOutput(task, "!!! Skipped: a dependency failed !!!")
+        count = 1
+        for child in dependents[task.taskName]:
+            count += self._skip(child, dependents)
+        return count
+
+    def _worker(self, readyQueue, doneQueue):
+        """
+        Worker loop: execute ready tasks until a None task is received
+
+        :param readyQueue: Ready tasks
+        :type readyQueue: Queue.Queue
+        :param doneQueue: Finished tasks
+        :type doneQueue: Queue.Queue
+        """
+        while True:
+            task = readyQueue.get()
+            if task is None:
+                break
+            try:
+                self.execTask(task)
+            except Exception, err:
+                #-- Any error fails the task, never the worker --#
+                task.exitCode = -1
+                task.status = 'failed'
+                task.endTime = time.time()
+                try:
+                    self.writeOutput(task, "!!! Task error: %s !!!" % err)
+                except Exception:
+                    self.log.error("Task %s error: %r" % (task.taskName, err))
+            finally:
+                doneQueue.put(task)
+
+    def execTask(self, task):
+        """
+        Execute given task, store its exit code and status
+
+        :param task: Scheduler task
+        :type task: SchedulerTask
+        """
+        task.status = 'running'
+        task.startTime = time.time()
+        self.writeOutput(task, "#--- Start: %s ---#" % ' '.join(task.cmd))
+        if task.remote and self.queue is not None:
+            self.execRemoteTask(task)
+        else:
+            env = None
+            if task.env:
+                env = dict(os.environ)
+                env.update(task.env)
+            try:
+                proc = subprocess.Popen(task.cmd, cwd=task.cwd, env=env, stdout=subprocess.PIPE,
+                                        stderr=subprocess.STDOUT)
+                for line in iter(proc.stdout.readline, ''):
+                    self.writeOutput(task, line.rstrip('\r\n'))
+                proc.stdout.close()
+                task.exitCode = proc.wait()
+            except OSError, err:
+                self.writeOutput(task, "!!! Can not launch task: %s !!!" % err)
+                task.exitCode = -1
+        task.endTime = time.time()
+        if task.exitCode == 0:
+            task.status = 'done'
+        else:
+            task.status = 'failed'
+        self.writeOutput(task, "#--- End: %s (exit %s) -- Duration: %s ---#" % (task.status, task.exitCode,
+                                                                              pFile.secondsToStr(task.duration)))
+
+    def execRemoteTask(self, task):
+        """
+        Submit given task to the job queue and wait for its exit code, worker output is streamed to logFile
+
+        :param task: Scheduler task
+        :type task: SchedulerTask
+        """
+        client = graphQueue.QueueClient(self.queue, token=self.queueToken)
+        try:
+            jobId = client.submit(task.cmd, cwd=task.cwd, env=task.env, pool=task.pool, name=task.taskName)
+            self.writeOutput(task, "#--- Job %s queued on %s ---#" % (jobId, self.queue))
+            result = client.wait(jobId, outputFunc=lambda line: self.writeOutput(task, line))
+            self.writeOutput(task, "#--- Job %s: worker %s, attempts %s ---#" % (jobId, result['worker'],
+                                                                               result['attempts']))
+            task.exitCode = result['exit']
+        except (IOError, EnvironmentError), err:
+            self.writeOutput(task, "!!! Job queue error: %s !!!" % err)
+            task.exitCode = -1
+
+    def writeOutput(self, task, line):
+        """
+        Write given task output line to logFile
+
+        :param task: Scheduler task
+        :type task: SchedulerTask
+        :param line: Output line
+        :type line: str
+        """
+        outLine = "[%s] %s" % (task.taskName, line)
+        with self._outLock:
+            if self._outFile is None or self.echo:
+                print outLine
+                sys.stdout.flush()
+            if self._outFile is not None:
+                self._outFile.write(outLine)
+            if self.stream is not None:
+                self.stream.append(line, source=task.taskName)
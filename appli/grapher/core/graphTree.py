@@ -15,6 +15,16 @@ class GraphTree(object):
         self.log = self.gp.log
         self.log.info("#-- Init Graph Tree --#", newLinesBefore=1)
         self._topItems = []
+        self._itemIndex = dict()
+        self._nameCounters = dict()
+
+    def clear(self):
+        """
+        Remove all tree items
+        """
+        self._topItems = []
+        self._itemIndex = dict()
+        self._nameCounters = dict()
 
     def getDatas(self, asString=False):
         """
@@ -88,6 +98,25 @@ class GraphTree(object):
         #-- Return Object List --#
         return items
 
+    def activeItems(self):
+        """
+        Get tree active items, in tree order. Inactive items children are not visited.
+
+        :return: Active items
+        :rtype: list
+        """
+        items = []
+        #-- Recurse Function --#
+        def recurse(currentItem):
+            if currentItem._node.nodeIsActive:
+                items.append(currentItem)
+                for child in currentItem._children:
+                    recurse(child)
+        #-- Parse Top Items --#
+        for topItem in self._topItems:
+            recurse(topItem)
+        return items
+
     def getItemFromNodeName(self, nodeName):
         """
         Get item from given node name
@@ -97,9 +126,66 @@ class GraphTree(object):
         :return: Tree item
         :rtype: GraphItem
         """
-        for item in self.allItems():
-            if item._node.nodeName == nodeName:
-                return item
+        return self._itemIndex.get(nodeName)
+
+    def uniqueNodeName(self, nodeName):
+        """
+        Get unique node name from given name ('baseName_index')
+
+        :param nodeName: Node name
+        :type nodeName: str
+        :return: Given name if unused, else 'baseName_nextIndex'
+        :rtype: str
+        """
+        if not nodeName in self._itemIndex:
+            return nodeName
+        baseName = nodeName.split('_')[0]
+        return '%s_%s' % (baseName, (self._nameCounters.get(baseName, 0) + 1))
+
+    def _registerName(self, item):
+        """
+        Store given item in name index and update its base name counter
+
+        :param item: Tree item
+        :type item: GraphItem
+        """
+        nodeName = item._node.nodeName
+        if nodeName in self._itemIndex and not self._itemIndex[nodeName] == item:
+            raise KeyError("!!! Node name already used: %s !!!" % nodeName)
+        self._itemIndex[nodeName] = item
+        index = nodeName.split('_')[-1]
+        if '_' in nodeName and index.isdigit():
+            baseName = nodeName.split('_')[0]
+            self._nameCounters[baseName] = max(self._nameCounters.get(baseName, 0), int(index))
+
+    def _unregisterName(self, item):
+        """
+        Remove given item from name index
+
+        :param item: Tree item
+        :type item: GraphItem
+        """
+        if self._itemIndex.get(item._node.nodeName) == item:
+            self._itemIndex.pop(item._node.nodeName)
+
+    def renameItem(self, item, nodeName):
+        """
+        Rename given item with a unique node name
+
+        :param item: Tree item
+        :type item: GraphItem
+        :param nodeName: New node name
+        :type nodeName: str
+        :return: New node name
+        :rtype: str
+        """
+        if nodeName == item._node.nodeName:
+            return nodeName
+        newNodeName = self.gp.conformNewNodeName(nodeName)
+        self._unregisterName(item)
+        item._node.nodeName = newNodeName
+        self._registerName(item)
+        return newNodeName
 
     def buildTree(self, treeDict):
         """
@@ -114,6 +200,7 @@ class GraphTree(object):
                                       nodeParent=treeDict[n]['parent'])
             # noinspection PyUnresolvedReferences
             newItem._node.setDatas(**treeDict[n])
+            newItem.updateActive()
 
     def createItem(self, nodeType='modul', nodeName=None, nodeParent=None):
         """
@@ -168,17 +255,81 @@ class GraphTree(object):
         :return: New tree item
         :rtype: Modul | SysData | CmdData | PyData | Loop
         """
+        self._registerName(item)
         if parent is None:
-            self.log.detail("\t ---> Parent %s to world" % item._node.nodeName)
+            self.log.detail("\t ---> Parent %s to world", item._node.nodeName)
             self._topItems.append(item)
         else:
             if isinstance(parent, str):
                 parent = self.getItemFromNodeName(parent)
-            self.log.detail("\t ---> Parent %s to %s" % (item._node.nodeName, parent._node.nodeName))
+            self.log.detail("\t ---> Parent %s to %s", item._node.nodeName, parent._node.nodeName)
             parent._children.append(item)
             item._parent = parent
+        item.updateActive()
         return item
 
+    def pasteSnapshot(self, snapshot, parent=None):
+        """
+        Create items from given snapshot (see GraphItem.snapshot), renamed with unique node names.
+        Snapshot datas are copied, so a snapshot can be pasted several times.
+
+        :param snapshot: Items snapshot
+        :type snapshot: list
+        :param parent: Parent of snapshot root items (None = world)
+        :type parent: str | GraphItem
+        :return: New items, in snapshot order
+        :rtype: list
+        """
+        newItems = []
+        for nodeType, nodeName, parentIndex, nodeDatas in snapshot:
+            newItem = self._newItem(nodeType, self.gp.conformNewNodeName(nodeName))
+            newItem._node.setDatas(**graphNodes.cloneDatas(nodeDatas))
+            if parentIndex is None:
+                self._addItem(newItem, parent=parent)
+            else:
+                self._addItem(newItem, parent=newItems[parentIndex])
+            newItems.append(newItem)
+        return newItems
+
+    def duplicateItem(self, item, branch=True):
+        """
+        Duplicate given item, and its children if branch is True, under the same parent
+
+        :param item: Tree item
+        :type item: GraphItem
+        :param branch: Duplicate item children
+        :type branch: bool
+        :return: New items, new root item first
+        :rtype: list
+        """
+        return self.pasteSnapshot(item.snapshot(branch=branch), parent=item._parent)
+
+    @staticmethod
+    def snapshotFromDatas(datasList, rootName=None):
+        """
+        Get items snapshot from node datas (with 'parent' key), first datas being the root node.
+        Nodes whose parent is not found are parented to the root node.
+
+        :param datasList: Node datas, in tree order
+        :type datasList: list
+        :param rootName: Force root node name
+        :type rootName: str
+        :return: Items snapshot
+        :rtype: list
+        """
+        snapshot = []
+        indexes = dict()
+        for n, nodeDatas in enumerate(datasList):
+            nodeName = nodeDatas['nodeName']
+            if not n:
+                parentIndex = None
+                nodeName = rootName or nodeName
+            else:
+                parentIndex = indexes.get(nodeDatas.get('parent'), 0)
+            indexes[nodeDatas['nodeName']] = n
+            snapshot.append((nodeDatas['nodeType'], nodeName, parentIndex, graphNodes.cloneDatas(nodeDatas)))
+        return snapshot
+
     def printData(self):
         """
         Print tree datas
@@ -199,8 +350,8 @@ class GraphItem(object):
     def __init__(self, treeObject, nodeObject):
         self._tree = treeObject
         self.log = self._tree.log
-        self.log.debug("#-- Init Graph Item: %s (%s) --#" % (nodeObject.nodeName,
-                                                             nodeObject.nodeType), newLinesBefore=1)
+        self.log.debug("#-- Init Graph Item: %s (%s) --#", nodeObject.nodeName, nodeObject.nodeType,
+                       newLinesBefore=1)
         self._node = nodeObject
         self._parent = None
         self._children = []
@@ -222,6 +373,26 @@ class GraphItem(object):
             return pprint.pformat(nodeDatas)
         return nodeDatas
 
+    def snapshot(self, branch=False):
+        """
+        Get compact copy of item, and its children if branch is True, to paste with GraphTree.pasteSnapshot
+
+        :param branch: Store item children
+        :type branch: bool
+        :return: Items snapshot (nodeType, nodeName, parentIndex, nodeDatas), parentIndex is None for root item
+        :rtype: list
+        """
+        items = [self]
+        if branch:
+            items.extend(self.allChildren())
+        indexes = dict()
+        snapshot = []
+        for n, item in enumerate(items):
+            indexes[item] = n
+            snapshot.append((item._node.nodeType, item._node.nodeName, indexes.get(item._parent),
+                             graphNodes.cloneDatas(item._node.getDatas())))
+        return snapshot
+
     @property
     def parent(self):
         """
@@ -303,6 +474,17 @@ class GraphItem(object):
             if cItem == childItem:
                 return n
 
+    def rename(self, nodeName):
+        """
+        Rename item node with a unique node name
+
+        :param nodeName: New node name
+        :type nodeName: str
+        :return: New node name
+        :rtype: str
+        """
+        return self._tree.renameItem(self, nodeName)
+
     def setParent(self, graphItem):
         """
         Parent item to given GraphItem
@@ -317,6 +499,7 @@ class GraphItem(object):
         #-- Parent To Given GraphItem --#
         self._parent = graphItem
         self._parent._children.append(self)
+        self.updateActive()
 
     def setEnabled(self, state):
         """
@@ -326,18 +509,20 @@ class GraphItem(object):
         :type state: bool
         """
         self._node.nodeIsEnabled = state
-        self._node.nodeIsActive = state
-        for child in self.allChildren():
-            if child._node.nodeIsEnabled:
-                if child._parent is not None:
-                    if not child._parent._node.nodeIsActive:
-                        child._node.nodeIsActive = False
-                    else:
-                        child._node.nodeIsActive = state
-                else:
-                    child._node.nodeIsActive = state
-            else:
-                child._node.nodeIsActive = False
+        self.updateActive()
+
+    def updateActive(self):
+        """
+        Update item active state (enabled and parent active).
+        Children are only updated if item active state changed.
+        """
+        active = self._node.nodeIsEnabled
+        if active and self._parent is not None:
+            active = self._parent._node.nodeIsActive
+        if active != self._node.nodeIsActive:
+            self._node.nodeIsActive = active
+            for child in self._children:
+                child.updateActive()
 
     def setExpanded(self, state):
         """
@@ -348,8 +533,10 @@ class GraphItem(object):
         """
         self._node.nodeIsExpanded = state
         if not state:
-            for child in self.allChildren():
-                child._node.nodeIsExpanded = state
+            #-- Collapsed Children Have Collapsed Children --#
+            for child in self._children:
+                if child._node.nodeIsExpanded:
+                    child.setExpanded(state)
 
     def move(self, side):
         newIndex = self._getNewIndex(side)
@@ -399,3 +586,5 @@ class GraphItem(object):
             self._tree._topItems.remove(self)
         else:
             self._parent._children.remove(self)
+        for item in [self] + self.allChildren():
+            self._tree._unregisterName(item)
@@ -0,0 +1,283 @@
+import re, ast, copy, __builtin__
+from appli.grapher.core import graphNodes, graphCache
+
+
+_evalLine = re.compile(r"^(\w+) = eval\((.*)\)$")
+_appendLine = re.compile(r"^(\w+)\.append\(eval\((.*)\)\)$")
+_labelLine = re.compile(r"^(\w+)")
+_safeBuiltins = dict([(k, getattr(__builtin__, k)) for k in ['True', 'False', 'None', 'abs', 'bool', 'dict', 'divmod',
+                                                              'enumerate', 'float', 'int', 'len', 'list', 'long',
+                                                              'max', 'min', 'range', 'repr', 'reversed', 'round',
+                                                              'set', 'sorted', 'str', 'sum', 'tuple', 'xrange',
+                                                              'zip']])
+
+
+class ResolvedVars(object):
+    """
+    Variables seen by one tree item: graph variables, then parents and node variables.
+    Expressions that only depend on known values are resolved to literals,
+    the others (loop iterators, runtime modules, ...) are kept as runtime code.
+
+    :param nodeName: Node name (None for graph variables)
+    :type nodeName: str
+    :param key: Inherited variables hash key
+    :type key: str
+    :param lines: Conformed variable lines
+    :type lines: list
+    :param namespace: Resolved values after variable lines
+    :type namespace: dict
+    :param dynamic: Variable names only known at runtime
+    :type dynamic: set
+    :param parent: Parent resolved variables
+    :type parent: ResolvedVars
+    """
+
+    def __init__(self, nodeName, key, lines, namespace, dynamic, parent=None):
+        self.nodeName = nodeName
+        self.key = key
+        self.lines = lines
+        self.namespace = namespace
+        self.dynamic = dynamic
+        self.parent = parent
+        self._block = None
+
+    @property
+    def text(self):
+        """
+        Get variable lines as text
+
+        :return: Variables string
+        :rtype: str
+        """
+        return '\n'.join(self.lines)
+
+    @property
+    def rootVars(self):
+        """
+        Get graph resolved variables
+
+        :return: Graph resolved variables
+        :rtype: ResolvedVars
+        """
+        resolved = self
+        while resolved.parent is not None:
+            resolved = resolved.parent
+        return resolved
+
+    def inheritedBlock(self):
+        """
+        Get variables of all parent nodes and this node, with node headers.
+        Result is stored, so siblings share their parents block.
+
+        :return: Variables string
+        :rtype: str
+        """
+        if self._block is None:
+            block = []
+            if self.parent is not None and self.parent.nodeName is not None:
+                block.append(self.parent.inheritedBlock())
+            block.extend(["#-- Node: %s --#" % self.nodeName, self.text])
+            self._block = '\n'.join(block)
+        return self._block
+
+    def parentsBlock(self):
+        """
+        Get variables of all parent nodes, with node headers
+
+        :return: Variables string
+        :rtype: str
+        """
+        if self.parent is None or self.parent.nodeName is None:
+            return ''
+        return self.parent.inheritedBlock()
+
+    def evalNamespace(self):
+        """
+        Get resolved values, runtime variables excluded
+
+        :return: Variables
+        :rtype: dict
+        """
+        namespace = dict(self.namespace)
+        for label in self.dynamic:
+            namespace.pop(label, None)
+        return namespace
+
+
+class VarResolver(object):
+    """
+    Resolve tree variables once per compilation: each item is resolved from its parent result,
+    siblings share their parents resolution
+
+    :param grapher: Main parent grapher
+    :type grapher: grapher.Grapher
+    """
+
+    def __init__(self, grapher):
+        self.grapher = grapher
+        self._root = None
+        self._resolved = dict()
+
+    def clear(self):
+        """
+        Clear resolved variables, needed when graph or node variables changed
+        """
+        self._root = None
+        self._resolved = dict()
+
+    @property
+    def root(self):
+        """
+        Get resolved internal and graph variables
+
+        :return: Graph resolved variables
+        :rtype: ResolvedVars
+        """
+        if self._root is None:
+            internalVar = self.grapher.internalVar
+            namespace = dict(internalVar)
+            namespace['__builtins__'] = _safeBuiltins
+            dynamic = set()
+            lines = self.resolveLines(graphNodes.Node.conformVarDict(self.grapher.variables), namespace, dynamic)
+            key = graphCache.CompileCache.key(sorted(internalVar.items()), self.grapher.variables)
+            self._root = ResolvedVars(None, key, lines, namespace, dynamic)
+        return self._root
+
+    def get(self, item):
+        """
+        Get given item resolved variables
+
+        :param item: Graph tree item
+        :type item: graphTree.GraphItem
+        :return: Item resolved variables
+        :rtype: ResolvedVars
+        """
+        if item in self._resolved:
+            return self._resolved[item]
+        #-- Get Unresolved Parents --#
+        items = [item]
+        parent = item._parent
+        while parent is not None and not parent in self._resolved:
+            items.append(parent)
+            parent = parent._parent
+        #-- Resolve From Top --#
+        for pItem in reversed(items):
+            if pItem._parent is None:
+                parentVars = self.root
+            else:
+                parentVars = self._resolved[pItem._parent]
+            self._resolved[pItem] = self.resolveItem(pItem, parentVars)
+        return self._resolved[item]
+
+    def resolveItem(self, item, parentVars):
+        """
+        Resolve given item variables from its parent variables
+
+        :param item: Graph tree item
+        :type item: graphTree.GraphItem
+        :param parentVars: Parent resolved variables
+        :type parentVars: ResolvedVars
+        :return: Item resolved variables
+        :rtype: ResolvedVars
+        """
+        node = item._node
+        varDict = node.nodeVariables[node.nodeVersion]
+        namespace = dict(parentVars.namespace)
+        dynamic = set(parentVars.dynamic)
+        if node.nodeType == 'purData':
+            lines = [graphNodes.Node.conformVarDict(varDict)]
+        else:
+            lines = self.resolveLines(graphNodes.Node.conformVarDict(varDict), namespace, dynamic)
+        #-- Loop Iterator Is Known At Runtime Only --#
+        iterator = None
+        if node.nodeType == 'loop':
+            iterator = node.nodeLoopParams[node.nodeVersion]['iterator']
+            dynamic.add(iterator)
+        #-- Children keys chain this key, so the iterator name reaches all of them --#
+        key = graphCache.CompileCache.key(parentVars.key, varDict, iterator)
+        return ResolvedVars(node.nodeName, key, lines, namespace, dynamic, parent=parentVars)
+
+    def resolveLines(self, varStr, namespace, dynamic):
+        """
+        Resolve given conformed variables, update namespace and dynamic names
+
+        :param varStr: Conformed variables (see graphNodes.Node.conformVarDict)
+        :type varStr: str
+        :param namespace: Resolved values, updated
+        :type namespace: dict
+        :param dynamic: Runtime variable names, updated
+        :type dynamic: set
+        :return: Resolved variable lines
+        :rtype: list
+        """
+        lines = []
+        for line in varStr.split('\n'):
+            if line:
+                lines.append(self.resolveLine(line, namespace, dynamic))
+        return lines
+
+    @staticmethod
+    def resolveLine(line, namespace, dynamic):
+        """
+        Resolve given variable line: 'eval' expressions become literals if all their names are resolved
+
+        :param line: Variable line
+        :type line: str
+        :param namespace: Resolved values, updated
+        :type namespace: dict
+        :param dynamic: Runtime variable names, updated
+        :type dynamic: set
+        :return: Resolved line
+        :rtype: str
+        """
+        label = _labelLine.match(line).group(1)
+        #-- Copy Inherited Mutable Value --#
+        if isinstance(namespace.get(label), (list, dict, set)):
+            namespace[label] = copy.deepcopy(namespace[label])
+        #-- Eval Expression --#
+        match = _evalLine.match(line) or _appendLine.match(line)
+        if match:
+            try:
+                code = compile(ast.literal_eval(match.group(2)), '<gpVar>', 'eval')
+            except (SyntaxError, ValueError):
+                dynamic.add(label)
+                return line
+            names = set(code.co_names)
+            if line.startswith('%s.append(' % label):
+                names.add(label)
+            if names & dynamic:
+                dynamic.add(label)
+                return line
+            try:
+                value = eval(code, namespace)
+                literal = ast.literal_eval(repr(value))
+                if not (type(literal) is type(value) and literal == value):
+                    raise ValueError("%s: not a literal value" % label)
+                if line.startswith('%s.append(' % label):
+                    newLine = "%s.append(%r)" % (label, value)
+                else:
+                    newLine = "%s = %r" % (label, value)
+                exec newLine in namespace
+            except Exception:
+                dynamic.add(label)
+                return line
+            dynamic.discard(label)
+            return newLine
+        #-- Literal Or Update Line --#
+        try:
+            code = compile(line, '<gpVar>', 'exec')
+        except SyntaxError:
+            dynamic.add(label)
+            return line
+        names = set(code.co_names)
+        if line.startswith('%s = ' % label):
+            names.discard(label)
+        if names & dynamic:
+            dynamic.add(label)
+            return line
+        try:
+            exec code in namespace
+            dynamic.discard(label)
+        except Exception:
+            dynamic.add(label)
+        return line
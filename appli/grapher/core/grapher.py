@@ -17,6 +17,10 @@ Get Node:
 ---------
 myItem = gp.tree.getItemFromNodeName('myNodeName_1')
 
+Rename Node:
+------------
+myItem.rename('myNewName_1')
+
 Parent Node:
 ------------
 myItem.setParent(GraphItem)
@@ -46,11 +50,13 @@ for item in gp.tree.allItems():
     print item._node.nodeName
 """
 
-import os, pprint
+import os, pprint, threading, subprocess, collections
 from appli import grapher
 from lib.env import studio
 from lib.system import procFile as pFile
-from appli.grapher.core import graphTree, graphNodes
+from appli.grapher.core import graphTree, graphNodes, graphScheduler, graphCache, graphVars, graphReport, grapherCmds
+from appli.grapher.core import graphLogStream
+from appli.grapher.core import graphFile as gFile
 
 
 class Grapher(object):
@@ -146,6 +152,26 @@ class Grapher(object):
         """
         return os.path.join('scripts', 'GP_%s' % self.graphName)
 
+    @property
+    def graphCheckFile(self):
+        """
+        Get Grapher loop checkpoint journal
+
+        :return: Grapher relative loop checkpoint journal
+        :rtype: str
+        """
+        return os.path.join(self.graphTmpPath, 'tmpFiles', 'loopChecks.jsonl')
+
+    @property
+    def graphResultFile(self):
+        """
+        Get Grapher node results journal
+
+        :return: Grapher relative node results journal
+        :rtype: str
+        """
+        return os.path.join(self.graphTmpPath, 'tmpFiles', 'nodeResults.jsonl')
+
     @property
     def internalVar(self):
         """
@@ -154,7 +180,7 @@ class Grapher(object):
         :return: Internal var
         :rtype: dict
         """
-        return dict(GP_USER=os.environ['Username'],
+        return dict(GP_USER=self.user,
                     GP_NAME=self.graphName,
                     GP_PATH=self.graphPath,
                     GP_FILE=self.graphFile,
@@ -186,16 +212,18 @@ class Grapher(object):
             return '\n'.join(graphTxt)
         return graphDict
 
-    def readDatas(self):
+    def readDatas(self, lazy=True):
         """
-        Read graph datas from graphFile
+        Read graph datas from graphFile (structured or legacy format)
 
+        :param lazy: Leave node scripts on disk until needed (structured format only)
+        :type lazy: bool
         :return: Grapher datas
         :rtype: dict
         """
         if self._graphFile is None:
             raise AttributeError("!!! 'graphFile' attribute not setted !!!")
-        return pFile.readPyFile(self.graphFullPath)
+        return gFile.readGraphFile(self.graphFullPath, lazy=lazy)
 
     def setComment(self, comment):
         """
@@ -228,23 +256,8 @@ class Grapher(object):
         #-- Check Index --#
         if not '_' in nodeName:
             nodeName = '%s_1' % nodeName
-        #-- Find Same Base Name --#
-        founds = []
-        for _nodeName in self.tree.allItems(asString=True):
-            if nodeName == _nodeName:
-                if not _nodeName in founds:
-                    founds.append(_nodeName)
-            elif _nodeName.startswith(nodeName.split('_')[0]):
-                if not _nodeName in founds:
-                    founds.append(_nodeName)
-        #-- Result: Name Is Unique --#
-        if not founds or not nodeName in founds:
-            return nodeName
-        #-- Result: Generate Unique Name --#
-        iList = []
-        for f in founds:
-            iList.append(int(f.split('_')[-1]))
-        return '%s_%s' % (nodeName.split('_')[0], (max(iList) + 1))
+        #-- Result --#
+        return self.tree.uniqueNodeName(nodeName)
 
     def createFolders(self, path, relative=True):
         """
@@ -287,12 +300,13 @@ class Grapher(object):
         self.log.info("Set graphFile: %s" % graphFile)
         self.graphFile = graphFile
         os.chdir(self.graphPath)
+        self.gpExec.nodeCompiler.cache.clear(scriptCache=False)
         #-- Set Graph Datas --#
         graphDatas = self.readDatas()
         self.setComment(graphDatas['graphDatas']['comment'])
         self.variables = graphDatas['graphDatas']['variables']
         #-- Build Tree --#
-        self.tree._topItems = []
+        self.tree.clear()
         self.tree.buildTree(graphDatas['treeDatas'])
         self.log.info("Parsing Done")
 
@@ -329,7 +343,10 @@ class Grapher(object):
             raise IOError("!!! GraphFile path not found: %s !!!" % self.graphPath)
         #-- Try To Save --#
         try:
-            pFile.writeFile(self.graphFullPath, self.getDatas(asString=True))
+            if gFile.isStructured(self.graphFullPath):
+                gFile.writeGraphFile(self.graphFullPath, self.getDatas()['graphDatas'], self.tree.allItems())
+            else:
+                pFile.writeFile(self.graphFullPath, self.getDatas(asString=True), atomic=True)
             self.log.info("Graph saved: %s" % self.graphFullPath)
             return True
         except:
@@ -348,10 +365,25 @@ class GrapherExec(object):
         self.grapher = grapher
         self.log = self.grapher.log
         self.nodeCompiler = NodeCompiler(self.grapher)
-
-    def execGraph(self, item=None, xTerm=True, wait=True):
+        self.workers = 1
+        self.pools = dict()
+        self.queue = None
+        self.queueToken = None
+        self.scheduler = None
+        self.logStreams = collections.OrderedDict()
+        self.streamLines = 20000
+        self.maxStreams = 5
+        self.warmMode = False
+        self.warmMaxTasks = 50
+        self.warmMaxRss = 0
+        self.memoMode = False
+        self.memoForce = False
+
+    def execGraph(self, item=None, xTerm=True, wait=True, workers=None, blocking=False):
         """
         Execute graph tree. If item is None, execute all active nodes.
+        If workers > 1, independent branches are launched in parallel by the scheduler,
+        tasks output is written in the log file.
 
         :param item: GraphItem to execute
         :type item: GraphItem
@@ -359,11 +391,17 @@ class GrapherExec(object):
         :type xTerm: bool
         :param wait: Wait at end
         :type wait: bool
+        :param workers: Max number of parallel processes (None = use self.workers)
+        :type workers: int
+        :param blocking: Scheduler mode only, wait until all tasks are done
+        :type blocking: bool
         :return: Log file full path
         :rtype: str
         """
         _date = pFile.getDate()
         _time = pFile.getTime()
+        if workers is None:
+            workers = self.workers
         #-- Init --#
         if item is None:
             self.log.info("########## EXEC GRAPH ##########", newLinesBefore=1)
@@ -372,10 +410,20 @@ class GrapherExec(object):
         self.log.info("Date: %s -- Time: %s" % (_date, _time))
         self.log.info("xTerm: %s" % xTerm)
         self.log.info("wait: %s" % wait)
+        self.log.info("workers: %s" % workers)
         #-- Compile --#
+        self.nodeCompiler.vars.clear()
         self.createProcessPaths()
         self.createScriptFiles()
         execFile, logFile = self.createProcessFiles(_date, _time)
+        if workers > 1:
+            self.scheduler = self.compileTasks(execFile, logFile, _date, _time, item=item, workers=workers)
+            self.log.info("#--- Launch Scheduler ---#", newLinesBefore=1)
+            if blocking:
+                self.scheduler.run()
+            else:
+                self.scheduler.start()
+            return logFile
         execTxt = self.execFileHeader(execFile, _date, _time)
         execTxt = self.nodeCompiler.collecteDatas(execTxt, item)
         execTxt += self.execFileEnder()
@@ -383,6 +431,85 @@ class GrapherExec(object):
         self.executeFile(execFile, logFile, xTerm, wait)
         return logFile
 
+    def runGraph(self, item=None, workers=None, echo=True):
+        """
+        Execute graph tree with the scheduler and wait until finished, without shell or terminal.
+        Tasks output is written in the log file, and printed if echo is True.
+
+        :param item: GraphItem to execute
+        :type item: GraphItem
+        :param workers: Max number of parallel processes (None = use self.workers)
+        :type workers: int
+        :param echo: Print tasks output
+        :type echo: bool
+        :return: Tasks exit codes (taskName: exitCode)
+        :rtype: dict
+        """
+        _date = pFile.getDate()
+        _time = pFile.getTime()
+        if workers is None:
+            workers = self.workers
+        #-- Init --#
+        self.log.info("########## RUN GRAPH ##########", newLinesBefore=1)
+        self.log.info("Date: %s -- Time: %s" % (_date, _time))
+        self.log.info("workers: %s" % workers)
+        #-- Compile --#
+        self.nodeCompiler.vars.clear()
+        self.createProcessPaths()
+        self.createScriptFiles()
+        execFile, logFile = self.createProcessFiles(_date, _time)
+        self.scheduler = self.compileTasks(execFile, logFile, _date, _time, item=item, workers=workers)
+        self.scheduler.echo = echo
+        #-- Run --#
+        self.log.info("#--- Launch Scheduler ---#", newLinesBefore=1)
+        return self.scheduler.run()
+
+    def explainNodes(self, item=None):
+        """
+        Get exec nodes dirty reason, without executing them (see grapherCmds.ResultMemo)
+
+        :param item: GraphItem to execute
+        :type item: GraphItem
+        :return: Nodes dirty reason (nodeName, reason), reason is None if node is up to date
+        :rtype: list
+        """
+        self.nodeCompiler.vars.clear()
+        memo = grapherCmds.ResultMemo(os.path.join(self.grapher.graphPath, self.grapher.graphResultFile),
+                                      force=self.memoForce, rootPath=self.grapher.graphPath)
+        result = []
+        rerun = set()
+        for execItem in self.nodeCompiler.getExecItems(item):
+            if not hasattr(execItem._node, 'execCommand'):
+                continue
+            nodeName = execItem._node.nodeName
+            if self.nodeCompiler.getParentLoops(execItem):
+                result.append((nodeName, "loop child, not memoized"))
+                rerun.add(nodeName)
+                continue
+            #-- Get Declared Files --#
+            resolvedVars = self.nodeCompiler.vars.get(execItem)
+            files = []
+            for label in self.nodeCompiler.memoLabels(execItem):
+                if label is not None and label in resolvedVars.dynamic:
+                    break
+                files.append(resolvedVars.namespace.get(label))
+            #-- Get Dirty Reason --#
+            upstream = self.nodeCompiler.memoUpstream(execItem)
+            if len(files) < 2:
+                reason = "declared files only known at runtime"
+            else:
+                reason = memo.check(nodeName, self.nodeCompiler.memoKey(execItem), upstream=upstream,
+                                    inputs=files[0], outputs=files[1])['reason']
+            if reason is None:
+                for upNode in upstream:
+                    if upNode in rerun:
+                        reason = "upstream node will run: %s" % upNode
+                        break
+            if reason is not None:
+                rerun.add(nodeName)
+            result.append((nodeName, reason))
+        return result
+
     def createProcessPaths(self):
         """
         Create process directories
@@ -397,16 +524,24 @@ class GrapherExec(object):
 
     def createScriptFiles(self):
         """
-        Create script files
+        Create script files. Only scripts whose node datas, inherited variables
+        or internal variables changed since last write are rewritten.
         """
         self.log.info("#--- create Script Files ---#", newLinesBefore=1)
+        cache = self.nodeCompiler.cache
+        written = 0
         for item in self.grapher.tree.allItems():
             if hasattr(item._node, 'nodeScript'):
-                self.log.detail("\t ---> %s" % item._node.nodeName)
+                resolvedVars = self.nodeCompiler.vars.get(item)
                 nodeScriptFile = os.path.join(self.grapher.graphScriptPath, '%s.py' % item._node.nodeName)
-                parents = item.allParents()
-                item._node.writeScript(nodeScriptFile, self.grapher.variables, parents)
-        self.log.detail("\t >>> Create script files done.")
+                scriptKey = cache.key(resolvedVars.parent.key, item._node.versionDatas())
+                if cache.scriptIsDirty(nodeScriptFile, scriptKey):
+                    self.log.detail("\t ---> %s", item._node.nodeName)
+                    item._node.writeScript(nodeScriptFile, resolvedVars)
+                    cache.setScriptKey(nodeScriptFile, scriptKey)
+                    written += 1
+        cache.saveScriptKeys()
+        self.log.detail("\t >>> Create script files done: %s written." % written)
 
     def createProcessFiles(self, _date, _time):
         """
@@ -420,13 +555,188 @@ class GrapherExec(object):
         :rtype: str && str
         """
         self.log.info("#--- Create Process Files ---#", newLinesBefore=1)
-        execFile = os.path.join(self.grapher.graphTmpPath, 'exec',
-                                '%s--%s--%s.py' % (self.grapher.user, _date, _time))
-        logFile = os.path.join(self.grapher.graphTmpPath, 'logs',
-                               '%s--%s--%s.txt' % (self.grapher.user, _date, _time))
+        execFile = os.path.join(self.grapher.graphTmpPath, 'exec', '%s.py' % self.runName(_date, _time))
+        logFile = os.path.join(self.grapher.graphTmpPath, 'logs', '%s.txt' % self.runName(_date, _time))
         self.log.detail("\t >>> Create process files done.")
         return execFile, logFile
 
+    def runName(self, _date, _time):
+        """
+        Get run name, used by exec, log and telemetry files
+
+        :param _date: Exec date (Y_M_D)
+        :type _date: str
+        :param _time: Exec time (H_M_S)
+        :type _time: str
+        :return: Run name
+        :rtype: str
+        """
+        return '%s--%s--%s' % (self.grapher.user, _date, _time)
+
+    def telemetryFile(self, runName):
+        """
+        Get run telemetry file, next to the run log file
+
+        :param runName: Run name
+        :type runName: str
+        :return: Telemetry file relative path
+        :rtype: str
+        """
+        return os.path.join(self.grapher.graphTmpPath, 'logs', '%s.jsonl' % runName)
+
+    def lastRunName(self):
+        """
+        Get last run name, from telemetry files
+
+        :return: Last run name (None if graph never ran)
+        :rtype: str
+        """
+        runFiles = graphReport.runFiles(os.path.join(self.grapher.graphTmpPath, 'logs'))
+        if runFiles:
+            return os.path.splitext(os.path.basename(runFiles[-1]))[0]
+
+    def resumeTasks(self, runName):
+        """
+        Get given run tasks, from its task manifest or its exec file
+
+        :param runName: Run name
+        :type runName: str
+        :return: Task manifest (tasks, workers, pools), tasks are dicts (taskName, cmd, depends, cwd, pool)
+        :rtype: dict
+        """
+        execPath = os.path.join(self.grapher.graphTmpPath, 'exec')
+        manifest = os.path.join(execPath, runName, 'tasks.py')
+        if os.path.exists(manifest):
+            return pFile.readDictFile(manifest)
+        execFile = os.path.join(execPath, '%s.py' % runName)
+        if not os.path.exists(execFile):
+            raise IOError("!!! Run exec files not found: %s !!!" % runName)
+        cmd = [os.path.normpath(graphNodes.pythonExe()), '-u',
+               os.path.normpath(os.path.join(self.grapher.graphPath, pFile.conformPath(execFile)))]
+        return dict(tasks=[dict(taskName=runName, cmd=cmd, depends=[], cwd=self.grapher.graphPath, pool='default')],
+                    workers=1, pools=dict())
+
+    def resumeGraph(self, runName=None, workers=None, echo=True, blocking=True):
+        """
+        Resume given run: its exec files (or the exec files of the first run it resumed) are launched again,
+        without compilation, so nodes see the same resolved variables. Nodes completed by the resumed runs
+        are skipped, loop iterations they claimed can be claimed again.
+
+        :param runName: Run to resume (None = last run)
+        :type runName: str
+        :param workers: Max number of parallel processes (None = run workers count)
+        :type workers: int
+        :param echo: Print tasks output
+        :type echo: bool
+        :param blocking: Wait until all tasks are done
+        :type blocking: bool
+        :return: Log file full path
+        :rtype: str
+        """
+        _date = pFile.getDate()
+        _time = pFile.getTime()
+        if runName is None:
+            runName = self.lastRunName()
+            if runName is None:
+                raise IOError("!!! No run to resume: %s !!!" % self.grapher.graphName)
+        #-- Get Resumed Runs --#
+        resumed = [runName]
+        telemetryFile = self.telemetryFile(runName)
+        if os.path.exists(telemetryFile):
+            for event in graphReport.readEvents(telemetryFile):
+                if event['event'] == 'runStart' and event.get('resume'):
+                    resumed = [str(r) for r in event['resume']] + resumed
+                    break
+        #-- Get Tasks From First Run --#
+        manifest = self.resumeTasks(resumed[0])
+        if workers is None:
+            workers = manifest['workers']
+        pools = dict(manifest['pools'])
+        pools.update(self.pools)
+        #-- Init --#
+        newRunName = self.runName(_date, _time)
+        logFile = os.path.join(self.grapher.graphTmpPath, 'logs', '%s.txt' % newRunName)
+        self.log.info("########## RESUME GRAPH ##########", newLinesBefore=1)
+        self.log.info("Date: %s -- Time: %s" % (_date, _time))
+        self.log.info("resume: %s" % runName)
+        self.log.info("workers: %s" % workers)
+        #-- Fill Scheduler --#
+        runArgs = ['--gp-run', newRunName, '--gp-resume', ','.join(resumed)]
+        self.scheduler = graphScheduler.Scheduler(workers=workers, pools=pools, logFile=logFile, log=self.log,
+                                                  echo=echo, queue=self.queue, queueToken=self.queueToken,
+                                                  stream=self.logStream(logFile))
+        for task in manifest['tasks']:
+            self.scheduler.addTask(graphScheduler.SchedulerTask(task['taskName'], list(task['cmd']) + runArgs,
+                                                                depends=task['depends'], cwd=task['cwd'],
+                                                                pool=task['pool'], remote=task.get('remote', False)))
+        #-- Run --#
+        self.log.info("#--- Launch Scheduler ---#", newLinesBefore=1)
+        if blocking:
+            self.scheduler.run()
+        else:
+            self.scheduler.start()
+        return logFile
+
+    def compileTasks(self, execFile, logFile, _date, _time, item=None, workers=4):
+        """
+        Compile one exec script per task and fill a new scheduler.
+        Loop packets are sent to the loop worker pool, others tasks to the 'default' pool.
+        Packets of 'remote' loops are run by the job queue workers if self.queue is set (see graphQueue).
+
+        :param execFile: ExecFile full path, used as task exec files prefix
+        :type execFile: str
+        :param logFile: LogFile full path
+        :type logFile: str
+        :param _date: Exec date (Y_M_D)
+        :type _date: str
+        :param _time: Exec time (H_M_S)
+        :type _time: str
+        :param item: GraphItem to execute
+        :type item: graphTree.GraphItem
+        :param workers: Max number of parallel processes
+        :type workers: int
+        :return: Scheduler filled with graph tasks
+        :rtype: graphScheduler.Scheduler
+        """
+        self.log.info("#--- Compile Tasks ---#", newLinesBefore=1)
+        scheduler = graphScheduler.Scheduler(workers=workers, pools=self.pools, logFile=logFile, log=self.log,
+                                             queue=self.queue, queueToken=self.queueToken,
+                                             stream=self.logStream(logFile))
+        taskPath = os.path.splitext(execFile)[0]
+        self.grapher.createFolders(taskPath)
+        manifest = dict(workers=workers, pools=dict(self.pools), tasks=[])
+        for task in self.nodeCompiler.collecteTasks(item):
+            taskFile = os.path.join(taskPath, '%s.py' % task['taskName'])
+            taskTxt = self.execFileHeader(taskFile, _date, _time)
+            if task['outerIter'] is None:
+                taskTxt += self.nodeCompiler.parentsDatas(task['taskItem'])
+            else:
+                taskTxt += self.nodeCompiler.outerIterDatas(task)
+            for _item in task['items']:
+                if _item == task['taskItem']:
+                    taskTxt += self.nodeCompiler.itemDatas(_item, iters=task['iters'])
+                else:
+                    taskTxt += self.nodeCompiler.itemDatas(_item)
+            taskTxt += self.taskFileEnder()
+            self.writeExecFile(taskFile, taskTxt)
+            cmd = [os.path.normpath(graphNodes.pythonExe()), '-u',
+                   os.path.normpath(os.path.join(self.grapher.graphPath, pFile.conformPath(taskFile)))]
+            node = task['taskItem']._node
+            remote = node.nodeType == 'loop' and bool(node.nodeLoopParams[node.nodeVersion].get('remote'))
+            scheduler.addTask(graphScheduler.SchedulerTask(task['taskName'], cmd, depends=list(task['depends']),
+                                                           cwd=self.grapher.graphPath, pool=task['pool'],
+                                                           remote=remote))
+            manifest['tasks'].append(dict(taskName=task['taskName'], cmd=cmd, depends=list(task['depends']),
+                                          cwd=self.grapher.graphPath, pool=task['pool'], remote=remote))
+            self.log.detail("\t ---> Task %s (pool: %s, remote: %s, depends: %s)", task['taskName'], task['pool'],
+                            remote, task['depends'])
+        try:
+            pFile.writeDictFile(os.path.join(taskPath, 'tasks.py'), manifest)
+        except:
+            self.log.warning("!!! Can not write task manifest, run can not be resumed: %s !!!" % taskPath)
+        self.log.detail("\t >>> Compile tasks done.")
+        return scheduler
+
     def execFileHeader(self, execFile, _date, _time):
         """
         Store exec script header
@@ -465,17 +775,31 @@ class GrapherExec(object):
                        "os.chdir('%s')" % self.grapher.graphPath,
                        "print '--->', os.getcwd()"])
         #-- Internal Var --#
+        logsPath = pFile.conformPath(os.path.join(self.grapher.graphTmpPath, 'logs'))
         header.extend(["print ''", "print '#--- Set Grapher Internal Var ---#'"])
         for k, v in self.grapher.internalVar.iteritems():
             header.append("%s = %r" % (k, v))
-        header.extend(["gpCmds = grapherCmds",
+        header.extend(["GP_ARGS = dict(zip(sys.argv[1::2], sys.argv[2::2]))",
+                       "GP_RUN = GP_ARGS.get('--gp-run', %r)" % self.runName(_date, _time),
+                       "GP_RESUME = [r for r in GP_ARGS.get('--gp-resume', '').split(',') if r]",
+                       "gpCmds = grapherCmds",
+                       "gpChecks = grapherCmds.CheckJournal(%r, runId=GP_RUN, ignoreRuns=GP_RESUME)" % (
+                           pFile.conformPath(self.grapher.graphCheckFile)),
+                       "gpTelemetry = grapherCmds.Telemetry(os.path.join(%r, '%%s.jsonl' %% GP_RUN))" % logsPath,
+                       "gpResume = grapherCmds.ResumeJournal([os.path.join(%r, '%%s.jsonl' %% r) for r in GP_RESUME])" % (
+                           logsPath),
+                       "gpWarm = grapherCmds.WarmPool(maxTasks=%s, maxRss=%s)" % (self.warmMaxTasks, self.warmMaxRss),
+                       "gpMemo = grapherCmds.ResultMemo(%r, force=%s)" % (pFile.conformPath(self.grapher.graphResultFile),
+                                                                          self.memoForce),
                        "print '---> Grapher internal variables setted'"])
         #-- Graph Var --#
         header.extend(["print ''", "print '#--- Set Graph Var ---#'",
-                       graphNodes.Node.conformVarDict(self.grapher.variables),
+                       self.nodeCompiler.vars.root.text,
                        "print '---> Graph variables setted'"])
         #-- Start Duration --#
-        header.append("GP_START_TIME = time.time()")
+        header.extend(["GP_START_TIME = time.time()", "GP_EXIT_CODE = 0",
+                       "gpTelemetry.event('runStart', graph=GP_NAME, execFile=%r, run=GP_RUN, resume=GP_RESUME)" % (
+                           pFile.conformPath(execFile))])
         #-- Result --#
         self.log.detail("\t >>> Init exec script done.")
         return '\n'.join(header)
@@ -495,9 +819,23 @@ class GrapherExec(object):
                   "print '%s GRAPHER END %s'" % ('=' * 20, '=' * 20),
                   "print '%s%s%s'" % ('=' * 20, '=' * 13, '=' * 20),
                   "print 'Date: %s -- Time: %s' % (procFile.getDate(), procFile.getTime())",
-                  "print 'Duration: %s' % procFile.secondsToStr(time.time() - GP_START_TIME)"]
+                  "print 'Duration: %s' % procFile.secondsToStr(time.time() - GP_START_TIME)",
+                  "gpTelemetry.event('runEnd', exit=GP_EXIT_CODE, duration=time.time() - GP_START_TIME)",
+                  "gpWarm.close()"]
         return '\n'.join(header)
 
+    @staticmethod
+    def taskFileEnder():
+        """
+        Store task script last lines
+
+        :return: Task end lines
+        :rtype: str
+        """
+        return '\n'.join(["\nprint ''",
+                          "gpTelemetry.event('runEnd', exit=GP_EXIT_CODE, duration=time.time() - GP_START_TIME)",
+                          "gpWarm.close()", "sys.exit(GP_EXIT_CODE)"])
+
     def writeExecFile(self, execFile, execTxt):
         """
         Write exec file
@@ -531,9 +869,31 @@ class GrapherExec(object):
         self.log.info("#--- Launch Exec File ---#", newLinesBefore=1)
         cmd = self.execCommand(execFile, logFile, xTerm=xTerm, wait=wait)
         self.log.info("cmd: %s" % cmd)
-        os.system(cmd)
+        proc = subprocess.Popen(cmd, shell=True, close_fds=not os.name == 'nt')
+        #-- Stream Log File: Process Writes It, Tail Ends With Process --#
+        if not xTerm or not os.name == 'nt':
+            ended = threading.Event()
+            waiter = threading.Thread(target=lambda: (proc.wait(), ended.set()), name='GrapherExecWait')
+            waiter.daemon = True
+            waiter.start()
+            self.logStream(logFile).follow(stop=ended)
         self.log.detail("\t >>> Exec file launched.")
 
+    def logStream(self, logFile):
+        """
+        Get given log file stream, new streams replace the oldest ones above maxStreams
+
+        :param logFile: Log file full path
+        :type logFile: str
+        :return: Log stream
+        :rtype: graphLogStream.LogStream
+        """
+        if not logFile in self.logStreams:
+            self.logStreams[logFile] = graphLogStream.LogStream(logFile, maxLines=self.streamLines)
+            while len(self.logStreams) > self.maxStreams:
+                self.logStreams.popitem(last=False)[1].stop()
+        return self.logStreams[logFile]
+
     def execCommand(self, execFile, logFile, xTerm=True, wait=True):
         """
         Get exec command
@@ -550,10 +910,16 @@ class GrapherExec(object):
         :rtype: str
         """
         cmd = ''
+        #-- Posix: Own Process Writing Log File --#
+        if not os.name == 'nt':
+            cmd += '"%s" -u ' % graphNodes.pythonExe()
+            cmd += '"%s" ' % os.path.normpath(os.path.join(self.grapher.graphPath, pFile.conformPath(execFile)))
+            cmd += '>>"%s" 2>&1' % logFile
+            return cmd
         #-- Start Options --#
         cmd += 'start "%s" ' % self.grapher.graphFile
         if not xTerm:
-            cmd += '/B '
+            cmd += '/B /WAIT '
         #-- Batch Options --#
         cmd += '"%s" ' % os.path.normpath(self.grapher.studio.cmdExe)
         if wait:
@@ -564,7 +930,7 @@ class GrapherExec(object):
         else:
             cmd += '/C '
         #-- Command Options --#
-        cmd += '"%s ' % os.path.normpath(self.grapher.studio.python27)
+        cmd += '"%s ' % os.path.normpath(graphNodes.pythonExe())
         cmd += '%s" ' % os.path.normpath(os.path.join(self.grapher.graphPath, pFile.conformPath(execFile)))
         #-- Log File --#
         if not xTerm:
@@ -584,6 +950,8 @@ class NodeCompiler(object):
     def __init__(self, grapher):
         self.grapher = grapher
         self.log = self.grapher.log
+        self.cache = graphCache.CompileCache(self.grapher)
+        self.vars = graphVars.VarResolver(self.grapher)
 
     @staticmethod
     def getParentLoops(item):
@@ -602,10 +970,9 @@ class NodeCompiler(object):
         loopNodes.reverse()
         return loopNodes
 
-    @staticmethod
-    def getVarsStr(item, tab):
+    def getVarsStr(self, item, tab):
         """
-        Get readable variable string text
+        Get readable variable string text, resolved from parents variables
 
         :param item: GraphItem to execute
         :type item: graphTree.GraphItem
@@ -614,7 +981,7 @@ class NodeCompiler(object):
         :return: Variable string
         :rtype: str
         """
-        varDict = graphNodes.Node.conformVarDict(item._node.nodeVariables[item._node.nodeVersion])
+        varDict = self.vars.get(item).text
         if not tab:
             return varDict
         else:
@@ -653,11 +1020,27 @@ class NodeCompiler(object):
         :rtype: str
         """
         self.log.info("#--- Collecte Datas ---#", newLinesBefore=1)
-        nodeTxt = execTxt
+        nodeTxt = [execTxt]
+        #-- Parse Graph Items --#
+        for item in self.getExecItems(item):
+            nodeTxt.append(self.itemDatas(item))
+        #-- Result --#
+        self.log.detail("\t >>> Collecte datas done.")
+        return ''.join(nodeTxt)
+
+    def getExecItems(self, item=None):
+        """
+        Get items to store in exec script, in execution order
+
+        :param item: GraphItem to execute
+        :type item: graphTree.GraphItem
+        :return: Items to execute
+        :rtype: list
+        """
         #-- Get Graph Items --#
         if item is None:
             self.log.detail("\t Mode Graph")
-            graphItems = self.grapher.tree.allItems()
+            graphItems = self.grapher.tree.activeItems()
             force = False
         else:
             self.log.detail("\t Mode Node")
@@ -665,20 +1048,353 @@ class NodeCompiler(object):
             graphItems.reverse()
             graphItems.append(item)
             force =True
-        #-- Parse Graph Items --#
+        #-- Filter Graph Items --#
+        execItems = []
         for item in graphItems:
             if item._node.nodeIsActive:
                 if not hasattr(item._node, 'nodeExecMode') or not item._node.nodeExecMode[item._node.nodeVersion] or force:
                     if not item._node.nodeType == 'purData':
-                        nodeTxt += self.nodeHeader(item)
-                        if hasattr(item._node, 'nodeLoopParams'):
-                            nodeTxt += self.loopDatas(item)
-                        if hasattr(item._node, 'execCommand'):
-                            nodeTxt += self.execFileDatas(item)
-        #-- Result --#
-        self.log.detail("\t >>> Collecte datas done.")
+                        execItems.append(item)
+        return execItems
+
+    def itemDatas(self, item, iters=None):
+        """
+        Get given item exec datas
+
+        :param item: GraphItem to execute
+        :type item: graphTree.GraphItem
+        :param iters: Force loop values (packet)
+        :type iters: list
+        :return: Item exec string
+        :rtype: str
+        """
+        #-- Get Cached Fragment --#
+        loopNodes = []
+        for loop in self.getParentLoops(item):
+            loopNodes.append((loop._node.nodeName, loop._node.nodeLoopParams[loop._node.nodeVersion]))
+        #-- Ancestor names are embedded too (memo upstream nodes) --#
+        parentNodes = [pItem._node.nodeName for pItem in item.allParents()]
+        key = self.cache.key(self.vars.get(item).key, item._node.versionDatas(), loopNodes, parentNodes, iters,
+                             self.grapher.graphTmpPath, os.path.realpath(self.grapher.graphScriptPath),
+                             self.grapher.gpExec.warmMode, self.grapher.gpExec.memoMode,
+                             self.grapher.gpExec.memoForce)
+        if iters is None:
+            fragmentName = item._node.nodeName
+        else:
+            fragmentName = '%s%r' % (item._node.nodeName, list(iters))
+        nodeTxt = self.cache.getFragment(fragmentName, key)
+        if nodeTxt is not None:
+            return nodeTxt
+        #-- Compile Fragment --#
+        self.log.detail("\t ---> Compile %s", item._node.nodeName)
+        nodeTxt = self.nodeHeader(item)
+        if hasattr(item._node, 'nodeLoopParams'):
+            nodeTxt += self.loopDatas(item, iters=iters)
+        if hasattr(item._node, 'execCommand'):
+            nodeTxt += self.execFileDatas(item)
+        self.cache.setFragment(fragmentName, key, nodeTxt)
         return nodeTxt
 
+    def collecteTasks(self, item=None):
+        """
+        Split exec items into scheduler tasks.
+        A loop node and all its children make one task, an executable node outside loops makes one task.
+        Loops with a packet size make one task per packet, sent to the loop pool,
+        their nested loops with a packet size make one task per outer value and inner packet.
+        Each task depends on its nearest parent task.
+
+        :param item: GraphItem to execute
+        :type item: graphTree.GraphItem
+        :return: Tasks (taskName, taskItem, items, depends, iters, pool, outerIter)
+        :rtype: list
+        """
+        self.log.info("#--- Collecte Tasks ---#", newLinesBefore=1)
+        tasks = []
+        taskDict = dict()
+        for execItem in self.getExecItems(item):
+            loopNodes = self.getParentLoops(execItem)
+            #-- Loop Child: Add To Loop Task --#
+            if loopNodes:
+                if loopNodes[0] in taskDict:
+                    taskDict[loopNodes[0]]['items'].append(execItem)
+                continue
+            #-- New Task --#
+            if execItem._node.nodeType == 'loop' or hasattr(execItem._node, 'execCommand'):
+                depends = []
+                for pItem in execItem.allParents():
+                    if pItem in taskDict:
+                        depends = taskDict[pItem]['taskNames']
+                        break
+                taskDict[execItem] = dict(taskName=execItem._node.nodeName, taskItem=execItem, items=[execItem],
+                                          depends=depends, iters=None, pool='default', outerIter=None,
+                                          taskNames=[execItem._node.nodeName])
+                tasks.append(taskDict[execItem])
+        #-- Split Loop Packets --#
+        for task in list(tasks):
+            if task['taskItem']._node.nodeType == 'loop':
+                self.splitPackets(task, tasks)
+        #-- Result --#
+        self.log.detail("\t >>> Collecte tasks done: %s tasks." % len(tasks))
+        return tasks
+
+    def splitPackets(self, task, tasks):
+        """
+        Replace given loop task with one task per loop packet
+
+        :param task: Loop task
+        :type task: dict
+        :param tasks: All tasks
+        :type tasks: list
+        """
+        node = task['taskItem']._node
+        try:
+            packets = node.loopPackets(self.itemNamespace(task['taskItem']))
+        except Exception, err:
+            self.log.warning("%s ---> Exec %s as one task." % (err, node.nodeName))
+            return
+        if not packets:
+            return
+        index = tasks.index(task)
+        tasks.pop(index)
+        task['taskNames'][:] = []
+        for n, packet in enumerate(packets):
+            taskName = '%s.p%s' % (node.nodeName, n)
+            task['taskNames'].append(taskName)
+            tasks.insert(index + n, dict(taskName=taskName, taskItem=task['taskItem'], items=task['items'],
+                                         depends=task['depends'], iters=packet,
+                                         pool=node.nodeLoopParams[node.nodeVersion]['pool'], outerIter=None,
+                                         taskNames=task['taskNames']))
+        self.log.detail("\t ---> %s: %s packets", node.nodeName, len(packets))
+        #-- Flatten Nested Loops --#
+        for packetTask in tasks[index:index + len(packets)]:
+            self.flattenLoops(packetTask, tasks)
+
+    def flattenLoops(self, task, tasks):
+        """
+        Move nested loops of given loop packet task into their own tasks, one per outer value and inner packet.
+        Inner tasks depend on the outer packet task, their loop values are evaluated for each outer value.
+        Nested loops that can't be split stay in the outer task.
+
+        :param task: Loop packet task
+        :type task: dict
+        :param tasks: All tasks
+        :type tasks: list
+        """
+        loopItem = task['taskItem']
+        index = tasks.index(task) + 1
+        for innerItem in task['items']:
+            if not innerItem._node.nodeType == 'loop' or not self.getParentLoops(innerItem)[-1:] == [loopItem]:
+                continue
+            innerNode = innerItem._node
+            innerItems = [i for i in task['items'] if i == innerItem or innerItem in i.allParents()]
+            innerTasks = []
+            try:
+                for v, value in enumerate(task['iters']):
+                    packets = innerNode.loopPackets(self.loopNamespace(innerItem, loopItem, value))
+                    if not packets:
+                        raise ValueError("!!! %s: loop can not be split !!!" % innerNode.nodeName)
+                    for n, packet in enumerate(packets):
+                        taskName = '%s.v%s.%s.p%s' % (task['taskName'], v, innerNode.nodeName, n)
+                        innerTasks.append(dict(taskName=taskName, taskItem=innerItem, items=innerItems,
+                                               depends=[task['taskName']], iters=packet,
+                                               pool=innerNode.nodeLoopParams[innerNode.nodeVersion]['pool'],
+                                               outerIter=(loopItem, value), taskNames=[taskName]))
+            except Exception, err:
+                self.log.warning("%s ---> Exec %s in %s." % (err, innerNode.nodeName, task['taskName']))
+                continue
+            task['items'] = [i for i in task['items'] if not i in innerItems]
+            tasks[index:index] = innerTasks
+            index += len(innerTasks)
+            self.log.detail("\t ---> %s: %s nested tasks", task['taskName'], len(innerTasks))
+
+    def loopNamespace(self, item, loopItem, value):
+        """
+        Get variables seen by given nested loop for given outer loop value:
+        variables lines between outer loop and nested loop are executed with outer iterator value
+
+        :param item: Nested loop item
+        :type item: graphTree.GraphItem
+        :param loopItem: Outer loop item
+        :type loopItem: graphTree.GraphItem
+        :param value: Outer loop value
+        :type value: object
+        :return: Variables
+        :rtype: dict
+        """
+        namespace = self.vars.get(loopItem).evalNamespace()
+        namespace['__builtins__'] = dict(namespace.get('__builtins__', {}), eval=eval)
+        namespace[loopItem._node.nodeLoopParams[loopItem._node.nodeVersion]['iterator']] = value
+        parents = []
+        pItem = item
+        while not pItem == loopItem:
+            parents.insert(0, pItem)
+            pItem = pItem._parent
+        for pItem in parents:
+            exec self.vars.get(pItem).text in namespace
+        return namespace
+
+    def outerIterDatas(self, task):
+        """
+        Get outer loop datas of a nested loop task: outer iterator value, parents variables
+        and outer loop command forced to this value, so nested loop fragments keep their indentation
+
+        :param task: Nested loop task
+        :type task: dict
+        :return: Outer loop string
+        :rtype: str
+        """
+        loopItem, value = task['outerIter']
+        loopNode = loopItem._node
+        iterator = loopNode.nodeLoopParams[loopNode.nodeVersion]['iterator']
+        loopTxt = ["\nprint ''", "print '#--- Set Outer Loop Iter ---#'",
+                   "LoopNode = %r" % loopNode.nodeName, "Iterator = %r" % iterator,
+                   "Iter = %r" % value, "%s = %r" % (iterator, value),
+                   "print 'LoopNode: %s -- Iter:', Iter" % loopNode.nodeName,
+                   self.parentsDatas(task['taskItem']),
+                   "%s%s" % (self.getTab(loopItem), loopNode.loopCommand(iters=[value]))]
+        return '\n'.join(loopTxt)
+
+    def itemNamespace(self, item):
+        """
+        Get variables seen by given item at exec time (internal, graph, parents and node variables)
+
+        :param item: GraphItem to execute
+        :type item: graphTree.GraphItem
+        :return: Variables
+        :rtype: dict
+        """
+        return self.vars.get(item).evalNamespace()
+
+    def parentsDatas(self, item):
+        """
+        Get given item parents variables, needed when item is launched alone
+
+        :param item: GraphItem to execute
+        :type item: graphTree.GraphItem
+        :return: Parents variables string
+        :rtype: str
+        """
+        varTxt = ["\nprint ''", "print '#--- Set Parents Var ---#'", self.vars.get(item).parentsBlock()]
+        varTxt.append("print '---> Parents variables setted'")
+        return '\n'.join(varTxt)
+
+    def memoKey(self, item):
+        """
+        Get given item memo compile key: node version datas and resolved variables
+
+        :param item: GraphItem to execute
+        :type item: graphTree.GraphItem
+        :return: Memo compile key
+        :rtype: str
+        """
+        return self.cache.key(self.vars.get(item).key, item._node.versionDatas())
+
+    @staticmethod
+    def memoUpstream(item):
+        """
+        Get given item upstream executable nodes
+
+        :param item: GraphItem to execute
+        :type item: graphTree.GraphItem
+        :return: Upstream node names
+        :rtype: list
+        """
+        upstream = []
+        for pItem in item.allParents():
+            if hasattr(pItem._node, 'execCommand'):
+                upstream.append(pItem._node.nodeName)
+        return upstream
+
+    @staticmethod
+    def memoLabels(item):
+        """
+        Get given item declared files variable labels: 'GP_INPUTS' and 'GP_OUTPUTS',
+        if declared by the node itself
+
+        :param item: GraphItem to execute
+        :type item: graphTree.GraphItem
+        :return: Inputs label, outputs label (None if not declared)
+        :rtype: list
+        """
+        labels = []
+        for varDict in item._node.nodeVariables[item._node.nodeVersion].values():
+            if varDict['state']:
+                labels.append(varDict['label'])
+        return [label if label in labels else None for label in ['GP_INPUTS', 'GP_OUTPUTS']]
+
+    def memoDatas(self, item, execTxt):
+        """
+        Wrap given node exec lines with a result memo check: exec is skipped if node is up to date
+
+        :param item: GraphItem to execute
+        :type item: graphTree.GraphItem
+        :param execTxt: Node exec lines
+        :type execTxt: list
+        :return: Memo exec lines
+        :rtype: list
+        """
+        inputs, outputs = self.memoLabels(item)
+        memoTxt = ["\nGP_MEMO = gpMemo.check(%r, %r, upstream=%r, inputs=%s, outputs=%s)" % (
+                       item._node.nodeName, self.memoKey(item), self.memoUpstream(item), inputs, outputs),
+                   "if GP_MEMO['reason'] is None:",
+                   "    print '---> Up to date, skip exec:', GP_MEMO['fingerprint']",
+                   "    GP_NODE_EXIT = 0",
+                   "    gpTelemetry.event('nodeSkip', node=%r, fingerprint=GP_MEMO['fingerprint'])" % (
+                       item._node.nodeName),
+                   "else:",
+                   "    print '---> Dirty:', GP_MEMO['reason']"]
+        memoTxt.extend(self.indentLines(execTxt))
+        memoTxt.append("    gpMemo.record(GP_MEMO, GP_NODE_EXIT)")
+        return memoTxt
+
+    def resumeDatas(self, item, execTxt):
+        """
+        Wrap given node exec lines with a resume check: exec is skipped if node was completed by a resumed run
+
+        :param item: GraphItem to execute
+        :type item: graphTree.GraphItem
+        :param execTxt: Node exec lines
+        :type execTxt: list
+        :return: Resume exec lines
+        :rtype: list
+        """
+        tab = self.getTab(item)
+        iters = self.getItersStr(item)
+        resumeTxt = ["\n%sif gpResume.isDone(%r, %s):" % (tab, item._node.nodeName, iters),
+                     "%s    print '---> Completed by resumed run, skip exec'" % tab,
+                     "%s    GP_NODE_EXIT = 0" % tab,
+                     "%s    gpTelemetry.event('nodeResume', node=%r, iters=%s)" % (tab, item._node.nodeName, iters),
+                     "%selse:" % tab]
+        resumeTxt.extend(self.indentLines(execTxt))
+        return resumeTxt
+
+    @staticmethod
+    def indentLines(lines):
+        """
+        Indent given exec lines
+
+        :param lines: Exec lines (can contain line breaks)
+        :type lines: list
+        :return: Indented exec lines
+        :rtype: list
+        """
+        return ['\n'.join(["    %s" % l for l in line.split('\n')]) for line in lines]
+
+    def getItersStr(self, item):
+        """
+        Get parent loops current iter string, evaluated at exec time
+
+        :param item: GraphItem to execute
+        :type item: graphTree.GraphItem
+        :return: Iters string ('None' if item is not in a loop)
+        :rtype: str
+        """
+        loopNodes = self.getParentLoops(item)
+        if not loopNodes:
+            return 'None'
+        iterators = [loop._node.nodeLoopParams[loop._node.nodeVersion]['iterator'] for loop in loopNodes]
+        return '[%s]' % ', '.join(iterators)
+
     def nodeHeader(self, item):
         """
         Get node header
@@ -699,35 +1415,36 @@ class NodeCompiler(object):
                   "%sprint ''" % tab, "%sprint '#--- Set Node Var ---#'" % tab,
                   varStr,
                   "%sprint '---> Node variables setted'" % tab, "%sprint ''" %tab,
-                  "%sGP_NODE_START_TIME = time.time()" % tab]
+                  "%sGP_NODE_START_TIME = time.time()" % tab,
+                  "%sgpTelemetry.event('nodeStart', node=%r)" % (tab, item._node.nodeName)]
         return '\n'.join(header)
 
-    def loopDatas(self, item):
+    def loopDatas(self, item, iters=None):
         """
         Store loop params
 
         :param item: GraphItem to execute
         :type item: graphItem.GraphItem
+        :param iters: Force loop values (packet)
+        :type iters: list
         :return: loop string
         :rtype: str
         """
         tab = self.getTab(item)
         iterator = item._node.nodeLoopParams[item._node.nodeVersion]['iterator']
-        checkFile = item._node.nodeLoopParams[item._node.nodeVersion]['checkFiles']
-        tmpPath = pFile.conformPath(os.path.join(self.grapher.graphTmpPath, 'tmpFiles'))
-        tmpFile = "procFile.conformPath(os.path.join('%s', '%s.' + str(%s) + '.py'))" % (tmpPath, checkFile, iterator)
+        checkName = item._node.nodeLoopParams[item._node.nodeVersion]['checkFiles']
         loopTxt = ["\n%sprint '#--- Set Loop Params ---#'" % tab,
-                   "%s%s" % (tab, item._node.loopCommand()),
+                   "%s%s" % (tab, item._node.loopCommand(iters=iters)),
                    "%s    print ''" % tab, "%s    print ''" % tab,
                    "%s    print '%s'" % (tab, '-' * 80),
                    "%s    print 'LoopNode: %s'" % (tab, item._node.nodeName),
                    "%s    print 'Iterator: %s'" % (tab, iterator),
                    "%s    print 'Iter:', %s" % (tab, iterator),
                    "%s    print '%s'" % (tab, '-' * 80),
-                   "%s    %s_tmpFile = %s" % (tab, item._node.nodeName, tmpFile),
-                   "%s    result = gpCmds.makeCheckFile(%s_tmpFile, %r, %r, %s)" % (tab, item._node.nodeName,
-                                                                                    item._node.nodeName,
-                                                                                    iterator, iterator)]
+                   "%s    result = gpChecks.claim(%r, %r, %r, %s, outerIters=%s)" % (
+                       tab, checkName, item._node.nodeName, iterator, iterator, self.getItersStr(item)),
+                   "%s    gpTelemetry.event('iter', node=%r, iter=%s, skipped=(result == 'exists'))" % (
+                       tab, item._node.nodeName, iterator)]
         if not item._node.nodeLoopParams[item._node.nodeVersion]['type'] == 'Single':
             loopTxt.extend(["%s    if result == 'exists':" % tab,
                             "%s        continue" % tab])
@@ -760,13 +1477,14 @@ class NodeCompiler(object):
         #-- Mode Loop --#
         else:
             #-- Get Loop File Info --#
-            loopChecks = "["
+            loopIters = "["
             launchFile = '"%s' % os.path.join(os.path.realpath(self.grapher.graphTmpPath), 'launcher')
             launchFile += '/%s' % item._node.nodeName
             for loop in loopNodes:
-                loopChecks += " %s_tmpFile," % loop._node.nodeName
-                launchFile += '." + str(%s) + "' % loop._node.nodeLoopParams[loop._node.nodeVersion]['iterator']
-            loopChecks += " ]"
+                loopIterator = loop._node.nodeLoopParams[loop._node.nodeVersion]['iterator']
+                loopIters += " (%r, %r, %s)," % (loop._node.nodeName, loopIterator, loopIterator)
+                launchFile += '." + str(%s) + "' % loopIterator
+            loopIters += " ]"
             #-- Create Launcher --#
             if melFileNeeded:
                 #-- Create Sequential Mel Launcher --#
@@ -781,13 +1499,29 @@ class NodeCompiler(object):
             #-- Edit Node Exec Launcher --#
             nodeTxt.extend(["%slaunchFile = %s" % (tab, pFile.conformPath(launchFile)),
                             "%sprint 'Create launcher file %s'" % (tab, pFile.conformPath(launchFile)),
-                            "%sgpCmds.makeLauncher(launchFile, %r, loopChecks=%s)" % (tab,
-                                                                                pFile.conformPath(nodeScriptFile),
-                                                                                loopChecks)])
+                            "%sgpCmds.makeLauncher(launchFile, %r, loopIters=%s)" % (tab,
+                                                                               pFile.conformPath(nodeScriptFile),
+                                                                               loopIters)])
+        #-- Warm Worker Command --#
+        execCmd = "gpCmds.execStatus(%s)" % nodeCmd
+        if self.grapher.gpExec.warmMode and hasattr(item._node, 'warmLauncher') and not melFileNeeded:
+            launcher = item._node.warmLauncher()
+            if launcher is not None:
+                if loopNodes:
+                    execCmd = "gpWarm.run(%r, launchFile)" % pFile.conformPath(launcher)
+                else:
+                    execCmd = "gpWarm.run(%r, %r)" % (pFile.conformPath(launcher), pFile.conformPath(nodeScriptFile))
+                nodeCmd = execCmd
         #-- Edit Node Exec Command --#
-        nodeTxt.extend(["\n%sprint ''" % tab, "%sprint '#--- Exec Cmd ---#'" % tab,
-                        "%sprint %r" % (tab, pFile.conformPath(nodeCmd)),
-                        "%sprint ''" % tab, "%s%s" % (tab, nodeCmd)])
+        execTxt = ["\n%sprint ''" % tab, "%sprint '#--- Exec Cmd ---#'" % tab,
+                   "%sprint %r" % (tab, pFile.conformPath(nodeCmd)),
+                   "%sprint ''" % tab, "%sGP_NODE_EXIT = %s" % (tab, execCmd),
+                   "%sif GP_NODE_EXIT:" % tab, "%s    GP_EXIT_CODE = GP_NODE_EXIT" % tab]
+        #-- Result Memo: Nodes Outside Loops Only --#
+        if self.grapher.gpExec.memoMode and not loopNodes:
+            execTxt = self.memoDatas(item, execTxt)
+        #-- Resume: Skip Nodes Completed By Resumed Runs --#
+        nodeTxt.extend(self.resumeDatas(item, execTxt))
         #-- Node Exec Timer --#
         nodeTxt.append(self.nodeEnder(item))
         #-- Result --#
@@ -805,7 +1539,12 @@ class NodeCompiler(object):
         tab = self.getTab(item)
         dateLine = "print 'Date: %s -- Time: %s' % (procFile.getDate(), procFile.getTime())"
         timeLine = "print 'Duration: %s' % procFile.secondsToStr(time.time() - GP_NODE_START_TIME)"
+        eventLine = "gpTelemetry.event('nodeEnd', node=%r, exit=GP_NODE_EXIT, duration=time.time() - GP_NODE_START_TIME%s)"
+        iters = ''
+        if tab:
+            iters = ", iters=%s" % self.getItersStr(item)
         header = ["\n%sprint ''" % tab, "%sprint ''" % tab,
                   "%sprint '%s Node End: %s %s'" % (tab, '=' * 20, item._node.nodeName, '=' * 20),
-                  "%s%s" % (tab, dateLine), "%s%s" % (tab, timeLine)]
+                  "%s%s" % (tab, dateLine), "%s%s" % (tab, timeLine),
+                  "%s%s" % (tab, eventLine % (item._node.nodeName, iters))]
         return '\n'.join(header)
@@ -1,47 +1,672 @@
-import os
+import os, sys, json, time, socket, hashlib, getpass, subprocess
 from lib.system import procFile as pFile
 
 
-def makeCheckFile(tmpCheckFile, loopNodeName, iterator, iter):
+class CheckJournal(object):
     """
-    Create loop check file
+    Append-only loop checkpoint journal, one json record per line.
+    A claim record marks a loop iteration as taken, first claim in file wins.
+    Iterations of nested loops are keyed by their enclosing loops current iters too.
+    Clearing check names compacts the journal: their claims are dropped and the file is rewritten
+    in place, starting with a new compact record, so readers seeing another first line read it again.
+    Records are appended under a file lock, so parallel workers can share the journal.
 
-    :param tmpCheckFile: Loop check file relative path
-    :type tmpCheckFile: str
-    :param loopNodeName: Loop node name
-    :type loopNodeName: str
-    :param iterator: Loop iterator
-    :type iterator: str
-    :param iter: Current loop iter
-    :type iter: str | int
-    :return: 'exists' if checkFile already exists, else 'create'
+    :param journalFile: Journal file relative path
+    :type journalFile: str
+    :param runId: Current run id, stored in claims
+    :type runId: str
+    :param ignoreRuns: Resumed run ids, their claims are ignored
+    :type ignoreRuns: list
+    """
+
+    def __init__(self, journalFile, runId=None, ignoreRuns=None):
+        self.journalFile = journalFile
+        self.runId = runId
+        self.ignoreRuns = ignoreRuns or []
+        self._checks = dict()
+        self._offset = 0
+        self._head = None
+        self._claims = 0
+        self._claimId = '%s:%s:%s' % (socket.gethostname(), getpass.getuser(), os.getpid())
+        self.update()
+
+    def update(self):
+        """
+        Read records appended since last update
+        """
+        if not os.path.exists(self.journalFile):
+            return
+        with open(self.journalFile, 'rb') as fileId:
+            #-- Journal Compacted --#
+            head = fileId.readline()
+            if not head == self._head:
+                self._head = head
+                self._checks = dict()
+                self._offset = 0
+            fileId.seek(self._offset)
+            for line in fileId:
+                if not line.endswith('\n'):
+                    break
+                self._offset += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if 'compact' in record:
+                    continue
+                if 'clear' in record:
+                    for key in self._checks.keys():
+                        if key[0] in record['clear']:
+                            self._checks.pop(key)
+                elif not record.get('run') in self.ignoreRuns:
+                    key = (str(record['check']), self.iterKey(record['iter'], record.get('outer')))
+                    self._checks.setdefault(key, record)
+
+    @staticmethod
+    def iterKey(iter, outerIters=None):
+        """
+        Get loop iteration key
+
+        :param iter: Loop iter
+        :type iter: str | int
+        :param outerIters: Enclosing loops current iter (None if loop is not nested)
+        :type outerIters: list
+        :return: Iteration key
+        :rtype: str
+        """
+        if not outerIters:
+            return str(iter)
+        return '%s%s' % (iter, json.dumps([str(i) for i in outerIters]))
+
+    def isDone(self, checkName, iter, outerIters=None):
+        """
+        Check if given loop iteration is already claimed
+
+        :param checkName: Loop check name
+        :type checkName: str
+        :param iter: Loop iter
+        :type iter: str | int
+        :param outerIters: Enclosing loops current iter (None if loop is not nested)
+        :type outerIters: list
+        :return: True if iter is claimed
+        :rtype: bool
+        """
+        self.update()
+        return (checkName, self.iterKey(iter, outerIters)) in self._checks
+
+    def claim(self, checkName, loopNodeName, iterator, iter, outerIters=None):
+        """
+        Claim given loop iteration
+
+        :param checkName: Loop check name
+        :type checkName: str
+        :param loopNodeName: Loop node name
+        :type loopNodeName: str
+        :param iterator: Loop iterator
+        :type iterator: str
+        :param iter: Current loop iter
+        :type iter: str | int
+        :param outerIters: Enclosing loops current iter (None if loop is not nested)
+        :type outerIters: list
+        :return: 'exists' if iter is already claimed, else 'create'
+        :rtype: str
+        """
+        print "#--- Check Iter ---#"
+        print "Check:", checkName, iter, outerIters or ''
+        if self.isDone(checkName, iter, outerIters):
+            print "---> iter found, skipp iter !"
+            return 'exists'
+        self._claims += 1
+        claimId = '%s:%s' % (self._claimId, self._claims)
+        record = dict(check=checkName, iter=str(iter), id=claimId, loopNode=loopNodeName, iterator=iterator,
+                      run=self.runId, date=pFile.getDate(), time=pFile.getTime())
+        if outerIters:
+            record['outer'] = [str(i) for i in outerIters]
+        appendRecord(self.journalFile, record)
+        self.update()
+        if not self._checks[(checkName, self.iterKey(iter, outerIters))]['id'] == claimId:
+            print "---> iter claimed by another process, skipp iter !"
+            return 'exists'
+        print "Check written:", self.journalFile
+        return 'create'
+
+    @staticmethod
+    def clear(journalFile, checkNames):
+        """
+        Forget all claims of given check names and compact the journal
+
+        :param journalFile: Journal file relative path
+        :type journalFile: str
+        :param checkNames: Loop check names
+        :type checkNames: list
+        """
+        compactRecords(journalFile, lambda records: CheckJournal.compact(records, checkNames))
+
+    @staticmethod
+    def compact(records, checkNames=None):
+        """
+        Replay given journal records, keep surviving claims only
+
+        :param records: Journal records, in file order
+        :type records: list
+        :param checkNames: Loop check names to clear
+        :type checkNames: list
+        :return: Surviving claim records, in file order
+        :rtype: list
+        """
+        claims = []
+        for record in records:
+            if 'compact' in record:
+                continue
+            if 'clear' in record:
+                claims = [claim for claim in claims if not claim['check'] in record['clear']]
+            else:
+                claims.append(record)
+        return [claim for claim in claims if not claim['check'] in (checkNames or [])]
+
+
+class ResumeJournal(object):
+    """
+    Nodes completed by resumed runs, read from their telemetry files.
+    A node is completed if it ended with exit 0 or was already skipped as completed.
+
+    :param telemetryFiles: Resumed runs telemetry files
+    :type telemetryFiles: list
+    """
+
+    def __init__(self, telemetryFiles):
+        self.telemetryFiles = telemetryFiles
+        self._done = set()
+        for telemetryFile in telemetryFiles:
+            if os.path.exists(telemetryFile):
+                with open(telemetryFile, 'rb') as fileId:
+                    for line in fileId:
+                        try:
+                            event = json.loads(line)
+                        except ValueError:
+                            continue
+                        if event['event'] == 'nodeResume' or (event['event'] == 'nodeEnd' and not event.get('exit')):
+                            self._done.add(self.nodeKey(event['node'], event.get('iters')))
+
+    @staticmethod
+    def nodeKey(nodeName, iters=None):
+        """
+        Get node run key
+
+        :param nodeName: Node name
+        :type nodeName: str
+        :param iters: Parent loops current iter (None if node is not in a loop)
+        :type iters: list
+        :return: Node run key
+        :rtype: str
+        """
+        if iters is None:
+            return str(nodeName)
+        return '%s%s' % (nodeName, json.dumps(iters, default=repr))
+
+    def isDone(self, nodeName, iters=None):
+        """
+        Check if given node was completed by a resumed run
+
+        :param nodeName: Node name
+        :type nodeName: str
+        :param iters: Parent loops current iter (None if node is not in a loop)
+        :type iters: list
+        :return: True if node is completed
+        :rtype: bool
+        """
+        return self.nodeKey(nodeName, iters) in self._done
+
+
+class ResultMemo(object):
+    """
+    Node results journal, one json record per node run.
+    A node fingerprint is made of its compile key (script version, resolved variables),
+    its upstream nodes last result and its declared input files stamp (mtime, size).
+    A node whose fingerprint matches its last successful result is up to date.
+
+    :param journalFile: Journal file path
+    :type journalFile: str
+    :param force: Consider all nodes as dirty
+    :type force: bool
+    :param rootPath: Path used to resolve relative input and output files (None = current dir)
+    :type rootPath: str
+    """
+
+    def __init__(self, journalFile, force=False, rootPath=None):
+        self.journalFile = journalFile
+        self.force = force
+        self.rootPath = rootPath
+        self._results = dict()
+        self._offset = 0
+        self._records = 0
+        self._runId = '%s:%s:%s' % (socket.gethostname(), os.getpid(), time.time())
+
+    def update(self):
+        """
+        Read records appended since last update, last record of a node wins
+        """
+        if not os.path.exists(self.journalFile):
+            return
+        with open(self.journalFile, 'rb') as fileId:
+            fileId.seek(self._offset)
+            for line in fileId:
+                if not line.endswith('\n'):
+                    break
+                self._offset += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if 'clear' in record:
+                    for nodeName in record['clear'] or self._results.keys():
+                        self._results.pop(nodeName, None)
+                else:
+                    self._results[record['node']] = record
+
+    def lastResult(self, nodeName):
+        """
+        Get given node last recorded result
+
+        :param nodeName: Node name
+        :type nodeName: str
+        :return: Last record (None if node never ran)
+        :rtype: dict
+        """
+        self.update()
+        return self._results.get(nodeName)
+
+    def fileStamp(self, path):
+        """
+        Get given file stamp
+
+        :param path: File path
+        :type path: str
+        :return: Modification time and size (None if file doesn't exist)
+        :rtype: list
+        """
+        if self.rootPath is not None:
+            path = os.path.join(self.rootPath, path)
+        if not os.path.exists(path):
+            return None
+        stat = os.stat(path)
+        return [stat.st_mtime, stat.st_size]
+
+    @staticmethod
+    def conformFiles(files):
+        """
+        Conform declared files to a list
+
+        :param files: File path or file paths (None = no file)
+        :type files: str | list
+        :return: File paths
+        :rtype: list
+        """
+        if not files:
+            return []
+        if isinstance(files, basestring):
+            return [files]
+        return list(files)
+
+    def check(self, nodeName, key, upstream=None, inputs=None, outputs=None):
+        """
+        Get given node fingerprint and dirty reason
+
+        :param nodeName: Node name
+        :type nodeName: str
+        :param key: Node compile key
+        :type key: str
+        :param upstream: Upstream node names
+        :type upstream: list
+        :param inputs: Declared input files
+        :type inputs: str | list
+        :param outputs: Declared output files
+        :type outputs: str | list
+        :return: Memo (node, fingerprint, parts, outputs, reason), reason is None if node is up to date
+        :rtype: dict
+        """
+        self.update()
+        parts = dict(key=key, upstream=dict(), inputs=dict())
+        for upNode in upstream or []:
+            parts['upstream'][upNode] = (self._results.get(upNode) or dict()).get('id')
+        for inFile in self.conformFiles(inputs):
+            parts['inputs'][pFile.conformPath(inFile)] = self.fileStamp(inFile)
+        memo = dict(node=nodeName, parts=parts, outputs=self.conformFiles(outputs),
+                    fingerprint=hashlib.md5(json.dumps(parts, sort_keys=True)).hexdigest())
+        memo['reason'] = self.dirtyReason(memo)
+        return memo
+
+    def dirtyReason(self, memo):
+        """
+        Explain why given node memo is dirty
+
+        :param memo: Node memo (see check)
+        :type memo: dict
+        :return: Dirty reason, None if node is up to date
+        :rtype: str
+        """
+        if self.force:
+            return "forced"
+        last = self._results.get(memo['node'])
+        if last is None:
+            return "no recorded result"
+        if last['exit']:
+            return "last run failed (exit %s)" % last['exit']
+        for outFile in memo['outputs']:
+            if self.fileStamp(outFile) is None:
+                return "output file missing: %s" % outFile
+        if last['fingerprint'] == memo['fingerprint']:
+            return None
+        parts = memo['parts']
+        if not last['parts']['key'] == parts['key']:
+            return "script or variables changed"
+        for upNode in sorted(set(parts['upstream']) | set(last['parts']['upstream'])):
+            if not last['parts']['upstream'].get(upNode) == parts['upstream'].get(upNode):
+                return "upstream node result changed: %s" % upNode
+        for inFile in sorted(set(parts['inputs']) | set(last['parts']['inputs'])):
+            if not inFile in last['parts']['inputs']:
+                return "new input file: %s" % inFile
+            if not inFile in parts['inputs']:
+                return "input file removed: %s" % inFile
+            if not last['parts']['inputs'][inFile] == parts['inputs'][inFile]:
+                return "input file changed: %s" % inFile
+        return "fingerprint changed"
+
+    def record(self, memo, exitCode):
+        """
+        Record given node result
+
+        :param memo: Node memo (see check)
+        :type memo: dict
+        :param exitCode: Node exit code
+        :type exitCode: int
+        """
+        self._records += 1
+        appendRecord(self.journalFile, dict(node=memo['node'], fingerprint=memo['fingerprint'], parts=memo['parts'],
+                                            exit=exitCode, id='%s:%s' % (self._runId, self._records),
+                                            date=pFile.getDate(), time=pFile.getTime()))
+
+    @staticmethod
+    def clear(journalFile, nodeNames=None):
+        """
+        Forget recorded results of given nodes
+
+        :param journalFile: Journal file path
+        :type journalFile: str
+        :param nodeNames: Node names (None = all nodes)
+        :type nodeNames: list
+        """
+        appendRecord(journalFile, dict(clear=nodeNames and list(nodeNames), date=pFile.getDate(),
+                                       time=pFile.getTime()))
+
+
+class Telemetry(object):
+    """
+    Exec telemetry: node, loop and run events appended as json lines next to the run log
+
+    :param telemetryFile: Telemetry file relative path
+    :type telemetryFile: str
+    """
+
+    def __init__(self, telemetryFile):
+        self.telemetryFile = telemetryFile
+        self.host = socket.gethostname()
+        self.pid = os.getpid()
+
+    def event(self, event, **kwargs):
+        """
+        Append given event. Telemetry errors never stop the run.
+
+        :param event: Event name ('runStart', 'runEnd', 'nodeStart', 'nodeEnd', 'iter')
+        :type event: str
+        :param kwargs: Event datas
+        :type kwargs: dict
+        """
+        record = dict(event=event, time=time.time(), host=self.host, pid=self.pid, rss=peakRss())
+        record.update(kwargs)
+        try:
+            appendRecord(self.telemetryFile, record)
+        except (IOError, OSError, TypeError, ValueError), err:
+            print "!!! Can not write telemetry: %s !!!" % err
+
+
+class WarmPool(object):
+    """
+    Long-lived launcher processes executing node scripts, one per launcher.
+    Workers are recycled after maxTasks scripts or when their peak memory exceeds maxRss.
+
+    :param maxTasks: Max number of scripts per worker
+    :type maxTasks: int
+    :param maxRss: Max worker peak memory in Kb (0 = no limit)
+    :type maxRss: int
+    """
+
+    workerFile = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'grapherWorker.py')
+
+    def __init__(self, maxTasks=50, maxRss=0):
+        self.maxTasks = maxTasks
+        self.maxRss = maxRss
+        self._workers = dict()
+
+    def run(self, launcher, scriptFile):
+        """
+        Execute given script with given launcher
+
+        :param launcher: Launcher (python interpreter) full path
+        :type launcher: str
+        :param scriptFile: Script file full path
+        :type scriptFile: str
+        :return: Exit code
+        :rtype: int
+        """
+        sys.stdout.flush()
+        worker = self._workers.get(launcher)
+        if worker is None:
+            worker = self._workers[launcher] = dict(proc=self.startWorker(launcher), tasks=0)
+        try:
+            worker['proc'].stdin.write('%s\n' % json.dumps(dict(script=scriptFile, cwd=os.getcwd())))
+            worker['proc'].stdin.flush()
+            line = worker['proc'].stdout.readline()
+        except (IOError, OSError):
+            line = ''
+        #-- Worker Died --#
+        if not line:
+            self.stopWorker(launcher)
+            print "!!! Warm worker died while executing %s !!!" % scriptFile
+            return 1
+        reply = json.loads(line)
+        worker['tasks'] += 1
+        #-- Recycle --#
+        if worker['tasks'] >= self.maxTasks or (self.maxRss and reply.get('rss') and reply['rss'] > self.maxRss):
+            self.stopWorker(launcher)
+        return reply['exit']
+
+    def startWorker(self, launcher):
+        """
+        Start a new worker
+
+        :param launcher: Launcher (python interpreter) full path
+        :type launcher: str
+        :return: Worker process
+        :rtype: subprocess.Popen
+        """
+        print "Start warm worker:", launcher
+        return subprocess.Popen([launcher, '-u', self.workerFile], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def stopWorker(self, launcher):
+        """
+        Stop given launcher worker
+
+        :param launcher: Launcher (python interpreter) full path
+        :type launcher: str
+        """
+        worker = self._workers.pop(launcher, None)
+        if worker is not None:
+            try:
+                worker['proc'].stdin.close()
+            except (IOError, OSError):
+                pass
+            worker['proc'].wait()
+
+    def close(self):
+        """
+        Stop all workers
+        """
+        for launcher in self._workers.keys():
+            self.stopWorker(launcher)
+
+
+def peakRss(children=True):
+    """
+    Get peak resident memory of current process and its finished children.
+    On Windows, the peak working set of current process only (GetProcessMemoryInfo).
+
+    :param children: Include finished children peak (posix only)
+    :type children: bool
+    :return: Peak rss in Kb (None if not available)
+    :rtype: int
+    """
+    if os.name == 'nt':
+        return windowsPeakRss()
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if children:
+        rss = max(rss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    if sys.platform == 'darwin':
+        rss /= 1024
+    return rss
+
+def windowsPeakRss():
+    """
+    Get peak working set of current process, Windows only
+
+    :return: Peak working set in Kb (None if not available)
+    :rtype: int
+    """
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        getCurrentProcess = ctypes.windll.kernel32.GetCurrentProcess
+        getCurrentProcess.restype = wintypes.HANDLE
+        getMemoryInfo = ctypes.windll.psapi.GetProcessMemoryInfo
+        getMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(ProcessMemoryCounters), wintypes.DWORD]
+        getMemoryInfo.restype = wintypes.BOOL
+        if not getMemoryInfo(getCurrentProcess(), ctypes.byref(counters), counters.cb):
+            return None
+        return int(counters.PeakWorkingSetSize / 1024)
+    except (ImportError, AttributeError, OSError, ValueError):
+        return None
+
+def recordLine(record):
+    """
+    Get given record journal line
+
+    :param record: Journal record
+    :type record: dict
+    :return: Json line
     :rtype: str
     """
-    print "#--- Check TmpFile ---#"
-    print "Tmp File:", tmpCheckFile
-    #-- Check If File Exists --#
-    if os.path.exists(tmpCheckFile):
-        print "---> tmpFile found, skipp iter !"
-        return 'exists'
-    #-- Get CheckFile Text --#
-    txt = ["Date = %r" % pFile.getDate(), "Time = %r" % pFile.getTime(),
-           "Station = %r" % os.environ['COMPUTERNAME'], "User = %r" % os.environ['USERNAME'],
-           "LoopNode = %r" % loopNodeName, "Iterator = %r" % iterator]
-    if isinstance(iter, str):
-        txt.append("Iter = %r" % iter)
-        txt.append("%s = %r" % (iterator, iter))
-    else:
-        txt.append("Iter = %s" % iter)
-        txt.append("%s = %s" % (iterator, iter))
-    #-- Write CheckFile Text --#
+    return '%s\n' % json.dumps(record, separators=(',', ':'), default=repr)
+
+def appendRecord(journalFile, record):
+    """
+    Append given record to journal file as one json line, under an exclusive file lock
+
+    :param journalFile: Journal file path
+    :type journalFile: str
+    :param record: Record to append
+    :type record: dict
+    """
+    line = recordLine(record)
+    fd = os.open(journalFile, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0666)
     try:
-        pFile.writeFile(tmpCheckFile, '\n'.join(txt))
-        print "Check file written:", tmpCheckFile
-        return 'create'
-    except:
-        raise IOError("!!! Can Not write check file: %s !!!" % tmpCheckFile)
+        if os.name == 'nt':
+            import msvcrt
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            try:
+                os.lseek(fd, 0, os.SEEK_END)
+                os.write(fd, line)
+            finally:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                os.write(fd, line)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+def compactRecords(journalFile, compactFunc):
+    """
+    Rewrite given journal in place under the append lock: complete records are replaced by
+    compactFunc(records), preceded by a new 'compact' record
+
+    :param journalFile: Journal file path
+    :type journalFile: str
+    :param compactFunc: Function returning records to keep from all journal records
+    :type compactFunc: function
+    """
+    with os.fdopen(os.open(journalFile, os.O_RDWR | os.O_CREAT, 0666), 'r+b') as fileId:
+        fd = fileId.fileno()
+        if os.name == 'nt':
+            import msvcrt
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            records = []
+            for line in fileId.read().splitlines(True):
+                if line.endswith('\n'):
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        pass
+            head = dict(compact='%s:%s:%s' % (socket.gethostname(), os.getpid(), time.time()),
+                        date=pFile.getDate(), time=pFile.getTime())
+            fileId.seek(0)
+            fileId.write(''.join([recordLine(r) for r in [head] + compactFunc(records)]))
+            fileId.truncate()
+            fileId.flush()
+        finally:
+            fileId.seek(0)
+            if os.name == 'nt':
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+def execStatus(status):
+    """
+    Conform os.system returned status to a process exit code
+
+    :param status: os.system result
+    :type status: int
+    :return: Exit code (0 = success)
+    :rtype: int
+    """
+    if os.name == 'nt' or not status:
+        return status
+    if os.WIFEXITED(status):
+        return os.WEXITSTATUS(status)
+    return 1
 
-def makeLauncher(launchFile, scriptFile, loopChecks=None):
+def makeLauncher(launchFile, scriptFile, loopIters=None):
     """
     Create node launcher file
 
@@ -49,21 +674,27 @@ def makeLauncher(launchFile, scriptFile, loopChecks=None):
     :type launchFile: str
     :param scriptFile: Node script file name
     :type scriptFile: str
-    :param loopChecks: Loop check files
-    :type loopChecks: list
+    :param loopIters: Parent loops current iter (loopNodeName, iterator, iter)
+    :type loopIters: list
     """
+    #-- Launch Infos (names once set by loop check files) --#
+    headerLines = ["Date = %r" % pFile.getDate(), "Time = %r" % pFile.getTime(),
+                   "Station = %r" % (os.environ.get('COMPUTERNAME') or socket.gethostname()),
+                   "User = %r" % (os.environ.get('USERNAME') or getpass.getuser())]
+    #-- Loop Iters --#
+    if loopIters is not None:
+        for loopNodeName, iterator, iter in loopIters:
+            headerLines.extend(["LoopNode = %r" % loopNodeName, "Iterator = %r" % iterator,
+                                "Iter = %r" % iter, "%s = %r" % (iterator, iter)])
     txt = []
     #-- Python Launcher --#
     if launchFile.endswith('.py'):
-        if loopChecks is not None:
-            for loopFile in loopChecks:
-                txt.append('execfile(%r)' % pFile.conformPath(loopFile))
+        txt.extend(headerLines)
         txt.append('execfile(%r)' % pFile.conformPath(scriptFile))
     #-- Mel Launcher --#
     elif launchFile.endswith('.mel'):
-        if loopChecks is not None:
-            for loopFile in loopChecks:
-                txt.append('python("execfile(%r)");' % pFile.conformPath(loopFile))
+        for line in headerLines:
+            txt.append('python(%s);' % json.dumps(line))
         txt.append('python("execfile(%r)");' % pFile.conformPath(scriptFile))
     #-- Write Launcher --#
     try:
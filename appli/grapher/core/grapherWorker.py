@@ -0,0 +1,113 @@
+"""
+Grapher warm worker: long-lived interpreter executing node scripts sent by grapherCmds.WarmPool.
+Standard library only, so any python launcher (python27, mayaPy, ...) can run it.
+
+Protocol, one json line per message:
+    stdin:  {"script": scriptFile, "cwd": workingDir}
+    output: {"exit": exitCode, "rss": peakRssKb}
+Node scripts print on stderr's target, the original stdout is kept for replies.
+"""
+
+import os, sys, json, traceback
+
+
+def peakRss():
+    """
+    Get peak resident memory of current process (peak working set on Windows).
+    Standalone copy of grapherCmds.peakRss, without children.
+
+    :return: Peak rss in Kb (None if not available)
+    :rtype: int
+    """
+    if os.name == 'nt':
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class ProcessMemoryCounters(ctypes.Structure):
+                _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                            ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                            ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+            counters = ProcessMemoryCounters()
+            counters.cb = ctypes.sizeof(counters)
+            getCurrentProcess = ctypes.windll.kernel32.GetCurrentProcess
+            getCurrentProcess.restype = wintypes.HANDLE
+            getMemoryInfo = ctypes.windll.psapi.GetProcessMemoryInfo
+            getMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(ProcessMemoryCounters), wintypes.DWORD]
+            getMemoryInfo.restype = wintypes.BOOL
+            if not getMemoryInfo(getCurrentProcess(), ctypes.byref(counters), counters.cb):
+                return None
+            return int(counters.PeakWorkingSetSize / 1024)
+        except (ImportError, AttributeError, OSError, ValueError):
+            return None
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        rss /= 1024
+    return rss
+
+def runScript(scriptFile, cwd=None):
+    """
+    Execute given script in a new namespace, restore process state after
+
+    :param scriptFile: Script file full path
+    :type scriptFile: str
+    :param cwd: Working directory
+    :type cwd: str
+    :return: Exit code
+    :rtype: int
+    """
+    state = (os.getcwd(), list(sys.path), list(sys.argv), dict(os.environ))
+    namespace = {'__name__': '__main__', '__file__': scriptFile, '__builtins__': __builtins__}
+    exitCode = 0
+    try:
+        if cwd:
+            os.chdir(cwd)
+        sys.argv = [scriptFile]
+        execfile(scriptFile, namespace)
+    except SystemExit, err:
+        if err.code is None:
+            exitCode = 0
+        elif isinstance(err.code, int):
+            exitCode = err.code
+        else:
+            print err.code
+            exitCode = 1
+    except:
+        traceback.print_exc()
+        exitCode = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.chdir(state[0])
+        sys.path[:] = state[1]
+        sys.argv = state[2]
+        os.environ.clear()
+        os.environ.update(state[3])
+    return exitCode
+
+def main():
+    """
+    Worker loop: execute scripts until stdin is closed
+    """
+    reply = os.fdopen(os.dup(sys.stdout.fileno()), 'w')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    while True:
+        line = sys.stdin.readline()
+        if not line:
+            break
+        request = json.loads(line)
+        exitCode = runScript(request['script'], cwd=request.get('cwd'))
+        reply.write('%s\n' % json.dumps(dict(exit=exitCode, rss=peakRss())))
+        reply.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,8 @@
+import os
+from appli import grapher
+from lib.qt import procQt as pQt
+
+
+#-- Compile Ui --#
+pQt.CompileUi2(uiDir=os.path.join(grapher.toolPath, 'gui', 'src'),
+               uiDest=os.path.join(grapher.toolPath, 'gui', 'ui'))
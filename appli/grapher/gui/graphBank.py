@@ -1,8 +1,10 @@
 import os, shutil, pprint
-from PyQt4 import QtGui
+from PyQt4 import QtGui, QtCore
 from functools import partial
 from lib.qt import procQt as pQt
 from lib.system import procFile as pFile
+from lib.system import procWatch
+from appli.grapher.core import graphCatalog
 from appli.grapher.gui.ui import wgBankUI
 
 
@@ -19,6 +21,9 @@ class Bank(QtGui.QWidget, wgBankUI.Ui_wgBank):
         self.log = self.mainUi.log
         self.log.detail("\t ---> Init Bank Widget.")
         self.graphTree = self.mainUi.graphZone.graphTree
+        self.catalog = graphCatalog.BankCatalog(os.path.join(self.mainUi.grapher.binPath, 'bank'),
+                                                os.path.join(self.mainUi.grapher.userPath, 'bankCatalog.json'))
+        self.watcher = procWatch.Watcher(interval=2, debounce=0.5)
         super(Bank, self).__init__()
         self._setupWidget()
 
@@ -45,6 +50,11 @@ class Bank(QtGui.QWidget, wgBankUI.Ui_wgBank):
         self.cbNode.setStyleSheet("color: rgb(0, 170, 0)")
         self.cbBranch.clicked.connect(self.rf_itemVisibility)
         self.cbBranch.setStyleSheet("color: rgb(180, 120, 120)")
+        #-- Search --#
+        self.leSearch = QtGui.QLineEdit(self)
+        self.leSearch.setToolTip("Search bank: words, 'tag:name' (#name in comment), 'type:script|node|branch'")
+        self.vlTree.insertWidget(self.vlTree.indexOf(self.twTree), self.leSearch)
+        self.leSearch.textChanged.connect(self.rf_itemVisibility)
         #-- Edition --#
         self.pbEdit.clicked.connect(self.rf_editMode)
         self.pbExplorer.clicked.connect(self.on_xPlorer)
@@ -60,6 +70,13 @@ class Bank(QtGui.QWidget, wgBankUI.Ui_wgBank):
         self.rf_editMode()
         self.rf_tree()
         self.rf_infoVisibility()
+        #-- Watch Bank --#
+        if os.path.isdir(self.catalog.bankPath):
+            self.watcher.watch(self.catalog.bankPath)
+            self.watcher.start()
+            self.watchTimer = QtCore.QTimer(self)
+            self.watchTimer.timeout.connect(self.on_bankChanged)
+            self.watchTimer.start(1000)
 
     def getTreeItemFromPath(self, pathType, path):
         """
@@ -161,14 +178,13 @@ class Bank(QtGui.QWidget, wgBankUI.Ui_wgBank):
         """
         Refresh Tree topItems
 
-        :param treeDict: Path to dict
+        :param treeDict: Path to dict (see graphCatalog.BankCatalog.refresh)
         :type treeDict: dict
         """
-        bankDir = os.path.join(self.mainUi.grapher.binPath, 'bank')
-        rootPath = pFile.conformPath(bankDir)
+        rootPath = self.catalog.bankPath
         #-- Init Tree --#
         if treeDict is None:
-            treeDict = pFile.pathToDict(bankDir, conformed=True)
+            treeDict = self.catalog.refresh()
             self.twTree.clear()
         else:
             item = self.getTreeItemFromPath('fullPath', treeDict['_order'][0])
@@ -209,15 +225,29 @@ class Bank(QtGui.QWidget, wgBankUI.Ui_wgBank):
 
     def rf_itemVisibility(self):
         """
-        Refresh item visibility
+        Refresh item visibility, from type filters and search query
         """
+        query = str(self.leSearch.text()).strip()
+        if query:
+            found = set([self.catalog.fullPath(relPath) for relPath in self.catalog.search(query)])
+        else:
+            found = None
         for item in pQt.getAllItems(self.twTree):
-            if item.itemType == 'script':
-                self.twTree.setItemHidden(item, not self.cbScript.isChecked())
-            elif item.itemType == 'node':
-                self.twTree.setItemHidden(item, not self.cbNode.isChecked())
-            elif item.itemType == 'branch':
-                self.twTree.setItemHidden(item, not self.cbBranch.isChecked())
+            if item.itemType in ['script', 'node', 'branch']:
+                if item.itemType == 'script':
+                    hidden = not self.cbScript.isChecked()
+                elif item.itemType == 'node':
+                    hidden = not self.cbNode.isChecked()
+                else:
+                    hidden = not self.cbBranch.isChecked()
+                if found is not None:
+                    hidden = hidden or not item.fullPath in found
+                    if not hidden:
+                        parent = item.parent()
+                        while parent is not None:
+                            parent.setExpanded(True)
+                            parent = parent.parent()
+                self.twTree.setItemHidden(item, hidden)
 
     def rf_infoVisibility(self):
         """
@@ -293,21 +323,19 @@ class Bank(QtGui.QWidget, wgBankUI.Ui_wgBank):
         if selItems:
             fp = selItems[0].fullPath
             if selItems[0].itemType in ['script', 'node', 'branch']:
-                infoDict = pFile.readPyFile(fp)
-                self.teComment.setPlainText(infoDict['comment'])
+                entry = self.catalog.getEntry(fp)
+                if entry is None:
+                    self.log.warning("!!! Bank file not found: %s !!!" % fp)
+                    return
+                if entry['error'] is not None:
+                    self.log.error("!!! Can not read bank file: %s !!!" % fp)
+                self.teComment.setPlainText(entry['comment'])
                 if selItems[0].itemType == 'script':
-                    self.teRequires.setPlainText(infoDict['requires'])
-                    self.teScript.setPlainText(infoDict['script'])
-                elif selItems[0].itemType == 'node':
-                    datas = infoDict['nodeDatas']
-                    self.teRequires.setPlainText("%s (%s)" % (datas['nodeName'], datas['nodeType']))
-                    self.teScript.setPlainText(datas['nodeScript'][datas['nodeVersion']])
-                elif selItems[0].itemType == 'branch':
-                    txt = []
-                    for n in sorted(infoDict['branchDatas'].keys()):
-                        nodeDatas = infoDict['branchDatas'][n]
-                        txt.append("%s (%s)" % (nodeDatas['nodeName'], nodeDatas['nodeType']))
-                    self.teRequires.setPlainText('\n'.join(txt))
+                    self.teRequires.setPlainText(entry['requires'])
+                else:
+                    self.teRequires.setPlainText('\n'.join(entry['nodes']))
+                if selItems[0].itemType in ['script', 'node']:
+                    self.teScript.setPlainText(entry['script'])
 
     def on_refresh(self):
         """
@@ -317,11 +345,35 @@ class Bank(QtGui.QWidget, wgBankUI.Ui_wgBank):
         """
         selItems = self.twTree.selectedItems() or []
         if not selItems:
+            self.catalog.refresh(deep=True)
             self.rf_tree()
         else:
             path = selItems[0].fullPath
             if os.path.isdir(path):
-                self.rf_tree(treeDict=pFile.pathToDict(path, conformed=True))
+                self.rf_tree(treeDict=self.catalog.refresh(path, deep=True))
+
+    def on_bankChanged(self):
+        """
+        Command launched by watch timer
+
+        Refresh catalog entries and tree folders changed on disk
+        """
+        for root, changes in self.watcher.pending():
+            self.log.debug("Bank changed: %s" % changes)
+            #-- Added / Removed --#
+            if changes['added'] or changes['removed']:
+                parents = set([os.path.dirname(p.rstrip('/')) for p in changes['added'] + changes['removed']])
+                parentPath = self.catalog.fullPath(parents.pop()) if len(parents) == 1 else None
+                if parentPath is not None and self.getTreeItemFromPath('fullPath', parentPath) is not None:
+                    self.rf_tree(treeDict=self.catalog.refresh(parentPath))
+                else:
+                    self.rf_tree()
+            #-- Modified --#
+            for relPath in changes['modified']:
+                self.catalog.updateEntry(relPath)
+            self.catalog.save()
+            if not self.pbEdit.isChecked():
+                self.updateInfo()
 
     def on_treeItem(self):
         """
@@ -340,19 +392,18 @@ class Bank(QtGui.QWidget, wgBankUI.Ui_wgBank):
         Add selected node or branch to graph
         """
         selItem = self.twTree.selectedItems()[0]
+        snapshotFromDatas = self.mainUi.grapher.tree.snapshotFromDatas
         #-- Store Node In Buffer --#
         if selItem.itemType == 'node':
             nodeDatas = pFile.readPyFile(selItem.fullPath)['nodeDatas']
             self.mainUi.graphZone.cpBuffer = dict(_mode='nodes')
-            self.mainUi.graphZone.cpBuffer[0] = dict(nodeName=selItem.label, nodeChildren={}, nodeDict=nodeDatas)
+            self.mainUi.graphZone.cpBuffer[0] = snapshotFromDatas([nodeDatas], rootName=selItem.label)
         #-- Store Branch In Buffer --#
         elif selItem.itemType == 'branch':
             branchDatas = pFile.readPyFile(selItem.fullPath)['branchDatas']
             self.mainUi.graphZone.cpBuffer = dict(_mode='branch')
-            self.mainUi.graphZone.cpBuffer[0] = dict(nodeName=selItem.label, nodeChildren={}, nodeDict=branchDatas[0])
-            for n in sorted(branchDatas.keys()):
-                if n > 0:
-                    self.mainUi.graphZone.cpBuffer[0]['nodeChildren'][n-1] = branchDatas[n]
+            self.mainUi.graphZone.cpBuffer[0] = snapshotFromDatas([branchDatas[n] for n in sorted(branchDatas.keys())],
+                                                                  rootName=selItem.label)
         #-- Paste Nodes --#
         graphItems = self.mainUi.graphZone.graphTree.selectedItems() or []
         if graphItems:
@@ -412,7 +463,7 @@ class Bank(QtGui.QWidget, wgBankUI.Ui_wgBank):
             self.edFolder = pQt.errorDialog(mess, self.pdAdd)
         #-- Refresh --#
         self.pdAdd.close()
-        treeDict = pFile.pathToDict(folderPath, conformed=True)
+        treeDict = self.catalog.refresh(folderPath)
         self.rf_tree(treeDict=treeDict)
 
     def addScipt(self):
@@ -439,7 +490,7 @@ class Bank(QtGui.QWidget, wgBankUI.Ui_wgBank):
             self.edFolder = pQt.errorDialog(mess, self.pdAdd)
         #-- Refresh --#
         self.pdAdd.close()
-        treeDict = pFile.pathToDict(scriptPath, conformed=True)
+        treeDict = self.catalog.refresh(scriptPath)
         self.rf_tree(treeDict=treeDict)
 
     def addNode(self):
@@ -467,7 +518,7 @@ class Bank(QtGui.QWidget, wgBankUI.Ui_wgBank):
             self.edFolder = pQt.errorDialog(mess, self.pdAdd)
         #-- Refresh --#
         self.pdAdd.close()
-        treeDict = pFile.pathToDict(nodePath, conformed=True)
+        treeDict = self.catalog.refresh(nodePath)
         self.rf_tree(treeDict=treeDict)
 
     def addBranch(self):
@@ -500,7 +551,7 @@ class Bank(QtGui.QWidget, wgBankUI.Ui_wgBank):
             self.edFolder = pQt.errorDialog(mess, self.pdAdd)
         #-- Refresh --#
         self.pdAdd.close()
-        treeDict = pFile.pathToDict(branchPath, conformed=True)
+        treeDict = self.catalog.refresh(branchPath)
         self.rf_tree(treeDict=treeDict)
 
     def on_delSelFile(self):
@@ -536,7 +587,7 @@ class Bank(QtGui.QWidget, wgBankUI.Ui_wgBank):
         #-- Refresh --#
         if refresh:
             parentItem = self.twTree.selectedItems()[0].parent()
-            treeDict = pFile.pathToDict(parentItem.fullPath, conformed=True)
+            treeDict = self.catalog.refresh(parentItem.fullPath)
             self.rf_tree(treeDict=treeDict)
 
     def on_delSelFolder(self):
@@ -575,7 +626,7 @@ class Bank(QtGui.QWidget, wgBankUI.Ui_wgBank):
         #-- Refresh --#
         if refresh:
             parentItem = self.twTree.selectedItems()[0].parent()
-            treeDict = pFile.pathToDict(parentItem.fullPath, conformed=True)
+            treeDict = self.catalog.refresh(parentItem.fullPath)
             self.rf_tree(treeDict=treeDict)
 
     def on_save(self):
@@ -623,3 +674,5 @@ class Bank(QtGui.QWidget, wgBankUI.Ui_wgBank):
             self.log.info("File saved: %s" % fileFullPath)
         except:
             raise IOError("!!! Can not save file: %s !!!" % fileFullPath)
+        self.catalog.updateEntry(self.catalog.relPath(fileFullPath), force=True)
+        self.catalog.save()
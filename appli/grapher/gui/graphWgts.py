@@ -3,6 +3,7 @@ from functools import partial
 from PyQt4 import QtGui, QtCore
 from lib.qt import procQt as pQt
 from lib.system import procFile as pFile
+from appli.grapher.core import graphLogStream
 from appli.grapher.gui.ui import graphNodeUI, nodeRenameUI, wgVariablesUI, wgLogsUI
 
 
@@ -199,7 +200,7 @@ class NodeRenamer(QtGui.QDialog, nodeRenameUI.Ui_dialNodeRename):
         Rename node and update node
         """
         super(NodeRenamer, self).accept()
-        self.item._item._node.nodeName = str(self.lResultVal.text())
+        self.item._item.rename(str(self.lResultVal.text()))
         if self.mainUi.graphZone.currentGraphMode == 'tree':
             self.item._widget.rf_label()
         else:
@@ -570,6 +571,9 @@ class Logs(QtGui.QWidget, wgLogsUI.Ui_wgLogs):
         self.mainUi = mainUi
         self.log = self.mainUi.log
         self.log.detail("\t ---> Init Logs Widget.")
+        self._stream = None
+        self._streamSeq = 0
+        self._followed = None
         super(Logs, self).__init__()
         self._setupWidget()
         self.rf_waitVisibility()
@@ -594,6 +598,11 @@ class Logs(QtGui.QWidget, wgLogsUI.Ui_wgLogs):
         self.teLogs.setFont(scriptFont)
         self.teLogs.setStyleSheet("background-color: rgb(35, 35, 35);"
                                   "color: rgb(220, 220, 220);")
+        self.teLogs.setMaximumBlockCount(self.mainUi.grapher.gpExec.streamLines)
+        #-- Stream Timer --#
+        self.streamTimer = QtCore.QTimer(self)
+        self.streamTimer.setInterval(250)
+        self.streamTimer.timeout.connect(self.rf_stream)
 
     @property
     def showXterm(self):
@@ -637,20 +646,71 @@ class Logs(QtGui.QWidget, wgLogsUI.Ui_wgLogs):
         newItem.logFile = logFile
         newItem.setText(0, '--'.join(os.path.basename(logFile).split('.')[0].split('--')[1:]))
         self.twJobs.insertTopLevelItem(0, newItem)
+        #-- Stream Launched Job --#
+        if logFile in self.mainUi.grapher.gpExec.logStreams:
+            newItem.setSelected(True)
+            self.updateLog()
 
     def updateLog(self):
         """
-        Update log with selected job item
+        Update log with selected job item: records of the executor stream if the job was launched here,
+        else last lines of the log file, then new lines tailed from the log file
         """
         self.teLogs.clear()
+        self.stopStream()
         selItems = self.twJobs.selectedItems() or []
         if len(selItems) == 1:
+            logFile = selItems[0].logFile
+            self._stream = self.mainUi.grapher.gpExec.logStreams.get(logFile)
             #-- Update Text --#
-            log = pFile.readFile(selItems[0].logFile)
-            self.teLogs.setPlainText(''.join(log))
+            if self._stream is None:
+                self._stream = graphLogStream.LogStream(logFile, maxLines=self.mainUi.grapher.gpExec.streamLines)
+                self._stream.follow(fromEnd=True)
+                self._followed = self._stream
+                self._streamSeq = self._stream.seq
+                self.teLogs.setPlainText('\n'.join(self._stream.history()))
+            else:
+                self._streamSeq = 0
+                self.rf_stream()
             #-- Scroll To Bottom --#
             sb = self.teLogs.verticalScrollBar()
             sb.setValue(sb.maximum())
+            self.streamTimer.start()
+
+    def rf_stream(self):
+        """
+        Append new records of current log stream, without reading the log file
+        """
+        if self._stream is None:
+            self.streamTimer.stop()
+            return
+        records, dropped = self._stream.since(self._streamSeq)
+        if not records:
+            return
+        self._streamSeq = records[-1][0]
+        lines = []
+        if dropped:
+            lines.append("... %s lines, see %s ..." % (dropped, pFile.conformPath(self._stream.logFile)))
+        for seq, _time, source, line in records:
+            if source is None:
+                lines.append(line)
+            else:
+                lines.append("[%s] %s" % (source, line))
+        sb = self.teLogs.verticalScrollBar()
+        atBottom = sb.value() == sb.maximum()
+        self.teLogs.appendPlainText('\n'.join(lines))
+        if atBottom:
+            sb.setValue(sb.maximum())
+
+    def stopStream(self):
+        """
+        Stop current log stream display, and log file tail if started by this widget
+        """
+        self.streamTimer.stop()
+        if self._followed is not None:
+            self._followed.stop()
+            self._followed = None
+        self._stream = None
 
     def on_getJobs(self):
         """
@@ -660,7 +720,7 @@ class Logs(QtGui.QWidget, wgLogsUI.Ui_wgLogs):
         """
         self.twJobs.clear()
         logPath = os.path.join(self.mainUi.grapher.graphTmpPath, 'logs')
-        logFiles = os.listdir(logPath) or []
+        logFiles = [f for f in os.listdir(logPath) if not f.endswith('.jsonl')]
         for logFile in logFiles:
             self.addJob(os.path.join(logPath, logFile))
         if not logFiles:
@@ -673,6 +733,7 @@ class Logs(QtGui.QWidget, wgLogsUI.Ui_wgLogs):
         Delete selected jobs for current graphFile
         """
         self.teLogs.clear()
+        self.stopStream()
         selItems = self.twJobs.selectedItems() or []
         for item in selItems:
             try:
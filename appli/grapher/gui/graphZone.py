@@ -2,7 +2,7 @@ import os
 from functools import partial
 from PyQt4 import QtGui, QtCore
 from lib.qt import procQt as pQt
-from lib.system import procFile as pFile
+from appli.grapher.core import grapherCmds as gpCmds
 from appli.grapher.gui import graphTree, graphScene, graphWgts, nodeEditor
 
 
@@ -237,13 +237,7 @@ class GraphZone(object):
             self.log.debug("Storing selected nodes ...")
             #-- Store Selected Nodes --#
             for n, item in enumerate(selItems):
-                nodeDict = eval(item._item.getDatas(asString=True)) # Clone: asString=False
-                self.cpBuffer[n] = dict(nodeName=item._item._node.nodeName, nodeChildren={}, nodeDict=nodeDict)
-                if _mode == 'branch':
-                    if item._item._children:
-                        #-- Store Children --#
-                        for c, child in enumerate(item._item.allChildren()):
-                            self.cpBuffer[n]['nodeChildren'][c] = eval(child.getDatas(asString=True))
+                self.cpBuffer[n] = item._item.snapshot(branch=(_mode == 'branch'))
             #-- Delete For cut --#
             if rm:
                 self.deleteGraphNodes(selItems)
@@ -264,54 +258,27 @@ class GraphZone(object):
                 selItems = self.currentGraph.selectedItems() or []
             else:
                 selItems = [dstItem]
+            #-- Get Parent --#
+            parent = None
+            if len(selItems) == 0:
+                self.log.detail("\t ---> Paste Nodes to world ...")
+            elif len(selItems) == 1:
+                self.log.detail("\t ---> Paste Nodes to %s ..." % selItems[0]._item._node.nodeName)
+                selItems[0]._item.setExpanded(True)
+                parent = selItems[0]._item
+            else:
+                self.log.warning("!!! Select only one destination node !!!")
+                return []
             #-- Paste Nodes --#
-            items = {}
+            items = []
             for n in sorted(self.cpBuffer.keys()):
                 if isinstance(n, int):
-                    nodeDict = self.cpBuffer[n]
-                    newNodeName = self.grapher.conformNewNodeName(nodeDict['nodeName'])
-                    newItem = None
-                    #-- Parent To World --#
-                    if len(selItems) == 0:
-                        self.log.detail("\t ---> Paste Node to world ...")
-                        newItem = self.grapher.tree.createItem(nodeType=nodeDict['nodeDict']['nodeType'],
-                                                               nodeName=newNodeName)
-                    #-- Parent To Node --#
-                    elif len(selItems) == 1:
-                        self.log.detail("\t ---> Paste Node to %s ..." % selItems[0]._item._node.nodeName)
-                        selItems[0]._item.setExpanded(True)
-                        newItem = self.grapher.tree.createItem(nodeType=nodeDict['nodeDict']['nodeType'],
-                                                               nodeName=newNodeName,
-                                                               nodeParent=selItems[0]._item._node.nodeName)
-                    newItem._node.setDatas(**nodeDict['nodeDict'])
-                    #-- Parent Child Node --#
-                    if newItem is not None:
-                        items[newItem] = nodeDict['nodeDict']
-                        if nodeDict['nodeChildren'].keys():
-                            #-- Check First Parent --#
-                            renameDict = dict()
-                            for c in sorted(nodeDict['nodeChildren'].keys()):
-                                newChildName = self.grapher.conformNewNodeName(nodeDict['nodeChildren'][c]['nodeName'])
-                                renameDict[nodeDict['nodeChildren'][c]['nodeName']] = newChildName
-                                if nodeDict['nodeChildren'][c]['parent'] == self.cpBuffer[n]['nodeName']:
-                                    nodeParent = newNodeName
-                                else:
-                                    _name = nodeDict['nodeChildren'][c]['parent']
-                                    if _name in renameDict.keys():
-                                        nodeParent = renameDict[_name]
-                                    else:
-                                        nodeParent = newNodeName
-                                nodeDict['nodeChildren'][c]['parent'] = nodeParent
-                                newChild = self.grapher.tree.createItem(nodeType=nodeDict['nodeChildren'][c]['nodeType'],
-                                                                        nodeName=newChildName,
-                                                                        nodeParent=nodeParent)
-                                newChild._node.setDatas(**nodeDict['nodeChildren'][c])
-                                items[newChild] = nodeDict
+                    items.extend(self.grapher.tree.pasteSnapshot(self.cpBuffer[n], parent=parent))
             #-- Clear CpBuffer --#
             if self.cpBuffer['_mode'] == 'branch':
                 self.cpBuffer = None
             #-- Result --#
-            return items.keys()
+            return items
         self.log.warning("!!! Nothing to paste !!!")
 
     def moveNodes(self, side='up'):
@@ -554,15 +521,12 @@ class GraphZone(object):
                 loopChecks[node.nodeName] = node.nodeLoopParams[node.nodeVersion]['checkFiles']
         #-- Clear CheckFiles --#
         if loopChecks.keys():
-            tmpPath = pFile.conformPath(os.path.join(self.grapher.graphTmpPath, 'tmpFiles'))
-            for tmpFile in os.listdir(tmpPath):
-                for k, v in loopChecks.iteritems():
-                    if tmpFile.startswith('%s.' % v) and tmpFile.endswith('.py'):
-                        try:
-                            os.remove(pFile.conformPath(os.path.join(tmpPath, tmpFile)))
-                            self.log.detail("\t ---> %s" % tmpFile)
-                        except:
-                            self.log.warning("\t !!! Can not delete %s" % tmpFile)
+            try:
+                gpCmds.CheckJournal.clear(self.grapher.graphCheckFile, sorted(set(loopChecks.values())))
+                for k, v in sorted(loopChecks.iteritems()):
+                    self.log.detail("\t ---> %s: %s" % (k, v))
+            except:
+                self.log.warning("\t !!! Can not clear loop checks: %s" % self.grapher.graphCheckFile)
 
 
 class GraphView(QtGui.QGraphicsView):
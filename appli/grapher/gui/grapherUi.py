@@ -6,6 +6,7 @@ from lib.qt import procQt, textEditor
 from lib.system import procFile as pFile
 from appli.grapher.gui.ui import grapherUI
 from appli.grapher.core.grapher import Grapher
+from appli.grapher.core import graphFile as gFile
 from appli.grapher.gui import graphZone, toolsWgts, nodeEditor, graphWgts, graphBank
 
 
@@ -110,6 +111,34 @@ class GrapherUi(QtGui.QMainWindow, grapherUI.Ui_mwGrapher):
         self.miExecGraph.setShortcut('Alt+E')
         self.miExecNode.triggered.connect(partial(self.on_miExecNode, item=None))
         self.miExecNode.setShortcut('Shift+E')
+        self.miResumeRun = self.menuExec.addAction('Resume Last Run')
+        self.miResumeRun.triggered.connect(self.on_miResumeRun)
+        #-- Workers --#
+        self.execWorkers = []
+        self.menuExec.addSeparator()
+        self.menuWorkers = self.menuExec.addMenu('Workers')
+        for n in [1, 2, 4, 8, 16, 32]:
+            newItem = self.menuWorkers.addAction(str(n))
+            newItem.setCheckable(True)
+            newItem.triggered.connect(partial(self.on_miWorkers, n))
+            self.execWorkers.append(newItem)
+        self.on_miWorkers(self.grapher.gpExec.workers)
+        self.miWarmWorkers = self.menuExec.addAction('Warm Workers')
+        self.miWarmWorkers.setCheckable(True)
+        self.miWarmWorkers.setChecked(self.grapher.gpExec.warmMode)
+        self.miWarmWorkers.triggered.connect(self.on_miWarmWorkers)
+        #-- Result Memo --#
+        self.menuExec.addSeparator()
+        self.miSkipUpToDate = self.menuExec.addAction('Skip Up To Date Nodes')
+        self.miSkipUpToDate.setCheckable(True)
+        self.miSkipUpToDate.setChecked(self.grapher.gpExec.memoMode)
+        self.miSkipUpToDate.triggered.connect(self.on_miSkipUpToDate)
+        self.miForceRerun = self.menuExec.addAction('Force Rerun')
+        self.miForceRerun.setCheckable(True)
+        self.miForceRerun.setChecked(self.grapher.gpExec.memoForce)
+        self.miForceRerun.triggered.connect(self.on_miForceRerun)
+        self.miExplainDirty = self.menuExec.addAction('Explain Dirty Nodes')
+        self.miExplainDirty.triggered.connect(self.on_miExplainDirty)
 
     # noinspection PyUnresolvedReferences
     def _menuDisplay(self):
@@ -229,7 +258,7 @@ class GrapherUi(QtGui.QMainWindow, grapherUI.Ui_mwGrapher):
         if not os.path.exists(self.userFile):
             userDatas = ["recentFiles = []"]
             try:
-                pFile.writeFile(self.userFile, '\n'.join(userDatas))
+                pFile.writeFile(self.userFile, '\n'.join(userDatas), atomic=True)
                 self.log.info("Create user file: %s" % self.userFile)
             except:
                 raise IOError("!!! Can not create user file: %s !!!" % self.userFile)
@@ -273,8 +302,8 @@ class GrapherUi(QtGui.QMainWindow, grapherUI.Ui_mwGrapher):
         gpFiles = self.fdSaveGraph.selectedFiles()
         if gpFiles:
             graphFile = gpFiles[0]
-            if not graphFile.endsWith('.gp.py'):
-                graphFile = '%s.gp.py' % graphFile.split('.')[0]
+            if not graphFile.endsWith('.gp.py') and not graphFile.endsWith(gFile.formatExt):
+                graphFile = '%s%s' % (graphFile.split('.')[0], gFile.formatExt)
             self.updateCore()
             result = self.grapher.saveAs(str(graphFile))
             if result:
@@ -299,7 +328,7 @@ class GrapherUi(QtGui.QMainWindow, grapherUI.Ui_mwGrapher):
                 else:
                     userTxt.append("%s = %s" % (k, v))
             try:
-                pFile.writeFile(self.userFile, '\n'.join(userTxt))
+                pFile.writeFile(self.userFile, '\n'.join(userTxt), atomic=True)
                 self.log.debug("Recent files updated")
             except:
                 raise IOError("!!! Can not update recent files !!!")
@@ -325,7 +354,7 @@ class GrapherUi(QtGui.QMainWindow, grapherUI.Ui_mwGrapher):
             root = self.grapher.graphPath
         else:
             root = 'E:/prods'
-        self.fdLoadGraph = procQt.fileDialog(fdFileMode='ExistingFile', fdRoot=root, fdFilters=['*.gp.py'],
+        self.fdLoadGraph = procQt.fileDialog(fdFileMode='ExistingFile', fdRoot=root, fdFilters=['*%s' % gFile.formatExt, '*.gp.py'],
                                              fdCmd=self.load)
         self.fdLoadGraph.exec_()
 
@@ -353,7 +382,7 @@ class GrapherUi(QtGui.QMainWindow, grapherUI.Ui_mwGrapher):
             root = self.grapher.graphPath
         else:
             root = 'E:/prods'
-        self.fdSaveGraph = procQt.fileDialog(fdMode='save', fdRoot=root, fdFilters=['*.gp.py'],
+        self.fdSaveGraph = procQt.fileDialog(fdMode='save', fdRoot=root, fdFilters=['*%s' % gFile.formatExt, '*.gp.py'],
                                              fdCmd=self.saveAs)
         self.fdSaveGraph.exec_()
 
@@ -389,7 +418,7 @@ class GrapherUi(QtGui.QMainWindow, grapherUI.Ui_mwGrapher):
         """
         self.log.detail(">>> Launch menuItem 'Exec Graph' ...")
         logFile = self.grapher.gpExec.execGraph(xTerm=self.graphLogs.showXterm, wait=self.graphLogs.waitAtEnd)
-        if not self.graphLogs.cbShowXterm.isChecked():
+        if not self.graphLogs.cbShowXterm.isChecked() or self.grapher.gpExec.workers > 1:
             self.graphLogs.addJob(logFile)
 
     def on_miExecNode(self, item=None):
@@ -411,9 +440,76 @@ class GrapherUi(QtGui.QMainWindow, grapherUI.Ui_mwGrapher):
         if hasattr(item._item._node, 'nodeExecMode'):
             logFile = self.grapher.gpExec.execGraph(item._item, xTerm=self.graphLogs.showXterm,
                                                                 wait=self.graphLogs.waitAtEnd)
-            if not self.graphLogs.cbShowXterm.isChecked():
+            if not self.graphLogs.cbShowXterm.isChecked() or self.grapher.gpExec.workers > 1:
                 self.graphLogs.addJob(logFile)
 
+    def on_miResumeRun(self):
+        """
+        Command launched when 'Resume Last Run' QMenuItem is triggered
+
+        Resume last run, completed nodes are skipped
+        """
+        self.log.detail(">>> Launch menuItem 'Resume Last Run' ...")
+        try:
+            logFile = self.grapher.gpExec.resumeGraph(echo=False, blocking=False)
+        except IOError, err:
+            self.log.error(str(err))
+            return
+        self.graphLogs.addJob(logFile)
+
+    def on_miWorkers(self, workers):
+        """
+        Command launched when 'Workers' QMenuItem is triggered
+
+        Set max number of parallel processes
+        :param workers: Number of workers (1 = sequential exec script)
+        :type workers: int
+        """
+        self.log.detail(">>> Launch menuItem 'Workers': %s ..." % workers)
+        for item in self.execWorkers:
+            item.setChecked(str(item.text()) == str(workers))
+        self.grapher.gpExec.workers = workers
+
+    def on_miWarmWorkers(self):
+        """
+        Command launched when 'Warm Workers' QMenuItem is triggered
+
+        Run python nodes in long-lived interpreters instead of one process per node
+        """
+        self.log.detail(">>> Launch menuItem 'Warm Workers' ...")
+        self.grapher.gpExec.warmMode = self.miWarmWorkers.isChecked()
+
+    def on_miSkipUpToDate(self):
+        """
+        Command launched when 'Skip Up To Date Nodes' QMenuItem is triggered
+
+        Skip nodes whose script, variables, upstream results and declared input files are unchanged
+        """
+        self.log.detail(">>> Launch menuItem 'Skip Up To Date Nodes' ...")
+        self.grapher.gpExec.memoMode = self.miSkipUpToDate.isChecked()
+
+    def on_miForceRerun(self):
+        """
+        Command launched when 'Force Rerun' QMenuItem is triggered
+
+        Consider all nodes as dirty and write all script files again, results are still recorded
+        """
+        self.log.detail(">>> Launch menuItem 'Force Rerun' ...")
+        self.grapher.gpExec.memoForce = self.miForceRerun.isChecked()
+        if self.grapher.gpExec.memoForce and self.grapher._graphFile is not None:
+            self.grapher.gpExec.nodeCompiler.cache.clear()
+
+    def on_miExplainDirty(self):
+        """
+        Command launched when 'Explain Dirty Nodes' QMenuItem is triggered
+
+        Print why each node would be executed
+        """
+        self.log.detail(">>> Launch menuItem 'Explain Dirty Nodes' ...")
+        self.log.info("#--- Dirty Nodes ---#", newLinesBefore=1)
+        for nodeName, reason in self.grapher.gpExec.explainNodes():
+            self.log.info("%s: %s" % (nodeName, 'up to date' if reason is None else reason))
+
     def on_miToolsOrientChanged(self, orient=False, force=False):
         """
         Orient toolsTab and their contents
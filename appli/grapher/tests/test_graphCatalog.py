@@ -0,0 +1,41 @@
+import os, shutil, tempfile, unittest
+from appli.grapher.core import graphCatalog
+
+
+class BankCatalogTest(unittest.TestCase):
+    """
+    Bank catalog persisted between sessions
+    """
+
+    def setUp(self):
+        self.tmpPath = tempfile.mkdtemp()
+        self.bankPath = os.path.join(self.tmpPath, 'bank')
+        self.catalogFile = os.path.join(self.tmpPath, 'bankCatalog.json')
+        os.makedirs(os.path.join(self.bankPath, 'caf\xc3\xa9'))
+        self.writeFile('caf\xc3\xa9/render.sc.py', "comment = 'Render #maya'\nrequires = ''\nscript = ''\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpPath)
+
+    def writeFile(self, relPath, text):
+        with open(os.path.join(self.bankPath, relPath), 'w') as fileId:
+            fileId.write(text)
+
+    def test_nonAsciiFolder(self):
+        graphCatalog.BankCatalog(self.bankPath, self.catalogFile).refresh()
+        catalog = graphCatalog.BankCatalog(self.bankPath, self.catalogFile)
+        self.assertEqual(catalog.dirs['']['folders'], ['caf\xc3\xa9'])
+        pathDict = catalog.refresh(deep=True)
+        self.assertEqual(pathDict['_order'], [catalog.bankPath, '%s/caf\xc3\xa9' % catalog.bankPath])
+        self.assertEqual(catalog.search('tag:maya'), ['caf\xc3\xa9/render.sc.py'])
+
+    def test_missingDatas(self):
+        self.writeFile('broken.nd.py', "comment = 'no node datas'\n")
+        catalog = graphCatalog.BankCatalog(self.bankPath, self.catalogFile)
+        catalog.refresh()
+        self.assertTrue('nodeDatas' in catalog.entries['broken.nd.py']['error'])
+        self.assertEqual(catalog.entries['caf\xc3\xa9/render.sc.py']['error'], None)
+
+
+if __name__ == '__main__':
+    unittest.main()
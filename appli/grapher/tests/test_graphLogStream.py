@@ -0,0 +1,35 @@
+import os, sys, shutil, tempfile, threading, subprocess, unittest
+from appli.grapher.core import graphLogStream
+
+
+class LogStreamTest(unittest.TestCase):
+    """
+    Log file tail of a process writing its own log
+    """
+
+    def setUp(self):
+        self.tmpPath = tempfile.mkdtemp()
+        self.logFile = os.path.join(self.tmpPath, 'exec.log')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpPath)
+
+    def test_followUntilProcessEnds(self):
+        script = "import sys, time\nfor n in range(5):\n    print n\n    time.sleep(0.05)\nsys.stdout.write('end')\n"
+        with open(self.logFile, 'w') as logId:
+            proc = subprocess.Popen([sys.executable, '-u', '-c', script], stdout=logId, stderr=subprocess.STDOUT)
+        ended = threading.Event()
+        stream = graphLogStream.LogStream(self.logFile)
+        thread = stream.follow(interval=0.05, stop=ended)
+        proc.wait()
+        ended.set()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertFalse(stream.running)
+        records, dropped = stream.since(0)
+        self.assertEqual([record[3] for record in records], ['0', '1', '2', '3', '4', 'end'])
+        self.assertEqual(dropped, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import sys, time, unittest
+from appli.grapher.core import graphQueue
+
+
+class LocalQueueTest(unittest.TestCase):
+    """
+    Job server and worker agents on localhost
+    """
+
+    def setUp(self):
+        self.server = None
+        self.agents = []
+
+    def tearDown(self):
+        if self.server is not None:
+            graphQueue.stopLocalQueue(self.server, self.agents)
+
+    def test_submitWait(self):
+        self.server, self.agents = graphQueue.localQueue(workers=2, timeout=5, beatInterval=0.2)
+        client = graphQueue.QueueClient(self.server.address, pollInterval=0.05, token=self.server.token)
+        okId = client.submit([sys.executable, '-c', "print 'hello'"], name='ok')
+        failId = client.submit([sys.executable, '-c', "raise SystemExit(4)"], name='fail')
+        result = client.wait(okId)
+        self.assertEqual(result['status'], 'done')
+        self.assertEqual(result['exit'], 0)
+        self.assertEqual(result['output'], ['hello'])
+        result = client.wait(failId)
+        self.assertEqual(result['status'], 'failed')
+        self.assertEqual(result['exit'], 4)
+
+    def test_token(self):
+        self.server, self.agents = graphQueue.localQueue(workers=0)
+        self.assertEqual(self.server.server.server_address[0], '127.0.0.1')
+        client = graphQueue.QueueClient(self.server.address, token='wrong')
+        self.assertRaises(IOError, client.submit, [sys.executable, '-c', 'pass'])
+        self.assertRaises(IOError, client.info)
+        self.assertEqual(self.server.queue.jobs, dict())
+
+    def test_requeueMissedHeartbeat(self):
+        self.server, self.agents = graphQueue.localQueue(workers=0, timeout=0.5)
+        client = graphQueue.QueueClient(self.server.address, pollInterval=0.05, token=self.server.token)
+        jobId = client.submit([sys.executable, '-c', "print 'ran'"])
+        #-- Pull Without Heartbeat --#
+        job = graphQueue.request(self.server.address, dict(op='pull', worker='ghost', pools=None),
+                                 token=self.server.token)['job']
+        self.assertEqual(job['jobId'], jobId)
+        agent = graphQueue.WorkerAgent(self.server.address, workerName='alive', beatInterval=0.1,
+                                       pollInterval=0.05, token=self.server.token)
+        agent.start()
+        self.agents.append(agent)
+        result = client.wait(jobId)
+        self.assertEqual(result['status'], 'done')
+        self.assertEqual(result['worker'], 'alive')
+        self.assertEqual(result['attempts'], 2)
+        self.assertTrue("!!! Worker lost: ghost !!!" in result['output'])
+        #-- Late Worker Is Told To Kill Its Job --#
+        reply = graphQueue.request(self.server.address, dict(op='beat', worker='ghost', output={jobId: []}),
+                                   token=self.server.token)
+        self.assertEqual(reply['cancel'], [jobId])
+
+    def test_cancelKillsJob(self):
+        self.server, self.agents = graphQueue.localQueue(workers=1, beatInterval=0.1)
+        client = graphQueue.QueueClient(self.server.address, pollInterval=0.05, token=self.server.token)
+        jobId = client.submit([sys.executable, '-c', "import time; time.sleep(30)"])
+        while not client.status(jobId)['status'] == 'running':
+            time.sleep(0.05)
+        client.cancel(jobId)
+        start = time.time()
+        while self.agents[0]._procs and time.time() - start < 10:
+            time.sleep(0.05)
+        self.assertEqual(self.agents[0]._procs, dict())
+        self.assertTrue(time.time() - start < 10)
+        self.assertEqual(client.status(jobId)['status'], 'failed')
+
+    def test_purgeFinishedJobs(self):
+        queue = graphQueue.JobQueue(keep=60)
+        jobId = queue.dispatch(dict(op='submit', cmd=['none']))['jobId']
+        queue.dispatch(dict(op='pull', worker='w'))
+        queue.dispatch(dict(op='done', worker='w', jobId=jobId, exit=0))
+        queue.reap(now=time.time() + 30)
+        self.assertTrue(jobId in queue.jobs)
+        queue.reap(now=time.time() + 90)
+        self.assertFalse(jobId in queue.jobs)
+
+    def test_cancelThenPurge(self):
+        queue = graphQueue.JobQueue(keep=0)
+        #-- Queued Job Canceled --#
+        queuedId = queue.dispatch(dict(op='submit', cmd=['none'], pool='render'))['jobId']
+        queue.dispatch(dict(op='cancel', jobId=queuedId))
+        #-- Running Job Canceled, Its Worker Then Idle --#
+        runningId = queue.dispatch(dict(op='submit', cmd=['none']))['jobId']
+        self.assertEqual(queue.dispatch(dict(op='pull', worker='w', pools=['default']))['job']['jobId'], runningId)
+        queue.dispatch(dict(op='cancel', jobId=runningId))
+        queue.reap(now=time.time() + 1)
+        self.assertEqual(queue.jobs, dict())
+        self.assertEqual(queue.dispatch(dict(op='pull', worker='w')), dict(job=None))
+        self.assertEqual(queue.workers['w']['jobs'], [])
+        self.assertEqual(queue.dispatch(dict(op='done', worker='w', jobId=runningId, exit=-1)), dict(accepted=False))
+        #-- Lost Worker Reaped --#
+        queue.reap(now=time.time() + queue.timeout + 1)
+        self.assertEqual(queue.workers, dict())
+        self.assertEqual(queue.dispatch(dict(op='info')), dict(jobs=dict(), workers=dict()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import sys, unittest
+from appli.grapher.core import graphScheduler
+
+
+class SchedulerTest(unittest.TestCase):
+    """
+    Scheduler worker pools
+    """
+
+    def newScheduler(self, workers=2):
+        sched = graphScheduler.Scheduler(workers=workers)
+        sched.log.level = 'critical'
+        return sched
+
+    def test_dependencies(self):
+        sched = self.newScheduler()
+        sched.addTask(graphScheduler.SchedulerTask('a', [sys.executable, '-c', 'pass']))
+        sched.addTask(graphScheduler.SchedulerTask('b', [sys.executable, '-c', 'raise SystemExit(3)'],
+                                                   depends=['a']))
+        sched.addTask(graphScheduler.SchedulerTask('c', [sys.executable, '-c', 'pass'], depends=['b']))
+        results = sched.run()
+        self.assertEqual(results['a'], 0)
+        self.assertEqual(results['b'], 3)
+        self.assertEqual(sched.getTask('c').status, 'skipped')
+
+    def test_taskErrorDoesNotHang(self):
+        sched = self.newScheduler()
+
+        def execTask(task):
+            if task.taskName == 'bad':
+                raise ValueError("bad reply")
+            task.exitCode = 0
+            task.status = 'done'
+
+        sched.execTask = execTask
+        sched.addTask(graphScheduler.SchedulerTask('bad', ['none']))
+        sched.addTask(graphScheduler.SchedulerTask('good', ['none']))
+        sched.addTask(graphScheduler.SchedulerTask('child', ['none'], depends=['bad']))
+        thread = sched.start()
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(sched.getTask('bad').status, 'failed')
+        self.assertEqual(sched.getTask('bad').exitCode, -1)
+        self.assertEqual(sched.getTask('good').status, 'done')
+        self.assertEqual(sched.getTask('child').status, 'skipped')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import os, shutil, tempfile, unittest
+from appli.grapher.core import grapher
+
+
+class NestedLoopTest(unittest.TestCase):
+    """
+    Nested loops flattened into scheduler tasks
+    """
+
+    def setUp(self):
+        self.tmpPath = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        self.pythonPath = os.environ.get('PYTHONPATH')
+        rootPath = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+        os.environ['PYTHONPATH'] = os.pathsep.join([rootPath] + [p for p in [self.pythonPath] if p])
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        if self.pythonPath is None:
+            os.environ.pop('PYTHONPATH', None)
+        else:
+            os.environ['PYTHONPATH'] = self.pythonPath
+        shutil.rmtree(self.tmpPath)
+
+    @staticmethod
+    def nodeDatas(nodeName, nodeType, parent):
+        return dict(nodeName=nodeName, nodeType=nodeType, parent=parent, nodeIsEnabled=True, nodeIsActive=True,
+                    nodeIsExpanded=False, nodeVersion=0, nodeVersions={0: 'v0'}, nodeComments={0: ''},
+                    nodeTrash={0: ''}, nodeVariables={0: {}})
+
+    @classmethod
+    def loopDatas(cls, nodeName, parent, iterator, loopStop, checkName):
+        datas = cls.nodeDatas(nodeName, 'loop', parent)
+        datas['nodeLoopParams'] = {0: {'remote': False, 'packet': 1, 'pool': 'default', 'mode': 'Incremental',
+                                       'type': 'Range', 'iterator': iterator, 'checkFiles': checkName,
+                                       'loopStart': 1, 'loopStop': loopStop, 'loopStep': 1,
+                                       'loopList': [], 'loopSingle': 1}}
+        return datas
+
+    def runNested(self, outerCheck, innerCheck):
+        outPath = os.path.join(self.tmpPath, 'out')
+        os.mkdir(outPath)
+        leaf = self.nodeDatas('leaf_1', 'sysData', 'inner_1')
+        leaf['nodeExecMode'] = {0: False}
+        leaf['nodeScript'] = {0: "open(%r + '/%%s_%%s' %% (i, j), 'a').write('x')\n" % outPath}
+        gp = grapher.Grapher(logLvl='critical')
+        gp.graphFile = os.path.join(self.tmpPath, 'nested.gp.jsonl')
+        gp.tree.buildTree({0: self.loopDatas('outer_1', None, 'i', 2, outerCheck),
+                           1: self.loopDatas('inner_1', 'outer_1', 'j', 3, innerCheck), 2: leaf})
+        gp.save()
+        os.chdir(self.tmpPath)
+        results = gp.gpExec.runGraph(workers=4, echo=False)
+        self.assertEqual(len(results), 8)
+        self.assertEqual(set(results.values()), set([0]))
+        runs = dict()
+        for fileName in os.listdir(outPath):
+            with open(os.path.join(outPath, fileName)) as fileId:
+                runs[fileName] = len(fileId.read())
+        return runs
+
+    def test_leafRunsOncePerIter(self):
+        expected = dict(('%s_%s' % (i, j), 1) for i in range(1, 3) for j in range(1, 4))
+        self.assertEqual(self.runNested('outerCheck', 'innerCheck'), expected)
+
+    def test_sharedCheckName(self):
+        expected = dict(('%s_%s' % (i, j), 1) for i in range(1, 3) for j in range(1, 4))
+        self.assertEqual(self.runNested('tmpCheck', 'tmpCheck'), expected)
+
+
+class VarResolverTest(unittest.TestCase):
+    """
+    Resolved variables cache keys
+    """
+
+    def test_iteratorInKey(self):
+        loop = NestedLoopTest.loopDatas('loop_1', None, 'i', 2, 'check')
+        child = NestedLoopTest.nodeDatas('child_1', 'sysData', 'loop_1')
+        child['nodeVariables'] = {0: {0: {'label': 'x', 'type': 0, 'value': 'i + 1', 'state': True}}}
+        gp = grapher.Grapher(logLvl='critical')
+        gp.graphFile = os.path.join(tempfile.gettempdir(), 'vars.gp.jsonl')
+        gp.tree.buildTree({0: loop, 1: child})
+        resolver = gp.gpExec.nodeCompiler.vars
+        item = gp.tree.getItemFromNodeName('child_1')
+        key = resolver.get(item).key
+        gp.tree.getItemFromNodeName('loop_1')._node.nodeLoopParams[0]['iterator'] = 'j'
+        resolver.clear()
+        self.assertNotEqual(resolver.get(item).key, key)
+
+
+class FragmentCacheTest(unittest.TestCase):
+    """
+    Compiled node fragments cache keys
+    """
+
+    def test_renameUpstream(self):
+        parent = NestedLoopTest.nodeDatas('parent_1', 'sysData', None)
+        child = NestedLoopTest.nodeDatas('child_1', 'sysData', 'parent_1')
+        for datas in [parent, child]:
+            datas['nodeExecMode'] = {0: False}
+            datas['nodeScript'] = {0: "print 'x'\n"}
+        gp = grapher.Grapher(logLvl='critical')
+        gp.graphFile = os.path.join(tempfile.gettempdir(), 'fragments.gp.jsonl')
+        gp.tree.buildTree({0: parent, 1: child})
+        gp.gpExec.memoMode = True
+        item = gp.tree.getItemFromNodeName('child_1')
+        self.assertIn("'parent_1'", gp.gpExec.nodeCompiler.itemDatas(item))
+        gp.tree.renameItem(gp.tree.getItemFromNodeName('parent_1'), 'upstream_1')
+        nodeTxt = gp.gpExec.nodeCompiler.itemDatas(item)
+        self.assertIn("'upstream_1'", nodeTxt)
+        self.assertNotIn("'parent_1'", nodeTxt)
+
+
+class GraphFileTest(unittest.TestCase):
+    """
+    Lazy scripts of a graph file saved by another session
+    """
+
+    def setUp(self):
+        self.tmpPath = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        self.graphFile = os.path.join(self.tmpPath, 'shared.gp.jsonl')
+        treeDatas = dict()
+        for n in range(3):
+            treeDatas[n] = NestedLoopTest.nodeDatas('node_%s' % (n + 1), 'sysData', None)
+            treeDatas[n]['nodeScript'] = {0: "print 'node %s'\n" % n}
+        gp = grapher.Grapher(logLvl='critical')
+        gp.graphFile = self.graphFile
+        gp.tree.buildTree(treeDatas)
+        gp.save()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmpPath)
+
+    def loadGraph(self):
+        gp = grapher.Grapher(logLvl='critical')
+        gp.load(self.graphFile)
+        return gp
+
+    @staticmethod
+    def scripts(gp):
+        return [gp.tree.getItemFromNodeName('node_%s' % n)._node.nodeScript[0] for n in range(1, 4)]
+
+    def test_twoSessions(self):
+        gpA = self.loadGraph()
+        gpB = self.loadGraph()
+        gpB.setComment('Saved by B, blob offsets are shifted')
+        gpB.tree.getItemFromNodeName('node_1')._node.nodeScript[0] = "print 'edited by B'\n"
+        gpB.save()
+        gpA.tree.getItemFromNodeName('node_1')._node.nodeScript[0] = "print 'edited by A'\n"
+        self.assertTrue(gpA.save())
+        self.assertEqual(self.scripts(gpA), ["print 'edited by A'\n", "print 'node 1'\n", "print 'node 2'\n"])
+        self.assertEqual(self.scripts(self.loadGraph()), self.scripts(gpA))
+
+
+if __name__ == '__main__':
+    unittest.main()
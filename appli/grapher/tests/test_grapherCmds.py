@@ -0,0 +1,122 @@
+import os, sys, shutil, tempfile, unittest
+from appli.grapher.core import grapherCmds
+
+
+class CheckJournalTest(unittest.TestCase):
+    """
+    Loop checkpoint journal
+    """
+
+    def setUp(self):
+        self.tmpPath = tempfile.mkdtemp()
+        self.journalFile = os.path.join(self.tmpPath, 'loopChecks.jsonl')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpPath)
+
+    def test_claim(self):
+        checks = grapherCmds.CheckJournal(self.journalFile)
+        self.assertEqual(checks.claim('tmpCheck', 'loop', 'i', 1), 'create')
+        self.assertEqual(checks.claim('tmpCheck', 'loop', 'i', 1), 'exists')
+        other = grapherCmds.CheckJournal(self.journalFile)
+        self.assertEqual(other.claim('tmpCheck', 'loop', 'i', 1), 'exists')
+        self.assertEqual(other.claim('tmpCheck', 'loop', 'i', 2), 'create')
+
+    def test_clearCompacts(self):
+        checks = grapherCmds.CheckJournal(self.journalFile)
+        for n in range(100):
+            checks.claim('checkA', 'loopA', 'i', n)
+        checks.claim('checkB', 'loopB', 'j', 0)
+        grapherCmds.CheckJournal.clear(self.journalFile, ['checkA'])
+        with open(self.journalFile) as fileId:
+            lines = fileId.readlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue('"compact"' in lines[0])
+        #-- Live Reader Sees Rewritten Journal --#
+        self.assertFalse(checks.isDone('checkA', 0))
+        self.assertTrue(checks.isDone('checkB', 0))
+        self.assertEqual(checks.claim('checkA', 'loopA', 'i', 0), 'create')
+        self.assertTrue(grapherCmds.CheckJournal(self.journalFile).isDone('checkA', 0))
+
+
+class LauncherTest(unittest.TestCase):
+    """
+    Node launcher namespace
+    """
+
+    def setUp(self):
+        self.tmpPath = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpPath)
+
+    def test_namespace(self):
+        launchFile = os.path.join(self.tmpPath, 'node.launch.py')
+        scriptFile = os.path.join(self.tmpPath, 'node.py')
+        with open(scriptFile, 'w') as fileId:
+            fileId.write("result = (Date, Time, Station, User, LoopNode, Iterator, Iter, i)\n")
+        grapherCmds.makeLauncher(launchFile, scriptFile, loopIters=[('loop_1', 'i', 3)])
+        namespace = dict()
+        execfile(launchFile, namespace)
+        self.assertEqual(namespace['result'][4:], ('loop_1', 'i', 3, 3))
+        self.assertTrue(all(namespace['result'][:4]))
+
+
+class WarmPoolTest(unittest.TestCase):
+    """
+    Warm interpreter pool, with current interpreter as launcher
+    """
+
+    def setUp(self):
+        self.tmpPath = tempfile.mkdtemp()
+        self.pool = None
+
+    def tearDown(self):
+        if self.pool is not None:
+            self.pool.close()
+        shutil.rmtree(self.tmpPath)
+
+    def script(self, name, text):
+        scriptFile = os.path.join(self.tmpPath, '%s.py' % name)
+        with open(scriptFile, 'w') as fileId:
+            fileId.write(text)
+        return scriptFile
+
+    def workerPid(self):
+        return self.pool._workers[sys.executable]['proc'].pid
+
+    def test_exitCodes(self):
+        self.pool = grapherCmds.WarmPool(maxTasks=10)
+        self.assertEqual(self.pool.run(sys.executable, self.script('ok', "x = 1\n")), 0)
+        pid = self.workerPid()
+        self.assertEqual(self.pool.run(sys.executable, self.script('exit3', "import sys\nsys.exit(3)\n")), 3)
+        self.assertEqual(self.pool.run(sys.executable, self.script('error', "raise ValueError('node')\n")), 1)
+        self.assertEqual(self.pool.run(sys.executable, self.script('msg', "import sys\nsys.exit('failed')\n")), 1)
+        self.assertEqual(self.workerPid(), pid)
+
+    def test_workerDied(self):
+        self.pool = grapherCmds.WarmPool(maxTasks=10)
+        self.assertEqual(self.pool.run(sys.executable, self.script('kill', "import os\nos._exit(5)\n")), 1)
+        self.assertFalse(sys.executable in self.pool._workers)
+        self.assertEqual(self.pool.run(sys.executable, self.script('ok', "x = 1\n")), 0)
+
+    def test_recycleMaxTasks(self):
+        self.pool = grapherCmds.WarmPool(maxTasks=2)
+        scriptFile = self.script('ok', "x = 1\n")
+        self.pool.run(sys.executable, scriptFile)
+        pid = self.workerPid()
+        self.pool.run(sys.executable, scriptFile)
+        self.assertFalse(sys.executable in self.pool._workers)
+        self.pool.run(sys.executable, scriptFile)
+        self.assertNotEqual(self.workerPid(), pid)
+
+    def test_recycleMaxRss(self):
+        if grapherCmds.peakRss() is None:
+            self.skipTest("peak rss not available")
+        self.pool = grapherCmds.WarmPool(maxTasks=10, maxRss=1)
+        self.assertEqual(self.pool.run(sys.executable, self.script('ok', "x = 1\n")), 0)
+        self.assertFalse(sys.executable in self.pool._workers)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,20 @@
-import os, math, time, subprocess, pprint
+import os, sys, dis, math, time, json, Queue, atexit, cPickle, binascii, threading, subprocess, pprint, collections
 from lib.env import studio
 
 
+_readCache = dict()
+_readCacheMax = 50000
+_readCacheDelay = 2
+_literalNames = {'__builtins__': {}, 'True': True, 'False': False, 'None': None, 'set': set, 'frozenset': frozenset}
+_literalOps = set([dis.opmap[op] for op in ['LOAD_CONST', 'LOAD_NAME', 'STORE_NAME', 'BUILD_TUPLE', 'BUILD_LIST',
+                                           'BUILD_MAP', 'STORE_MAP', 'BUILD_SET', 'UNARY_NEGATIVE', 'UNARY_POSITIVE',
+                                           'BINARY_ADD', 'BINARY_SUBTRACT', 'DUP_TOP', 'ROT_TWO', 'ROT_THREE',
+                                           'UNPACK_SEQUENCE', 'POP_TOP', 'RETURN_VALUE', 'EXTENDED_ARG']])
+_literalCall = dis.opmap['CALL_FUNCTION']
+_literalLoad = dis.opmap['LOAD_NAME']
+_literalSets = ['set', 'frozenset']
+
+
 def conformPath(path):
     """
     Comform path separator with '/'
@@ -15,7 +28,7 @@ def conformPath(path):
 
 def pathToDict(path, conformed=False):
     """
-    Translate directory contents to dict
+    Translate directory contents to dict (see procWalk.Snapshot)
 
     :param path: Absolut path
     :type path: str
@@ -26,15 +39,8 @@ def pathToDict(path, conformed=False):
     """
     if not os.path.exists(path):
         raise IOError, "!!! ERROR: Path not found!!!\n%s" % path
-    pathDict = {'_order': []}
-    for root, flds, files in os.walk(path):
-        if conformed:
-            rootPath = conformPath(root)
-        else:
-            rootPath = root
-        pathDict['_order'].append(rootPath)
-        pathDict[rootPath] = {'folders': flds, 'files': files}
-    return pathDict
+    from lib.system import procWalk
+    return procWalk.Snapshot.walk(path).toPathDict(conformed=conformed)
 
 def makeDir(path, log=None):
     """
@@ -137,57 +143,238 @@ def readFile(filePath):
     fileId.close()
     return getText
 
-def readDictFile(filePath):
+def _readCached(filePath, reader, cache=True):
     """
-    Read dict pyFile
+    Read given file with given reader, result is cached until file mtime or size changes.
+    Cached results are stored pickled, each call returns a new copy the caller can edit.
 
     :param filePath: File absolut path
     :type filePath: str
-    :return: Translated dictionnary
+    :param reader: Parse function, called with file path, returns (result, cachable)
+    :type reader: function
+    :param cache: Use in-process cache
+    :type cache: bool
+    :return: Parsed file
     :rtype: dict
     """
-    fileLines = ''.join(readFile(filePath))
-    if not fileLines in ['', ' ']:
-        return eval(''.join(fileLines))
+    try:
+        fileStat = os.stat(filePath)
+    except OSError:
+        raise IOError, "!!! Error: Can't read, file doesn't exists !!!"
+    key = (reader.__name__, filePath)
+    if cache:
+        record = _readCache.get(key)
+        if record is not None and record[0] == fileStat.st_mtime and record[1] == fileStat.st_size:
+            return cPickle.loads(record[2])
+    result, cachable = reader(filePath)
+    #-- Files edited in the last seconds may change again without mtime change --#
+    if cache and cachable and time.time() - fileStat.st_mtime > _readCacheDelay:
+        if len(_readCache) >= _readCacheMax:
+            _readCache.clear()
+        _readCache[key] = (fileStat.st_mtime, fileStat.st_size, cPickle.dumps(result, 2))
+    return result
+
+def clearReadCache(filePath=None):
+    """
+    Clear readDictFile / readPyFile cache
+
+    :param filePath: File absolut path (None = all files)
+    :type filePath: str
+    """
+    if filePath is None:
+        _readCache.clear()
     else:
-        return dict()
+        for key in _readCache.keys():
+            if key[1] == filePath:
+                _readCache.pop(key)
 
-def readPyFile(filePath, keepBuiltin=False):
+def _literalCode(text, filePath, mode):
     """
-    Get text from pyFile
+    Compile given text and check it only builds literals (constants, tuples, lists, dicts, sets, names assignment).
+    The only call allowed has one positional argument, for the 'set([...])' text pprint writes:
+    set and frozenset are the only callables literal names give access to.
+    No attribute, import or subscript opcode can be run by the returned code.
+
+    :param text: Python text
+    :type text: str
+    :param filePath: File absolut path
+    :type filePath: str
+    :param mode: 'eval' (single expression) or 'exec' (assignments)
+    :type mode: str
+    :return: Code object (None if text is not literal)
+    :rtype: code
+    """
+    code = compile(text, filePath, mode)
+    byteCode = code.co_code
+    n, size = 0, len(byteCode)
+    setCalls = 0
+    while n < size:
+        opCode = ord(byteCode[n])
+        if opCode == _literalCall:
+            if not setCalls or not (ord(byteCode[n + 1]) == 1 and ord(byteCode[n + 2]) == 0):
+                return None
+            setCalls -= 1
+        elif not opCode in _literalOps:
+            return None
+        elif opCode == _literalLoad and code.co_names[ord(byteCode[n + 1]) + 256 * ord(byteCode[n + 2])] in _literalSets:
+            setCalls += 1
+        n += 3 if opCode >= dis.HAVE_ARGUMENT else 1
+    return code
+
+def _parseDictFile(filePath):
+    fileLines = ''.join(readFile(filePath))
+    if fileLines.strip() == '':
+        return dict(), True
+    code = _literalCode(fileLines, filePath, 'eval')
+    if code is None:
+        raise IOError, "!!! Error: Not a literal dict file: %s !!!" % filePath
+    return eval(code, dict(_literalNames), {}), True
+
+def _parsePyFile(filePath):
+    fileLines = ''.join(readFile(filePath))
+    code = _literalCode(fileLines, filePath, 'exec')
+    params = {}
+    #-- Python Code --#
+    if code is None:
+        execfile(filePath, params)
+        params.pop('__builtins__', None)
+        return params, False
+    #-- Literal Assignments Only --#
+    exec code in dict(_literalNames), params
+    return params, True
+
+def readDictFile(filePath, cache=True):
+    """
+    Read dict pyFile. File must be a python literal (pprint format), no code is evaluated.
+    Unchanged files are returned from cache.
+
+    :param filePath: File absolut path
+    :type filePath: str
+    :param cache: Use in-process cache
+    :type cache: bool
+    :return: Translated dictionnary
+    :rtype: dict
+    """
+    return _readCached(filePath, _parseDictFile, cache=cache)
+
+def readPyFile(filePath, keepBuiltin=False, cache=True):
+    """
+    Get text from pyFile. Files only made of 'name = literal' lines are read without running any call
+    and returned from cache while unchanged, other files are executed.
 
     :param filePath: Python file absolut path
     :type filePath: str
-    :param keepBuiltin: Keep builtins key
+    :param keepBuiltin: Keep builtins key (file is always executed)
     :type keepBuiltin: bool
+    :param cache: Use in-process cache
+    :type cache: bool
     :return: File dict
     :rtype: dict
     """
-    if not os.path.exists(filePath):
-        raise IOError, "!!! Error: Can't read, file doesn't exists !!!"
-    params = {}
-    execfile(filePath, params)
     if keepBuiltin:
+        if not os.path.exists(filePath):
+            raise IOError, "!!! Error: Can't read, file doesn't exists !!!"
+        params = {}
+        execfile(filePath, params)
         return params
-    else:
-        if '__builtins__' in params.keys():
-            params.pop('__builtins__')
-            return params
+    return _readCached(filePath, _parsePyFile, cache=cache)
 
-def writeDictFile(filePath, dictToPrint):
+def _renameOver(srcPath, dstPath):
     """
-    Create readable text file from given dict
+    Rename given file over destination file in one system call (MoveFileExW on Windows)
+
+    :param srcPath: Source file absolut path
+    :type srcPath: str
+    :param dstPath: Destination file absolut path, replaced if it exists
+    :type dstPath: str
+    """
+    if not os.name == 'nt':
+        os.rename(srcPath, dstPath)
+        return
+    import ctypes
+    paths = []
+    for path in [srcPath, dstPath]:
+        if not isinstance(path, unicode):
+            path = path.decode(sys.getfilesystemencoding())
+        paths.append(path)
+    #-- MOVEFILE_REPLACE_EXISTING | MOVEFILE_WRITE_THROUGH --#
+    if not ctypes.windll.kernel32.MoveFileExW(paths[0], paths[1], 0x1 | 0x8):
+        raise ctypes.WinError()
+
+def replaceFile(filePath, textToWrite, fsync=False):
+    """
+    Atomically replace file contents: text is written to a temp file in the same directory,
+    then renamed over given file. A crash leaves either the previous or the new file, never a truncated one.
+    Temp names are unique per call, so threads and processes can replace the same file.
+
+    :param filePath: File absolut path
+    :type filePath: str
+    :param textToWrite: Text to edit in file
+    :type textToWrite: str | list
+    :param fsync: Flush temp file to disk before rename
+    :type fsync: bool
+    """
+    tmpFile = '%s.%s.%s.tmp' % (filePath, os.getpid(), binascii.hexlify(os.urandom(4)))
+    try:
+        fileId = open(tmpFile, 'w')
+        try:
+            if isinstance(textToWrite, basestring):
+                fileId.write(textToWrite)
+            else:
+                fileId.writelines(textToWrite)
+            if fsync:
+                fileId.flush()
+                os.fsync(fileId.fileno())
+        finally:
+            fileId.close()
+        _renameOver(tmpFile, filePath)
+    finally:
+        if os.path.exists(tmpFile):
+            os.remove(tmpFile)
+
+def appendFile(filePath, textToWrite, fsync=False):
+    """
+    Append text at end of file without reading it (file is created if needed).
+    If file doesn't end with a line ending, one is added first.
+
+    :param filePath: File absolut path
+    :type filePath: str
+    :param textToWrite: Text to add in file
+    :type textToWrite: str | list
+    :param fsync: Flush file to disk
+    :type fsync: bool
+    """
+    if not isinstance(textToWrite, basestring):
+        textToWrite = ''.join(textToWrite)
+    fileId = open(filePath, 'ab+')
+    try:
+        fileId.seek(0, 2)
+        if fileId.tell():
+            fileId.seek(-1, 2)
+            if not fileId.read(1) == '\n':
+                textToWrite = '\n%s' % textToWrite
+            fileId.seek(0, 2)
+        fileId.write(textToWrite)
+        if fsync:
+            fileId.flush()
+            os.fsync(fileId.fileno())
+    finally:
+        fileId.close()
+
+def writeDictFile(filePath, dictToPrint, fsync=False):
+    """
+    Create readable text file from given dict. File is replaced atomically
 
     :param filePath: File absolut path
     :type filePath: str
     :param dictToPrint: Dict to translate and print
     :type dictToPrint: dict
+    :param fsync: Flush file to disk
+    :type fsync: bool
     """
-    fileId = open(filePath, 'w')
-    fileId.write(pprint.pformat(dictToPrint))
-    fileId.close()
+    replaceFile(filePath, pprint.pformat(dictToPrint), fsync=fsync)
 
-def writeFile(filePath, textToWrite, add=False):
+def writeFile(filePath, textToWrite, add=False, atomic=False, fsync=False):
     """
     Create and edit text file. If file already exists, it is overwritten
 
@@ -195,22 +382,29 @@ def writeFile(filePath, textToWrite, add=False):
     :type filePath: str
     :param textToWrite: Text to edit in file
     :type textToWrite: str | list
-    :param add: Add text to existing one in file
+    :param add: Add text to existing one in file (appended, file is not read)
     :type add: bool
+    :param atomic: Replace file atomically (see replaceFile)
+    :type atomic: bool
+    :param fsync: Flush file to disk
+    :type fsync: bool
     """
-    oldTxt = ""
     if add:
-        oldTxt = ''.join(readFile(filePath))
-        if not oldTxt.endswith('\n'):
-            oldTxt = "%s\n" % oldTxt
-    fileId = open(filePath, 'w')
-    if add:
-        fileId.write(oldTxt)
-    if isinstance(textToWrite, str):
-        fileId.write(textToWrite)
-    elif isinstance(textToWrite, (list, tuple)):
-        fileId.writelines(textToWrite)
-    fileId.close()
+        if not os.path.exists(filePath):
+            raise IOError, "!!! Error: Can't read, file doesn't exists !!!"
+        appendFile(filePath, textToWrite, fsync=fsync)
+    elif atomic:
+        replaceFile(filePath, textToWrite, fsync=fsync)
+    else:
+        fileId = open(filePath, 'w')
+        if isinstance(textToWrite, str):
+            fileId.write(textToWrite)
+        elif isinstance(textToWrite, (list, tuple)):
+            fileId.writelines(textToWrite)
+        if fsync:
+            fileId.flush()
+            os.fsync(fileId.fileno())
+        fileId.close()
 
 def fileSizeFormat(_bytes, precision=2):
     """
@@ -265,9 +459,247 @@ def getTime():
     return time.strftime("%H_%M_%S")
 
 
+class FileAppender(object):
+    """
+    Buffered line appender for high frequency writers (logs, journals).
+    Lines are kept in memory and appended in one write when buffer is full,
+    when flushDelay is exceeded, or on flush / close. Thread safe.
+
+    :param filePath: File absolut path
+    :type filePath: str
+    :param maxLines: Lines buffered before write
+    :type maxLines: int
+    :param flushDelay: Max seconds a line stays buffered (checked on write)
+    :type flushDelay: float
+    :param fsync: Flush file to disk on each write
+    :type fsync: bool
+    """
+
+    def __init__(self, filePath, maxLines=1000, flushDelay=1.0, fsync=False):
+        self.filePath = filePath
+        self.maxLines = max(1, int(maxLines))
+        self.flushDelay = flushDelay
+        self.fsync = fsync
+        self._lines = []
+        self._lastFlush = time.time()
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, line):
+        """
+        Add given line to buffer
+
+        :param line: Line, without line ending
+        :type line: str
+        """
+        with self._lock:
+            self._lines.append('%s\n' % line)
+            if len(self._lines) >= self.maxLines or time.time() - self._lastFlush >= self.flushDelay:
+                self._flush()
+
+    def flush(self):
+        """
+        Append buffered lines to file
+        """
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        self._lastFlush = time.time()
+        if self._lines:
+            lines, self._lines = self._lines, []
+            appendFile(self.filePath, lines, fsync=self.fsync)
+
+    def close(self):
+        """
+        Append buffered lines to file
+        """
+        self.flush()
+
+
+class LogRecord(object):
+    """
+    Logger record. Message is formatted with its arguments only when written
+
+    :param level: Level index
+    :type level: int
+    :param message: Message, '%' style format if args are given
+    :type message: str
+    :param args: Message arguments
+    :type args: tuple
+    :param fields: Structured record datas
+    :type fields: dict
+    :param newLinesBefore: New lines to insert befor message
+    :type newLinesBefore: int
+    :param newLinesAfter: New lines to insert after message
+    :type newLinesAfter: int
+    """
+
+    __slots__ = ('time', 'level', 'message', 'args', 'fields', 'newLinesBefore', 'newLinesAfter')
+
+    def __init__(self, level, message, args=(), fields=None, newLinesBefore=0, newLinesAfter=0):
+        self.time = time.time()
+        self.level = level
+        self.message = message
+        self.args = args
+        self.fields = fields
+        self.newLinesBefore = newLinesBefore
+        self.newLinesAfter = newLinesAfter
+
+    def getMessage(self):
+        """
+        Get formatted message
+
+        :return: Message
+        :rtype: str | unicode
+        """
+        if not self.args:
+            return self.message
+        try:
+            return self.message % self.args
+        except (TypeError, ValueError):
+            return "%s %s" % (self.message, ' '.join([repr(arg) for arg in self.args]))
+
+
+class ConsoleSink(object):
+    """
+    Logger sink printing records
+    """
+
+    @staticmethod
+    def emit(logger, record):
+        """
+        Print given record
+
+        :param logger: Record logger
+        :type logger: Logger
+        :param record: Record to print
+        :type record: LogRecord
+        """
+        print logger.format(record)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class JsonSink(object):
+    """
+    Logger sink appending records to a json lines file (one json dict per record)
+
+    :param filePath: Json lines file absolut path
+    :type filePath: str
+    :param maxLines: Records buffered before write
+    :type maxLines: int
+    :param flushDelay: Max seconds a record stays buffered
+    :type flushDelay: float
+    """
+
+    def __init__(self, filePath, maxLines=100, flushDelay=1.0):
+        self.filePath = filePath
+        self._appender = FileAppender(filePath, maxLines=maxLines, flushDelay=flushDelay)
+
+    def emit(self, logger, record):
+        """
+        Append given record
+
+        :param logger: Record logger
+        :type logger: Logger
+        :param record: Record to write
+        :type record: LogRecord
+        """
+        self._appender.write(json.dumps(logger.recordToDict(record), default=repr))
+
+    def flush(self):
+        self._appender.flush()
+
+    def close(self):
+        self._appender.close()
+
+
+class AsyncSink(object):
+    """
+    Logger sink writing records to given sink from a background thread.
+    Caller only appends records to a bounded buffer: when full, records are dropped (and counted) instead of blocking.
+
+    :param sink: Wrapped sink (ConsoleSink, JsonSink)
+    :type sink: object
+    :param maxSize: Max buffered records
+    :type maxSize: int
+    :param interval: Writer thread wake up interval in seconds
+    :type interval: float
+    """
+
+    def __init__(self, sink, maxSize=10000, interval=0.05):
+        self.sink = sink
+        self.maxSize = maxSize
+        self.interval = interval
+        self.dropped = 0
+        self._records = collections.deque()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='LogWriter')
+        self._thread.daemon = True
+        self._thread.start()
+        atexit.register(self.close)
+
+    def emit(self, logger, record):
+        """
+        Buffer given record
+
+        :param logger: Record logger
+        :type logger: Logger
+        :param record: Record to write
+        :type record: LogRecord
+        """
+        if len(self._records) >= self.maxSize:
+            self.dropped += 1
+        else:
+            self._records.append((logger, record))
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._stop.wait(self.interval)
+            self._drain()
+
+    def _drain(self):
+        with self._lock:
+            while self._records:
+                try:
+                    self.sink.emit(*self._records.popleft())
+                except Exception, err:
+                    print "!!! Log sink failed: %s !!!" % err
+
+    def flush(self):
+        """
+        Write buffered records
+        """
+        self._drain()
+        self.sink.flush()
+
+    def close(self):
+        """
+        Write buffered records and stop writer thread
+        """
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.flush()
+        self.sink.close()
+
+
 class Logger(object):
     """
-    Print given message using log levels
+    Print given message using log levels.
+    Level is checked before any formatting: '%' style arguments are only formatted for written records.
+    Recent records are kept in a ring buffer (see dump), records are written by sinks (console by default).
 
     :param title: Log title
     :type title: str
@@ -275,13 +707,48 @@ class Logger(object):
     :type level: str
     :param showTime: Add current time in log header
     :type showTime: bool
+    :param history: Max records kept in ring buffer
+    :type history: int
+    :param historyLevel: Level of records kept in ring buffer, even if not written (None = log level)
+    :type historyLevel: str
+    :param asyncOutput: Print from a background thread
+    :type asyncOutput: bool
     """
 
-    def __init__(self, title='LOG', level='info', showTime=False):
+    def __init__(self, title='LOG', level='info', showTime=False, history=1000, historyLevel=None, asyncOutput=False):
         self.levels = ['critical', 'error', 'warning', 'info', 'debug', 'detail']
+        self.labels = ['Critical', 'Error', 'Warning', 'Info', 'Debug', 'Detail']
         self.title = title
-        self.level = level
         self.showTime = showTime
+        self.history = collections.deque(maxlen=history)
+        self.sinks = [AsyncSink(ConsoleSink()) if asyncOutput else ConsoleSink()]
+        self._level = level
+        self._lvlIndex = self.levels.index(level)
+        self._historyIndex = -1
+        self._gate = self._lvlIndex
+        self.historyLevel = historyLevel
+
+    @property
+    def level(self):
+        """
+        Get current level
+
+        :return: Current level
+        :rtype: str
+        """
+        return self._level
+
+    @level.setter
+    def level(self, level):
+        """
+        Set current level
+
+        :param level: Log level ('critical', 'error', 'warning', 'info', 'debug', 'detail')
+        :type level: str
+        """
+        self._lvlIndex = self.levels.index(level)
+        self._level = level
+        self._gate = max(self._lvlIndex, self._historyIndex)
 
     @property
     def lvlIndex(self):
@@ -291,7 +758,160 @@ class Logger(object):
         :return: Current level index
         :rtype: int
         """
-        return self.levels.index(self.level)
+        return self._lvlIndex
+
+    @lvlIndex.setter
+    def lvlIndex(self, lvlIndex):
+        """
+        Set current level from given index
+
+        :param lvlIndex: Level index
+        :type lvlIndex: int
+        """
+        self.level = self.levels[lvlIndex]
+
+    @property
+    def historyLevel(self):
+        """
+        Get ring buffer level
+
+        :return: Ring buffer level (None = log level)
+        :rtype: str
+        """
+        if self._historyIndex < 0:
+            return None
+        return self.levels[self._historyIndex]
+
+    @historyLevel.setter
+    def historyLevel(self, level):
+        """
+        Set ring buffer level
+
+        :param level: Log level (None = log level)
+        :type level: str
+        """
+        self._historyIndex = -1 if level is None else self.levels.index(level)
+        self._gate = max(self._lvlIndex, self._historyIndex)
+
+    def isEnabled(self, level):
+        """
+        Check if given level records are recorded (guard for costly messages)
+
+        :param level: Log level
+        :type level: str
+        :return: True if recorded
+        :rtype: bool
+        """
+        return self.levels.index(level) <= self._gate
+
+    def addSink(self, sink):
+        """
+        Add records sink (ConsoleSink, JsonSink, AsyncSink)
+
+        :param sink: Sink object
+        :type sink: object
+        """
+        self.sinks.append(sink)
+
+    def removeSink(self, sink):
+        """
+        Remove and close given sink
+
+        :param sink: Sink object
+        :type sink: object
+        """
+        if sink in self.sinks:
+            self.sinks.remove(sink)
+            sink.close()
+
+    def flush(self):
+        """
+        Flush all sinks
+        """
+        for sink in self.sinks:
+            sink.flush()
+
+    def record(self, level, message, args=(), fields=None, newLinesBefore=0, newLinesAfter=0):
+        """
+        Store record in ring buffer and send it to sinks if level is enabled
+
+        :param level: Level index
+        :type level: int
+        :param message: Message, '%' style format if args are given
+        :type message: str
+        :param args: Message arguments
+        :type args: tuple
+        :param fields: Structured record datas (json sink)
+        :type fields: dict
+        :param newLinesBefore: New lines to insert befor message
+        :type newLinesBefore: int
+        :param newLinesAfter: New lines to insert after message
+        :type newLinesAfter: int
+        """
+        record = LogRecord(level, message, args, fields, newLinesBefore, newLinesAfter)
+        self.history.append(record)
+        if level <= self._lvlIndex:
+            for sink in self.sinks:
+                sink.emit(self, record)
+
+    def format(self, record):
+        """
+        Get given record printed text
+
+        :param record: Log record
+        :type record: LogRecord
+        :return: Text
+        :rtype: str
+        """
+        if self.showTime:
+            text = "| %s | %s | %s | %s" % (self.title, self.labels[record.level],
+                                            time.strftime("%H:%M:%S", time.localtime(record.time)),
+                                            record.getMessage())
+        else:
+            text = "| %s | %s | %s" % (self.title, self.labels[record.level], record.getMessage())
+        if record.newLinesBefore > 0:
+            text = "%s%s" % ('\n' * record.newLinesBefore, text)
+        if record.newLinesAfter > 0:
+            text = "%s%s" % (text, '\n' * record.newLinesAfter)
+        return text
+
+    def recordToDict(self, record):
+        """
+        Get given record as dict (json sink)
+
+        :param record: Log record
+        :type record: LogRecord
+        :return: Record dict
+        :rtype: dict
+        """
+        recordDict = dict(time=record.time, title=self.title, level=self.levels[record.level],
+                          message=record.getMessage())
+        if record.fields:
+            recordDict.update(fields=record.fields)
+        return recordDict
+
+    def dump(self, filePath=None, maxLines=None):
+        """
+        Get recent records text from ring buffer (post-mortem)
+
+        :param filePath: Also write text in given file
+        :type filePath: str
+        :param maxLines: Max number of records (None = all)
+        :type maxLines: int
+        :return: Records text
+        :rtype: list
+        """
+        records = list(self.history)
+        if maxLines is not None:
+            records = records[-maxLines:]
+        showTime, self.showTime = self.showTime, True
+        try:
+            lines = [self.format(record).strip('\n') for record in records]
+        finally:
+            self.showTime = showTime
+        if filePath is not None:
+            writeFile(filePath, '\n'.join(lines) + '\n', atomic=True)
+        return lines
 
     def printLog(self, message, newLinesBefore, newLinesAfter, level):
         """
@@ -306,54 +926,56 @@ class Logger(object):
         :param level: Log level 'critical', 'error', 'warning', 'info', 'debug', 'detail')
         :type level: str
         """
-        self._addNewLines(newLinesBefore)
-        if self.showTime:
-            print "| %s | %s | %s | %s" % (self.title, level, self.currentTime, message)
-        else:
-            print "| %s | %s | %s" % (self.title, level, message)
-        self._addNewLines(newLinesAfter)
+        self.record(self.levels.index(level.lower()), message, newLinesBefore=newLinesBefore,
+                    newLinesAfter=newLinesAfter)
 
-    def critical(self, message, newLinesBefore=0, newLinesAfter=0):
+    def critical(self, message, *args, **kwargs):
         """
         Print given message with critical level
+        ('%' args, newLinesBefore, newLinesAfter, fields: see record)
         """
-        if self.lvlIndex >= 0:
-            self.printLog(message, newLinesBefore, newLinesAfter, 'Critical')
+        if self._gate >= 0:
+            self.record(0, message, args, **kwargs)
 
-    def error(self, message, newLinesBefore=0, newLinesAfter=0):
+    def error(self, message, *args, **kwargs):
         """
         Print given message with error level
+        ('%' args, newLinesBefore, newLinesAfter, fields: see record)
         """
-        if self.lvlIndex >= 1:
-            self.printLog(message, newLinesBefore, newLinesAfter, 'Error')
+        if self._gate >= 1:
+            self.record(1, message, args, **kwargs)
 
-    def warning(self, message, newLinesBefore=0, newLinesAfter=0):
+    def warning(self, message, *args, **kwargs):
         """
         Print given message with warning level
+        ('%' args, newLinesBefore, newLinesAfter, fields: see record)
         """
-        if self.lvlIndex >= 2:
-            self.printLog(message, newLinesBefore, newLinesAfter, 'Warning')
+        if self._gate >= 2:
+            self.record(2, message, args, **kwargs)
 
-    def info(self, message, newLinesBefore=0, newLinesAfter=0):
+    def info(self, message, *args, **kwargs):
         """
         Print given message with info level
+        ('%' args, newLinesBefore, newLinesAfter, fields: see record)
         """
-        if self.lvlIndex >= 3:
-            self.printLog(message, newLinesBefore, newLinesAfter, 'Info')
+        if self._gate >= 3:
+            self.record(3, message, args, **kwargs)
 
-    def debug(self, message, newLinesBefore=0, newLinesAfter=0):
+    def debug(self, message, *args, **kwargs):
         """
         Print given message with debug level
+        ('%' args, newLinesBefore, newLinesAfter, fields: see record)
         """
-        if self.lvlIndex >= 4:
-            self.printLog(message, newLinesBefore, newLinesAfter, 'Debug')
+        if self._gate >= 4:
+            self.record(4, message, args, **kwargs)
 
-    def detail(self, message, newLinesBefore=0, newLinesAfter=0):
+    def detail(self, message, *args, **kwargs):
         """
         Print given message with detail level
+        ('%' args, newLinesBefore, newLinesAfter, fields: see record)
         """
-        if self.lvlIndex >= 5:
-            self.printLog(message, newLinesBefore, newLinesAfter, 'Detail')
+        if self._gate >= 5:
+            self.record(5, message, args, **kwargs)
 
     @property
     def currentTime(self):
@@ -365,20 +987,6 @@ class Logger(object):
         """
         return getTime().replace('_', ':')
 
-    @staticmethod
-    def _addNewLines(newLines):
-        """
-        Print new empty lines
-
-        :param newLines: Number of new lines to print
-        :type newLines: int
-        """
-        if newLines > 0:
-            if newLines == 1:
-                print ""
-            else:
-                print '\n' * (newLines - 1)
-
 
 class Image(object):
     """
@@ -585,9 +1193,142 @@ class Image(object):
         return imaSeq, newSize[0], newSize[1]
 
 
+def benchmarkReaders(count=10000, tmpPath=None, repeat=3):
+    """
+    Compare dict file readers (eval / execfile, literal parse, cached) on user and entity like files
+
+    :param count: Number of files (half user files, half entity files)
+    :type count: int
+    :param tmpPath: Files directory (None = new temp directory, removed at end)
+    :type tmpPath: str
+    :param repeat: Number of warm (cached) passes
+    :type repeat: int
+    :return: Timings in seconds
+    :rtype: dict
+    """
+    import shutil, tempfile
+    removeTmp = tmpPath is None
+    if tmpPath is None:
+        tmpPath = tempfile.mkdtemp(prefix='readBench_')
+    files = []
+    for n in range(count):
+        if n % 2:
+            data = dict(userName='user%05d' % n, userPrefix='U%05d' % n, userGroup='artist', userFirstName='First',
+                        userLastName='Last', userStatus=True, userFavorites=['project_%s' % p for p in range(5)],
+                        recentProjects=[('project_%s' % p, 'PRJ%s' % p) for p in range(10)])
+        else:
+            data = dict(entityType='asset', entitySubType='chars', entityName='char%05d' % n, entityCode='C%05d' % n,
+                        entityLabel='Character %s' % n, entityStatus='wip',
+                        entityTasks=dict(('task%s' % t, dict(status='todo', assign=['user%05d' % t], frames=(1, 100)))
+                                         for t in range(8)))
+        filePath = os.path.join(tmpPath, 'f%05d.py' % n)
+        writeDictFile(filePath, data)
+        files.append(filePath)
+    #-- Files older than cache delay --#
+    oldTime = time.time() - (_readCacheDelay + 10)
+    for filePath in files:
+        os.utime(filePath, (oldTime, oldTime))
+    timings = dict(count=count)
+    try:
+        startTime = time.time()
+        for filePath in files:
+            eval(''.join(readFile(filePath)))
+        timings['eval'] = time.time() - startTime
+        startTime = time.time()
+        for filePath in files:
+            execfile(filePath, {})
+        timings['execfile'] = time.time() - startTime
+        startTime = time.time()
+        for filePath in files:
+            readDictFile(filePath, cache=False)
+        timings['literal'] = time.time() - startTime
+        clearReadCache()
+        startTime = time.time()
+        for filePath in files:
+            readDictFile(filePath)
+        timings['cold'] = time.time() - startTime
+        startTime = time.time()
+        for r in range(repeat):
+            for filePath in files:
+                readDictFile(filePath)
+        timings['warm'] = (time.time() - startTime) / max(1, repeat)
+    finally:
+        clearReadCache()
+        if removeTmp:
+            shutil.rmtree(tmpPath, ignore_errors=True)
+    return timings
+
+
+def benchmarkLogger(count=1000000):
+    """
+    Measure Logger overhead per call, for filtered (level too low) and written records
+
+    :param count: Number of calls per case
+    :type count: int
+    :return: Timings in micro seconds per call
+    :rtype: dict
+    """
+    import tempfile
+    levels = ['critical', 'error', 'warning', 'info', 'debug', 'detail']
+
+    class LegacyLogger(object):
+        """ Level index computed in each method, message formatted by caller """
+        level = 'info'
+
+        def detail(self, message):
+            if levels.index(self.level) >= 5:
+                print message
+
+    timings = dict(count=count)
+    legacy = LegacyLogger()
+    log = Logger(title='BENCH', level='info', history=1000)
+    startTime = time.time()
+    for n in xrange(count):
+        legacy.detail("vertex %s: %s" % (n, (n, n)))
+    timings['legacyFiltered'] = (time.time() - startTime) * 1e6 / count
+    startTime = time.time()
+    for n in xrange(count):
+        log.detail("vertex %s: %s" % (n, (n, n)))
+    timings['eagerFiltered'] = (time.time() - startTime) * 1e6 / count
+    startTime = time.time()
+    for n in xrange(count):
+        log.detail("vertex %s: %s", n, (n, n))
+    timings['lazyFiltered'] = (time.time() - startTime) * 1e6 / count
+    #-- Written Records (json sink, no console) --#
+    jsonFile = os.path.join(tempfile.gettempdir(), 'loggerBench_%s.jsonl' % os.getpid())
+    log.sinks = [JsonSink(jsonFile, maxLines=1000)]
+    written = max(1, count / 10)
+    startTime = time.time()
+    for n in xrange(written):
+        log.info("vertex %s: %s", n, (n, n))
+    timings['jsonSink'] = (time.time() - startTime) * 1e6 / written
+    log.sinks = [AsyncSink(JsonSink(jsonFile, maxLines=1000), maxSize=written)]
+    startTime = time.time()
+    for n in xrange(written):
+        log.info("vertex %s: %s", n, (n, n))
+    timings['asyncCall'] = (time.time() - startTime) * 1e6 / written
+    log.sinks[0].close()
+    timings['asyncTotal'] = (time.time() - startTime) * 1e6 / written
+    os.remove(jsonFile)
+    return timings
+
+
 if __name__ == '__main__':
-    ima = Image()
-    fileIn = "D:/factory/stockShot/fire/embers/seq/embers_001/embers_001.0001-0070.jpg"
-    # fileIn = "D:/factory/stockShot/fire/embers/seq/embers_001/embers_001.%04d.jpg"
-    fileOut = "D:/factory/stockShot/fire/embers/seq/embers_001/toto2.mov"
-    ima.createMovie(fileIn, fileOut, resize=(200, 200), ratio=True, force=True, printCmd=True)
+    import argparse
+    parser = argparse.ArgumentParser(description="procFile benchmarks")
+    subParsers = parser.add_subparsers(dest='bench')
+    readersParser = subParsers.add_parser('readers', help="Dict file readers")
+    readersParser.add_argument('-n', '--count', type=int, default=10000, help="Number of files")
+    readersParser.add_argument('-r', '--repeat', type=int, default=3, help="Number of warm passes")
+    readersParser.add_argument('-p', '--path', default=None, help="Files directory (default = temp directory)")
+    loggerParser = subParsers.add_parser('logger', help="Logger overhead per call")
+    loggerParser.add_argument('-n', '--count', type=int, default=1000000, help="Number of calls")
+    args = parser.parse_args()
+    if args.bench == 'readers':
+        result = benchmarkReaders(count=args.count, tmpPath=args.path, repeat=args.repeat)
+        for key in ['eval', 'execfile', 'literal', 'cold', 'warm']:
+            print "%-10s %8.3fs  (%.1f us/file)" % (key, result[key], result[key] * 1e6 / result['count'])
+    else:
+        result = benchmarkLogger(count=args.count)
+        for key in ['legacyFiltered', 'eagerFiltered', 'lazyFiltered', 'jsonSink', 'asyncCall', 'asyncTotal']:
+            print "%-15s %6.3f us/call" % (key, result[key])
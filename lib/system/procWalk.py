@@ -0,0 +1,299 @@
+"""
+Usage:
+
+Walk Tree:
+----------
+snapshot = procWalk.Snapshot.walk('path/to/root', workers=8)
+for relDir in snapshot.order():
+    print relDir, snapshot.dirs[relDir]['folders'], sorted(snapshot.dirs[relDir]['files'])
+
+Refresh And Diff:
+-----------------
+previous = procWalk.Snapshot.load('path/to/snapshot.json')
+snapshot = procWalk.Snapshot.walk('path/to/root', previous=previous)
+changes = previous.diff(snapshot)
+print changes['added'], changes['removed'], changes['modified']
+snapshot.save('path/to/snapshot.json')
+
+Directories whose mtime didn't change are not listed again (their previous record is reused),
+use deep=True to also detect files modified in place in unchanged directories.
+"""
+
+import os, stat, json, threading, Queue
+from lib.system import procFile as pFile
+
+try:
+    from os import scandir
+except ImportError:
+    try:
+        from scandir import scandir
+    except ImportError:
+        scandir = None
+
+
+def listDir(path):
+    """
+    List given directory, using scandir cached entries when available
+
+    :param path: Directory absolut path
+    :type path: str
+    :return: Sub folders (sorted), files {name: [size, mtime]}, linked folders (not walked)
+    :rtype: (list, dict, list)
+    """
+    folders, files, links = [], {}, []
+    if scandir is not None:
+        for entry in scandir(path):
+            try:
+                if entry.is_dir():
+                    folders.append(entry.name)
+                    if entry.is_symlink():
+                        links.append(entry.name)
+                else:
+                    entryStat = entry.stat()
+                    files[entry.name] = [entryStat.st_size, entryStat.st_mtime]
+            except OSError:
+                continue
+    else:
+        for name in os.listdir(path):
+            fullPath = os.path.join(path, name)
+            try:
+                entryStat = os.stat(fullPath)
+            except OSError:
+                continue
+            if stat.S_ISDIR(entryStat.st_mode):
+                folders.append(name)
+                if os.path.islink(fullPath):
+                    links.append(name)
+            else:
+                files[name] = [entryStat.st_size, entryStat.st_mtime]
+    return sorted(folders), files, links
+
+
+class Snapshot(object):
+    """
+    Directory tree state: one record per directory (mtime, folders, files size and mtime),
+    keyed by path relative to root ('' for root, '/' separator).
+
+    :param root: Root absolut path
+    :type root: str
+    :param dirs: Directory records
+    :type dirs: dict
+    """
+
+    _version = 1
+
+    def __init__(self, root, dirs=None):
+        self.root = pFile.conformPath(root)
+        self.dirs = dirs or dict()
+        self.errors = dict()
+
+    def fullPath(self, relPath):
+        """
+        Get given relative path full path
+
+        :param relPath: Path relative to root
+        :type relPath: str
+        :return: Full path
+        :rtype: str
+        """
+        if not relPath:
+            return self.root
+        return '%s/%s' % (self.root, relPath)
+
+    def order(self):
+        """
+        Get directories in top-down walk order (same as os.walk)
+
+        :return: Relative directory paths
+        :rtype: list
+        """
+        result = []
+        todo = [''] if '' in self.dirs else []
+        while todo:
+            relDir = todo.pop()
+            result.append(relDir)
+            todo.extend(reversed([d for d in self.subDirs(relDir) if d in self.dirs]))
+        return result
+
+    def subDirs(self, relDir):
+        """
+        Get given directory walked sub folders
+
+        :param relDir: Directory relative path
+        :type relDir: str
+        :return: Sub folders relative paths
+        :rtype: list
+        """
+        record = self.dirs[relDir]
+        return ['/'.join([relDir, f]).lstrip('/') for f in record['folders'] if not f in record['links']]
+
+    def files(self):
+        """
+        Get all files with their size and mtime
+
+        :return: {relPath: [size, mtime]}
+        :rtype: dict
+        """
+        result = dict()
+        for relDir, record in self.dirs.iteritems():
+            for fileName, fileStat in record['files'].iteritems():
+                result['/'.join([relDir, fileName]).lstrip('/')] = fileStat
+        return result
+
+    def toPathDict(self, conformed=True):
+        """
+        Translate snapshot to procFile.pathToDict format
+
+        :param conformed: Use conformed paths
+        :type conformed: bool
+        :return: Path contents
+        :rtype: dict
+        """
+        pathDict = {'_order': []}
+        for relDir in self.order():
+            dirPath = self.fullPath(relDir)
+            if not conformed:
+                dirPath = os.path.normpath(dirPath)
+            pathDict['_order'].append(dirPath)
+            pathDict[dirPath] = {'folders': list(self.dirs[relDir]['folders']),
+                                 'files': sorted(self.dirs[relDir]['files'])}
+        return pathDict
+
+    @classmethod
+    def walk(cls, root, workers=8, previous=None, deep=False):
+        """
+        Walk given root with a bounded thread pool
+
+        :param root: Root absolut path
+        :type root: str
+        :param workers: Max number of threads listing directories
+        :type workers: int
+        :param previous: Previous snapshot, unchanged directories records are reused
+        :type previous: Snapshot
+        :param deep: List all directories, even unchanged ones (detect files modified in place)
+        :type deep: bool
+        :return: New snapshot
+        :rtype: Snapshot
+        """
+        if not os.path.isdir(root):
+            raise IOError("!!! Path not found: %s !!!" % root)
+        snapshot = cls(root)
+        if previous is not None and not previous.root == snapshot.root:
+            previous = None
+        todo = Queue.Queue()
+        lock = threading.Lock()
+
+        def visit(relDir):
+            fullDir = snapshot.fullPath(relDir)
+            try:
+                mtime = os.stat(fullDir).st_mtime
+                record = None
+                if previous is not None and not deep:
+                    record = previous.dirs.get(relDir)
+                    if record is not None and not record['mtime'] == mtime:
+                        record = None
+                if record is None:
+                    folders, files, links = listDir(fullDir)
+                    record = dict(mtime=mtime, folders=folders, files=files, links=links)
+            except OSError, err:
+                with lock:
+                    snapshot.errors[relDir] = str(err)
+                return
+            with lock:
+                snapshot.dirs[relDir] = record
+            for subDir in snapshot.subDirs(relDir):
+                todo.put(subDir)
+
+        def worker():
+            while True:
+                relDir = todo.get()
+                try:
+                    if relDir is None:
+                        return
+                    visit(relDir)
+                finally:
+                    todo.task_done()
+
+        todo.put('')
+        threads = []
+        for n in range(max(1, int(workers))):
+            thread = threading.Thread(target=worker, name='WalkWorker')
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+        todo.join()
+        for thread in threads:
+            todo.put(None)
+        for thread in threads:
+            thread.join()
+        return snapshot
+
+    def diff(self, snapshot):
+        """
+        Compare this snapshot with given newer snapshot of the same root
+
+        :param snapshot: New snapshot
+        :type snapshot: Snapshot
+        :return: Relative paths {'added': [], 'removed': [], 'modified': []}, folders end with '/'
+        :rtype: dict
+        """
+        changes = dict(added=[], removed=[], modified=[])
+        for relDir in set(self.dirs) | set(snapshot.dirs):
+            old = self.dirs.get(relDir)
+            new = snapshot.dirs.get(relDir)
+            if old is not None and new is not None and old is new:
+                continue
+            oldFiles = old['files'] if old is not None else {}
+            newFiles = new['files'] if new is not None else {}
+            prefix = '%s/' % relDir if relDir else ''
+            if old is None and relDir:
+                changes['added'].append('%s/' % relDir)
+            elif new is None and relDir:
+                changes['removed'].append('%s/' % relDir)
+            for fileName in set(oldFiles) | set(newFiles):
+                if not fileName in newFiles:
+                    changes['removed'].append(prefix + fileName)
+                elif not fileName in oldFiles:
+                    changes['added'].append(prefix + fileName)
+                elif not list(oldFiles[fileName]) == list(newFiles[fileName]):
+                    changes['modified'].append(prefix + fileName)
+        for key in changes:
+            changes[key].sort()
+        return changes
+
+    def save(self, snapshotFile):
+        """
+        Write snapshot to given json file (atomic replace)
+
+        :param snapshotFile: Snapshot file absolut path
+        :type snapshotFile: str
+        """
+        pFile.replaceFile(snapshotFile, json.dumps(dict(version=self._version, root=self.root, dirs=self.dirs)))
+
+    @classmethod
+    def load(cls, snapshotFile):
+        """
+        Read snapshot json file
+
+        :param snapshotFile: Snapshot file absolut path
+        :type snapshotFile: str
+        :return: Snapshot (None if file doesn't exist, is unreadable or outdated)
+        :rtype: Snapshot
+        """
+        if not os.path.exists(snapshotFile):
+            return None
+        try:
+            with open(snapshotFile, 'rb') as fileId:
+                datas = json.load(fileId)
+        except (IOError, ValueError):
+            return None
+        if not datas.get('version') == cls._version:
+            return None
+        #-- Json strings are unicode, names are stored back as listed (utf-8 str) --#
+        utf8 = lambda name: name.encode('utf-8')
+        dirs = dict()
+        for relDir, record in datas['dirs'].iteritems():
+            dirs[utf8(relDir)] = dict(mtime=record['mtime'], folders=map(utf8, record['folders']),
+                                      links=map(utf8, record['links']),
+                                      files=dict((utf8(k), v) for k, v in record['files'].iteritems()))
+        return cls(utf8(datas['root']), dirs)
@@ -0,0 +1,354 @@
+"""
+Usage:
+
+Callback Subscribers (called from watcher thread):
+--------------------------------------------------
+def onChange(root, changes):
+    for relPath in changes['modified'] + changes['removed']:
+        cache.pop(relPath, None)
+watcher = procWatch.Watcher(interval=2, debounce=0.5)
+watcher.watch('path/to/root', onChange)
+watcher.start()
+
+Queued Batches (GUI timer, same thread as caller):
+--------------------------------------------------
+watcher.watch('path/to/root')
+for root, changes in watcher.pending():
+    print root, changes['added'], changes['removed'], changes['modified']
+
+Changes are procWalk.Snapshot.diff() results (relative paths, folders end with '/').
+Roots are polled with directory mtime checks (deep=True also stats every file).
+If pyinotify is installed, file system events wake the watcher up at once and polling becomes a slow safety net.
+"""
+
+import time, threading
+from lib.system import procWalk
+
+try:
+    import pyinotify
+except ImportError:
+    pyinotify = None
+
+
+def mergeChanges(changes, newChanges):
+    """
+    Merge newer changes into given changes (added then removed paths cancel out)
+
+    :param changes: Changes {'added': set, 'removed': set, 'modified': set}, edited
+    :type changes: dict
+    :param newChanges: Newer changes (Snapshot.diff result)
+    :type newChanges: dict
+    """
+    for relPath in newChanges['added']:
+        if relPath in changes['removed']:
+            changes['removed'].discard(relPath)
+            changes['modified'].add(relPath)
+        else:
+            changes['added'].add(relPath)
+    for relPath in newChanges['removed']:
+        changes['modified'].discard(relPath)
+        if relPath in changes['added']:
+            changes['added'].discard(relPath)
+        else:
+            changes['removed'].add(relPath)
+    for relPath in newChanges['modified']:
+        if not relPath in changes['added']:
+            changes['modified'].add(relPath)
+
+
+class WatchedRoot(object):
+    """
+    Watched root state: last snapshot, pending changes batch, subscribers
+
+    :param root: Root absolut path
+    :type root: str
+    :param deep: Stat all files on each poll
+    :type deep: bool
+    """
+
+    def __init__(self, root, deep=False):
+        self.root = root
+        self.deep = deep
+        self.callbacks = []
+        self.snapshot = procWalk.Snapshot.walk(root)
+        self.lastPoll = time.time()
+        self.lastChange = None
+        self.firstChange = None
+        self.dirty = set()
+        self.batch = dict(added=set(), removed=set(), modified=set())
+
+    def poll(self, workers=4):
+        """
+        Walk root against last snapshot, merge changes into pending batch
+
+        :param workers: Walk threads
+        :type workers: int
+        :return: True if something changed
+        :rtype: bool
+        """
+        dirty, self.dirty = self.dirty, set()
+        return self.merge(self.walk(dirty=dirty, workers=workers))
+
+    def walk(self, dirty=None, workers=4):
+        """
+        Walk root against last snapshot, store new snapshot. Pending batch is not touched
+
+        :param dirty: Relative directories notified as changed, listed again
+        :type dirty: set
+        :param workers: Walk threads
+        :type workers: int
+        :return: Changes (Snapshot.diff result)
+        :rtype: dict
+        """
+        previous = self.snapshot
+        if dirty:
+            #-- Directories notified as changed are listed again --#
+            previous = procWalk.Snapshot(self.snapshot.root, dict(self.snapshot.dirs))
+            for relDir in dirty:
+                previous.dirs.pop(relDir, None)
+        snapshot = procWalk.Snapshot.walk(self.root, workers=workers, previous=previous, deep=self.deep)
+        changes = self.snapshot.diff(snapshot)
+        self.snapshot = snapshot
+        self.lastPoll = time.time()
+        return changes
+
+    def merge(self, changes):
+        """
+        Merge given changes into pending batch
+
+        :param changes: Changes (Snapshot.diff result)
+        :type changes: dict
+        :return: True if something changed
+        :rtype: bool
+        """
+        if not (changes['added'] or changes['removed'] or changes['modified']):
+            return False
+        mergeChanges(self.batch, changes)
+        self.lastChange = time.time()
+        if self.firstChange is None:
+            self.firstChange = self.lastChange
+        return True
+
+    def popBatch(self):
+        """
+        Get pending changes and start a new batch
+
+        :return: Changes {'added': list, 'removed': list, 'modified': list} (None if empty)
+        :rtype: dict
+        """
+        batch = self.batch
+        self.batch = dict(added=set(), removed=set(), modified=set())
+        self.lastChange = None
+        self.firstChange = None
+        if not (batch['added'] or batch['removed'] or batch['modified']):
+            return None
+        return dict((key, sorted(paths)) for key, paths in batch.iteritems())
+
+
+class Watcher(object):
+    """
+    Polling file system change watcher. Changes found on each root are batched, and sent once
+    no new change came during 'debounce' seconds (or after 'maxDelay' seconds of continuous changes).
+
+    :param interval: Poll interval in seconds
+    :type interval: float
+    :param debounce: Quiet delay before sending a batch, in seconds
+    :type debounce: float
+    :param maxDelay: Max delay before sending a batch, in seconds
+    :type maxDelay: float
+    :param workers: Walk threads per poll
+    :type workers: int
+    :param notify: Use inotify events when available
+    :type notify: bool
+    """
+
+    def __init__(self, interval=2.0, debounce=0.5, maxDelay=10.0, workers=4, notify=True):
+        self.interval = interval
+        self.debounce = debounce
+        self.maxDelay = maxDelay
+        self.workers = workers
+        self.roots = dict()
+        self._ready = []
+        self._lock = threading.RLock()
+        self._walkLock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._notifier = None
+        self._watchManager = None
+        if notify and pyinotify is not None:
+            self._startNotifier()
+
+    @property
+    def notifying(self):
+        """
+        Inotify events are used
+
+        :return: True if inotify is active
+        :rtype: bool
+        """
+        return self._notifier is not None
+
+    def watch(self, root, callback=None, deep=False):
+        """
+        Watch given root. Root is walked once at registration
+
+        :param root: Root absolut path
+        :type root: str
+        :param callback: Function called with (root, changes) from watcher thread (None = queued, see pending())
+        :type callback: function
+        :param deep: Stat all files on each poll (detect files modified in place without inotify)
+        :type deep: bool
+        """
+        with self._lock:
+            watched = self.roots.get(root)
+            if watched is None:
+                watched = WatchedRoot(root, deep=deep)
+                self.roots[root] = watched
+                if self._watchManager is not None:
+                    self._watchManager.add_watch(root, self._notifyMask, rec=True, auto_add=True)
+            watched.deep = watched.deep or deep
+            if callback is not None and not callback in watched.callbacks:
+                watched.callbacks.append(callback)
+
+    def unwatch(self, root, callback=None):
+        """
+        Remove given subscriber, root is not watched anymore once it has no subscriber
+
+        :param root: Root absolut path
+        :type root: str
+        :param callback: Subscriber to remove (None = all)
+        :type callback: function
+        """
+        with self._lock:
+            watched = self.roots.get(root)
+            if watched is None:
+                return
+            if callback is not None and callback in watched.callbacks:
+                watched.callbacks.remove(callback)
+            if callback is None or not watched.callbacks:
+                self.roots.pop(root)
+                if self._watchManager is not None:
+                    watchIds = self._watchManager.get_wd(root)
+                    if watchIds is not None:
+                        self._watchManager.rm_watch(watchIds, rec=True)
+
+    def poll(self, force=False):
+        """
+        Poll roots due for a check, then send batches whose debounce delay is over.
+        Roots are walked outside the lock, so pending() never waits for a walk
+
+        :param force: Poll all roots and send all batches now
+        :type force: bool
+        :return: Number of batches sent
+        :rtype: int
+        """
+        with self._walkLock:
+            now = time.time()
+            interval = self.interval * 30 if self.notifying else self.interval
+            with self._lock:
+                due = []
+                for root, watched in self.roots.items():
+                    if force or watched.dirty or now - watched.lastPoll >= interval:
+                        dirty, watched.dirty = watched.dirty, set()
+                        due.append((watched, dirty))
+            #-- Walk --#
+            walked = []
+            for watched, dirty in due:
+                try:
+                    walked.append((watched, watched.walk(dirty=dirty, workers=self.workers)))
+                except IOError:
+                    continue
+            #-- Swap Batches --#
+            batches = []
+            with self._lock:
+                for watched, changes in walked:
+                    if self.roots.get(watched.root) is watched:
+                        watched.merge(changes)
+                now = time.time()
+                for root, watched in self.roots.items():
+                    if watched.lastChange is None:
+                        continue
+                    if (force or now - watched.lastChange >= self.debounce
+                            or now - watched.firstChange >= self.maxDelay):
+                        changes = watched.popBatch()
+                        if changes is not None:
+                            batches.append((root, changes, list(watched.callbacks)))
+                for root, changes, callbacks in batches:
+                    if not callbacks:
+                        self._ready.append((root, changes))
+        for root, changes, callbacks in batches:
+            for callback in callbacks:
+                callback(root, changes)
+        return len(batches)
+
+    def pending(self):
+        """
+        Get queued batches of roots without callback
+
+        :return: [(root, changes)]
+        :rtype: list
+        """
+        with self._lock:
+            ready, self._ready = self._ready, []
+        return ready
+
+    def start(self):
+        """
+        Start watcher thread
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='FileWatcher')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop watcher thread and inotify events
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._notifier is not None:
+            self._notifier.stop()
+            self._notifier = None
+            self._watchManager = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception, err:
+                print "!!! File watcher poll failed: %s !!!" % err
+            self._wake.wait(min(self.interval, self.debounce) / 2.0)
+            self._wake.clear()
+
+    #-- Inotify --#
+
+    @property
+    def _notifyMask(self):
+        return (pyinotify.IN_CREATE | pyinotify.IN_DELETE | pyinotify.IN_MODIFY | pyinotify.IN_CLOSE_WRITE
+                | pyinotify.IN_MOVED_FROM | pyinotify.IN_MOVED_TO | pyinotify.IN_ATTRIB)
+
+    def _startNotifier(self):
+        watcher = self
+
+        class Handler(pyinotify.ProcessEvent):
+            def process_default(self, event):
+                watcher._notified(event.path)
+
+        self._watchManager = pyinotify.WatchManager()
+        self._notifier = pyinotify.ThreadedNotifier(self._watchManager, Handler())
+        self._notifier.daemon = True
+        self._notifier.start()
+
+    def _notified(self, path):
+        with self._lock:
+            for root, watched in self.roots.iteritems():
+                if path == root or path.startswith('%s/' % root.rstrip('/')):
+                    watched.dirty.add(path[len(root):].strip('/'))
+        self._wake.set()
@@ -0,0 +1,146 @@
+import os, sys, time, signal, shutil, tempfile, threading, subprocess, unittest, StringIO
+from lib.system import procFile as pFile
+
+
+class DictFileTest(unittest.TestCase):
+    """
+    Dict and py files read as checked literals
+    """
+
+    def setUp(self):
+        self.tmpPath = tempfile.mkdtemp()
+        self.dictFile = os.path.join(self.tmpPath, 'datas.py')
+
+    def tearDown(self):
+        pFile.clearReadCache()
+        shutil.rmtree(self.tmpPath)
+
+    def writeText(self, text):
+        with open(self.dictFile, 'w') as fileId:
+            fileId.write(text)
+
+    def test_roundTrip(self):
+        datas = {'str': 'text', 'unicode': u'caf\xe9', 'int': -3, 'long': 2 ** 70, 'float': -1.5e-7,
+                 'complex': 1 - 2j, 'bool': [True, False, None], 'tuple': (1, ('a',)), 'list': [[], {}],
+                 'set': set([1, 2, 'a']), 'emptySet': set(), 'frozenset': frozenset(['x', (1, 2)]),
+                 'nested': {0: {'setList': [set([3])], 'long': 'x' * 200}}, 7: 'intKey', (1, 2): 'tupleKey'}
+        pFile.writeDictFile(self.dictFile, datas)
+        self.assertEqual(pFile.readDictFile(self.dictFile, cache=False), datas)
+        self.assertEqual(pFile.readDictFile(self.dictFile), datas)
+
+    def test_rejectCode(self):
+        for text in ["{'a': __import__('os').getcwd()}", "{'a': open('x')}", "{'a': set([1]).pop()}",
+                     "{'a': set([1], [2])}", "{'a': [1, 2][0]}"]:
+            self.writeText(text)
+            pFile.clearReadCache()
+            self.assertRaises(IOError, pFile.readDictFile, self.dictFile)
+
+    def test_pyFile(self):
+        self.writeText("a = set(['x'])\nb = {'c': (1, -2)}\n")
+        self.assertEqual(pFile.readPyFile(self.dictFile), dict(a=set(['x']), b={'c': (1, -2)}))
+        self.writeText("import os\na = os.sep\n")
+        pFile.clearReadCache()
+        self.assertEqual(pFile.readPyFile(self.dictFile)['a'], os.sep)
+
+
+class WriteFileTest(unittest.TestCase):
+    """
+    Atomic replace, true append and buffered appender
+    """
+
+    def setUp(self):
+        self.tmpPath = tempfile.mkdtemp()
+        self.filePath = os.path.join(self.tmpPath, 'file.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpPath)
+
+    def readText(self):
+        with open(self.filePath, 'rb') as fileId:
+            return fileId.read()
+
+    @unittest.skipIf(os.name == 'nt', "needs SIGKILL")
+    def test_replaceCrashSafety(self):
+        contents = ['%s\n' % (str(n) * 500000) for n in range(2)]
+        pFile.replaceFile(self.filePath, contents[0])
+        rootPath = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        script = '\n'.join(["import sys", "sys.path.insert(0, %r)" % rootPath,
+                            "from lib.system import procFile",
+                            "contents = ['%s\\n' % (str(n) * 500000) for n in range(2)]",
+                            "n = 0", "while True:", "    n += 1",
+                            "    procFile.replaceFile(%r, contents[n %% 2])" % self.filePath])
+        for n in range(10):
+            proc = subprocess.Popen([sys.executable, '-c', script])
+            time.sleep(0.2 + n * 0.03)
+            os.kill(proc.pid, signal.SIGKILL)
+            proc.wait()
+            self.assertTrue(self.readText() in contents)
+
+    def test_replaceFromThreads(self):
+        contents = ['%s\n' % (str(n) * 100000) for n in range(8)]
+        errors = []
+
+        def replace(text):
+            try:
+                for n in range(20):
+                    pFile.replaceFile(self.filePath, text)
+            except Exception, err:
+                errors.append(err)
+
+        threads = [threading.Thread(target=replace, args=(text,)) for text in contents]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertTrue(self.readText() in contents)
+        self.assertEqual(os.listdir(self.tmpPath), ['file.txt'])
+
+    def test_appendFile(self):
+        pFile.writeFile(self.filePath, 'a')
+        pFile.appendFile(self.filePath, 'b\n')
+        pFile.appendFile(self.filePath, ['c\n', 'd\n'])
+        self.assertEqual(self.readText(), 'a\nb\nc\nd\n')
+
+    def test_appenderThroughput(self):
+        count = 2000
+        appenderFile = os.path.join(self.tmpPath, 'appender.txt')
+        start = time.time()
+        for n in range(count):
+            pFile.appendFile(self.filePath, 'line %s\n' % n)
+        lineTime = time.time() - start
+        start = time.time()
+        with pFile.FileAppender(appenderFile, maxLines=500, flushDelay=10) as appender:
+            for n in range(count):
+                appender.write('line %s' % n)
+        bufferTime = time.time() - start
+        with open(appenderFile, 'rb') as fileId:
+            self.assertEqual(fileId.read(), self.readText())
+        self.assertTrue(bufferTime * 2 < lineTime, "buffered %.4fs, line by line %.4fs" % (bufferTime, lineTime))
+
+
+class LoggerTest(unittest.TestCase):
+    """
+    Record message formatting
+    """
+
+    def setUp(self):
+        self.stdout = sys.stdout
+        sys.stdout = StringIO.StringIO()
+
+    def tearDown(self):
+        sys.stdout = self.stdout
+
+    def test_message(self):
+        log = pFile.Logger(title='Test')
+        log.info(u'caf\xe9')
+        log.info('100%')
+        log.info('%s files in %.1fs', 3, 0.25)
+        log.info(u'%s', u'caf\xe9')
+        self.assertEqual([record.getMessage() for record in log.history],
+                         [u'caf\xe9', '100%', '3 files in 0.2s', u'caf\xe9'])
+        self.assertEqual(sys.stdout.getvalue().splitlines()[0], u'| Test | Info | caf\xe9')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os, time, shutil, tempfile, threading, unittest
+from lib.system import procWatch
+
+
+class WatcherTest(unittest.TestCase):
+    """
+    Change batches on a watched tmp dir, polled by hand
+    """
+
+    def setUp(self):
+        self.tmpPath = tempfile.mkdtemp()
+        self.watcher = procWatch.Watcher(interval=0, debounce=0.5, maxDelay=1.0, notify=False)
+        self.watcher.watch(self.tmpPath)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpPath)
+
+    def writeFile(self, name):
+        with open(os.path.join(self.tmpPath, name), 'w') as fileId:
+            fileId.write(name)
+
+    def test_debounce(self):
+        self.writeFile('a.txt')
+        self.writeFile('b.txt')
+        self.assertEqual(self.watcher.poll(), 0)
+        self.assertEqual(self.watcher.pending(), [])
+        time.sleep(0.6)
+        self.assertEqual(self.watcher.poll(), 1)
+        self.assertEqual(self.watcher.pending(), [(self.tmpPath, dict(added=['a.txt', 'b.txt'], removed=[],
+                                                                     modified=[]))])
+
+    def test_maxDelay(self):
+        #-- Continuous changes still send a batch every maxDelay seconds --#
+        start = time.time()
+        count = 0
+        while time.time() - start < 3.0:
+            self.writeFile('f%s.txt' % count)
+            count += 1
+            self.watcher.poll()
+            time.sleep(0.1)
+        batches = self.watcher.pending()
+        self.assertTrue(len(batches) >= 2)
+        self.watcher.poll(force=True)
+        batches += self.watcher.pending()
+        added = sum([changes['added'] for root, changes in batches], [])
+        self.assertEqual(sorted(added), sorted(['f%s.txt' % n for n in range(count)]))
+
+    def test_cancel(self):
+        #-- Added then removed paths cancel out --#
+        self.writeFile('tmp.txt')
+        self.watcher.poll()
+        os.remove(os.path.join(self.tmpPath, 'tmp.txt'))
+        self.watcher.poll()
+        self.assertEqual(self.watcher.poll(force=True), 0)
+        self.assertEqual(self.watcher.pending(), [])
+
+    def test_unwatch(self):
+        received = []
+        callback = lambda root, changes: received.append(changes)
+        self.watcher.watch(self.tmpPath, callback)
+        self.writeFile('a.txt')
+        self.watcher.poll()
+        self.watcher.unwatch(self.tmpPath, callback)
+        self.assertEqual(self.watcher.poll(force=True), 0)
+        self.assertEqual(received, [])
+
+    def test_pendingDuringWalk(self):
+        #-- pending() does not wait for a walk --#
+        walk = procWatch.WatchedRoot.walk
+        walking = threading.Event()
+        release = threading.Event()
+
+        def slowWalk(watched, **kwargs):
+            walking.set()
+            release.wait(5)
+            return walk(watched, **kwargs)
+
+        procWatch.WatchedRoot.walk = slowWalk
+        try:
+            thread = threading.Thread(target=self.watcher.poll)
+            thread.start()
+            walking.wait(5)
+            start = time.time()
+            self.watcher.pending()
+            self.assertTrue(time.time() - start < 1.0)
+            release.set()
+            thread.join()
+        finally:
+            procWatch.WatchedRoot.walk = walk
+
+
+if __name__ == '__main__':
+    unittest.main()